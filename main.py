@@ -10,22 +10,23 @@ os.makedirs(MINECRAFT_DIR, exist_ok=True)
 
 import logging
 
+from log_setup import setup_logging
+from util import load_settings, setup_directories
+
+_settings = load_settings()
+setup_logging(LOG_FILE, level=_settings.get('log_level', 'INFO'), levels=_settings.get('log_levels') or {})
+
+# Консольные команды (16launcher launch ...) работают без Qt
+if __name__ == '__main__' and len(sys.argv) > 1 and not sys.argv[1].startswith('-'):
+    from cli import main
+
+    sys.exit(main(sys.argv[1:]))
+
 from PyQt5.QtWidgets import QApplication
 
 from gui.main_window import MainWindow
-from util import setup_directories
 from discord_rpc import shutdown_discord_rpc
 
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S',
-    handlers=[
-        logging.StreamHandler(sys.stderr),
-        logging.FileHandler(LOG_FILE),
-    ],
-)
-
 if __name__ == '__main__':
     logging.info('Initializing directories')
     setup_directories()
@@ -0,0 +1,234 @@
+"""
+Java-агенты лаунчера (authlib-injector и т.п.)
+
+Для каждого агента хранится версия, SHA256 и ETag ответа GitHub API. Проверка
+перед запуском сводится к stat файла (хэш пересчитывается только если файл
+изменился), а проверка обновлений идёт в фоне не чаще раза в TTL и использует
+условные запросы, поэтому запуск игры никогда не ждёт GitHub и не упирается в его лимиты.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import zipfile
+from dataclasses import dataclass
+
+import requests
+
+from config import AUTHLIB_INJECTOR_URL, AUTHLIB_JAR_PATH, CACHE_DIR, ELY_BY_INJECT_URL
+from flow import dedicate
+from version_installer import USER_AGENT
+
+AGENTS_INDEX_PATH: str = os.path.join(CACHE_DIR, 'agents.json')
+# Как часто проверять новые релизы агентов (секунды)
+AGENTS_TTL = 24 * 60 * 60
+
+
+class ArtifactError(RuntimeError):
+    pass
+
+
+@dataclass
+class AgentSpec:
+    name: str
+    path: str
+    # GitHub API последнего релиза
+    release_api_url: str
+    # Закреплённая ссылка на случай, если API недоступен или исчерпан лимит запросов
+    fallback_url: str
+    fallback_version: str
+
+
+AGENTS: dict[str, AgentSpec] = {
+    'authlib-injector': AgentSpec(
+        name='authlib-injector',
+        path=AUTHLIB_JAR_PATH,
+        release_api_url=AUTHLIB_INJECTOR_URL,
+        fallback_url=ELY_BY_INJECT_URL,
+        fallback_version='v1.2.5',
+    ),
+}
+
+
+def _sha256_of_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _stat(path: str) -> list[int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+class AgentArtifactManager:
+    """Кэш Java-агентов с фоновым обновлением"""
+
+    def __init__(self, index_path: str = AGENTS_INDEX_PATH, ttl: float = AGENTS_TTL) -> None:
+        self.index_path = index_path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._refreshing: set[str] = set()
+        self._entries: dict[str, dict] = self._load()
+
+    def _load(self) -> dict[str, dict]:
+        try:
+            with open(self.index_path, encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            tmp_path = f'{self.index_path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, indent=4)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            logging.warning(f'[AGENTS] Не удалось сохранить индекс агентов: {e}')
+
+    def _is_intact(self, spec: AgentSpec, entry: dict | None) -> bool:
+        """Файл на месте и совпадает с записанным SHA256 (хэш считается только при изменении stat)"""
+        stat = _stat(spec.path)
+        if not stat or not entry or not entry.get('sha256'):
+            return False
+        if entry.get('stat') == stat:
+            return True
+        if _sha256_of_file(spec.path) == entry['sha256']:
+            with self._lock:
+                entry['stat'] = stat
+                self._save()
+            return True
+        return False
+
+    def _download(self, spec: AgentSpec, url: str, version: str, expected_sha256: str | None, etag: str | None) -> None:
+        r = requests.get(url, headers={'User-Agent': USER_AGENT}, timeout=30)
+        r.raise_for_status()
+        data = r.content
+        sha256 = hashlib.sha256(data).hexdigest()
+        if expected_sha256 and sha256 != expected_sha256:
+            raise ArtifactError(f'{spec.name}: SHA256 mismatch for {url}')
+
+        os.makedirs(os.path.dirname(spec.path), exist_ok=True)
+        tmp_path = f'{spec.path}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, spec.path)
+        with self._lock:
+            self._entries[spec.name] = {
+                'version': version,
+                'sha256': sha256,
+                'url': url,
+                'etag': etag,
+                'checked_at': time.time(),
+                'stat': _stat(spec.path),
+            }
+            self._save()
+        logging.info(f'[AGENTS] {spec.name} {version} сохранён ({len(data)} байт)')
+
+    def _fetch_latest(self, spec: AgentSpec, force: bool = False) -> bool:
+        """Проверяет последний релиз условным запросом; True — если что-то скачано"""
+        entry = self._entries.get(spec.name) or {}
+        headers = {'User-Agent': USER_AGENT, 'Accept': 'application/vnd.github+json'}
+        if entry.get('etag') and not force:
+            headers['If-None-Match'] = entry['etag']
+        r = requests.get(spec.release_api_url, headers=headers, timeout=15)
+        if r.status_code == 304:
+            with self._lock:
+                entry['checked_at'] = time.time()
+                self._save()
+            return False
+        r.raise_for_status()
+        release = r.json()
+        version = release.get('tag_name') or ''
+        asset = next((a for a in release.get('assets', []) if a.get('name', '').endswith('.jar')), None)
+        if asset is None:
+            raise ArtifactError(f'{spec.name}: jar asset not found in release {version}')
+
+        if entry.get('version') == version and self._is_intact(spec, entry):
+            with self._lock:
+                entry['etag'] = r.headers.get('ETag')
+                entry['checked_at'] = time.time()
+                self._save()
+            return False
+
+        # GitHub отдаёт digest вида "sha256:<hex>" для ассетов релиза
+        digest = asset.get('digest') or ''
+        expected = digest.split(':', 1)[1] if digest.startswith('sha256:') else None
+        self._download(spec, asset['browser_download_url'], version, expected, r.headers.get('ETag'))
+        return True
+
+    def _refresh(self, spec: AgentSpec) -> None:
+        try:
+            self._fetch_latest(spec)
+        except Exception as e:
+            logging.warning(f'[AGENTS] Фоновое обновление {spec.name} не удалось: {e}')
+            with self._lock:
+                entry = self._entries.get(spec.name)
+                if entry is not None:
+                    # Не долбим API при ошибках/лимитах — следующая попытка через TTL
+                    entry['checked_at'] = time.time()
+                    self._save()
+        finally:
+            with self._lock:
+                self._refreshing.discard(spec.name)
+
+    def _adopt(self, spec: AgentSpec) -> dict | None:
+        """Берёт под учёт jar, скачанный до появления индекса; версия уточнится при фоновой проверке"""
+        try:
+            with zipfile.ZipFile(spec.path) as zf:
+                if zf.testzip() is not None:
+                    return None
+        except (OSError, zipfile.BadZipFile):
+            return None
+        entry = {'version': None, 'sha256': _sha256_of_file(spec.path), 'checked_at': 0, 'stat': _stat(spec.path)}
+        with self._lock:
+            self._entries[spec.name] = entry
+            self._save()
+        return entry
+
+    def ensure(self, name: str) -> str:
+        """Путь к агенту; синхронная загрузка только если файла нет или он повреждён"""
+        spec = AGENTS[name]
+        entry = self._entries.get(name)
+        if entry is None and _stat(spec.path):
+            entry = self._adopt(spec)
+        if self._is_intact(spec, entry):
+            with self._lock:
+                stale = time.time() - entry.get('checked_at', 0) > self.ttl
+                if stale and name not in self._refreshing:
+                    self._refreshing.add(name)
+                    dedicate(self._refresh, spec)
+            return spec.path
+
+        logging.info(f'[AGENTS] {name} отсутствует или повреждён, загружаем')
+        try:
+            self._fetch_latest(spec, force=True)
+        except Exception as e:
+            logging.warning(f'[AGENTS] GitHub API недоступен для {name}: {e}; используем закреплённую версию')
+            self._download(spec, spec.fallback_url, spec.fallback_version, None, None)
+        return spec.path
+
+    def info(self, name: str) -> dict | None:
+        return self._entries.get(name)
+
+
+# Глобальный экземпляр
+_agent_artifacts: AgentArtifactManager | None = None
+
+
+def get_agent_artifacts() -> AgentArtifactManager:
+    """Получить глобальный менеджер Java-агентов"""
+    global _agent_artifacts
+    if _agent_artifacts is None:
+        _agent_artifacts = AgentArtifactManager()
+    return _agent_artifacts
@@ -0,0 +1,175 @@
+"""
+Динамические архивы классов (AppCDS)
+
+При первом запуске сборки (версия + загрузчик + моды) на Java 13+ к команде
+добавляется -XX:ArchiveClassesAtExit: при выходе JVM сохраняет загруженные классы
+в архив. Следующие запуски подключают его через -XX:SharedArchiveFile и тратят
+меньше времени на загрузку классов. Архив привязан к хэшу classpath, набора модов
+и бинарника Java: при их изменении старый архив удаляется и создаётся новый.
+Архивы лежат в MINECRAFT_DIR/cds, там же индекс с временем запуска игры без
+архива и с ним, чтобы выигрыш был виден.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass, field, fields
+
+from config import MINECRAFT_DIR
+
+CDS_DIR: str = os.path.join(MINECRAFT_DIR, 'cds')
+CDS_INDEX_FORMAT = 1
+# Динамические архивы появились в JDK 13
+CDS_MIN_JAVA = 13
+# Сколько последних замеров времени запуска хранить
+MAX_TIMINGS = 5
+
+MODE_CREATE = 'create'
+MODE_USE = 'use'
+
+
+def _stat(path: str) -> tuple[int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def archive_key(java_path: str, classpath: list[str], mods_dir: str) -> str:
+    """Хэш всего, от чего зависит архив: бинарник Java, classpath и моды (имя, размер, время изменения)"""
+    digest = hashlib.sha1()
+    for path in [java_path, *classpath]:
+        digest.update(f'{path}\0{_stat(path)}\n'.encode())
+    try:
+        mods = sorted(name for name in os.listdir(mods_dir) if name.endswith(('.jar', '.zip')))
+    except OSError:
+        mods = []
+    for name in mods:
+        digest.update(f'mod\0{name}\0{_stat(os.path.join(mods_dir, name))}\n'.encode())
+    return digest.hexdigest()
+
+
+@dataclass
+class CdsEntry:
+    instance: str
+    key: str
+    file: str
+    # Время создания архива; None, пока архив не записан
+    created: float | None = None
+    # Время до готовности игры без архива и с ним, секунды
+    baseline: list[float] = field(default_factory=list)
+    cached: list[float] = field(default_factory=list)
+
+
+def _average(values: list[float]) -> float | None:
+    return sum(values) / len(values) if values else None
+
+
+class CdsArchives:
+    """Архивы AppCDS по сборкам и замеры времени запуска"""
+
+    def __init__(self, directory: str = CDS_DIR) -> None:
+        self.directory = directory
+        self.index_path = os.path.join(directory, 'index.json')
+        self._lock = threading.Lock()
+        self._entries: dict[str, CdsEntry] = self._load()
+
+    def _load(self) -> dict[str, CdsEntry]:
+        try:
+            with open(self.index_path, encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('format') != CDS_INDEX_FORMAT:
+                return {}
+            known = {f.name for f in fields(CdsEntry)}
+            entries = [CdsEntry(**{k: v for k, v in item.items() if k in known}) for item in data.get('archives', [])]
+            return {entry.instance: entry for entry in entries}
+        except (OSError, ValueError, TypeError, AttributeError):
+            return {}
+
+    def _save(self) -> None:
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f'{self.index_path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(
+                    {'format': CDS_INDEX_FORMAT, 'archives': [asdict(e) for e in self._entries.values()]},
+                    f,
+                    indent=4,
+                )
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            logging.warning(f'[CDS] Не удалось сохранить индекс архивов: {e}')
+
+    def path(self, entry: CdsEntry) -> str:
+        return os.path.join(self.directory, entry.file)
+
+    def _remove_file(self, entry: CdsEntry) -> None:
+        try:
+            os.remove(self.path(entry))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logging.warning(f'[CDS] Не удалось удалить архив {entry.file}: {e}')
+
+    def prepare(self, instance: str, key: str, java_major: int | None) -> tuple[list[str], CdsEntry | None, str | None]:
+        """Аргументы JVM для запуска: подключить готовый архив или записать новый при выходе"""
+        if not java_major or java_major < CDS_MIN_JAVA:
+            return [], None, None
+        with self._lock:
+            entry = self._entries.get(instance)
+            if entry is not None and entry.key != key:
+                # Изменились моды, библиотеки или Java — архив больше не соответствует classpath
+                logging.info(f'[CDS] Архив {instance} устарел, будет создан заново')
+                self._remove_file(entry)
+                entry = None
+            if entry is None:
+                safe = re.sub(r'[^\w.-]+', '_', instance)
+                entry = CdsEntry(instance, key, f'{safe}-{key[:12]}.jsa')
+                self._entries[instance] = entry
+                self._save()
+            os.makedirs(self.directory, exist_ok=True)
+            path = self.path(entry)
+            if entry.created and os.path.isfile(path):
+                return [f'-XX:SharedArchiveFile={path}'], entry, MODE_USE
+            entry.created = None
+            return [f'-XX:ArchiveClassesAtExit={path}'], entry, MODE_CREATE
+
+    def finish(self, entry: CdsEntry, mode: str | None) -> bool:
+        """После выхода игры: отмечает записанный архив; False — архив не появился"""
+        if mode != MODE_CREATE:
+            return True
+        path = self.path(entry)
+        created = os.path.isfile(path) and os.path.getsize(path) > 0
+        with self._lock:
+            if created:
+                entry.created = time.time()
+            self._save()
+        return created
+
+    def record_startup(self, entry: CdsEntry, mode: str | None, seconds: float) -> str:
+        """Сохраняет время до готовности игры и возвращает сравнение с архивом и без"""
+        with self._lock:
+            timings = entry.cached if mode == MODE_USE else entry.baseline
+            timings.append(round(seconds, 2))
+            del timings[:-MAX_TIMINGS]
+            self._save()
+            baseline, cached = _average(entry.baseline), _average(entry.cached)
+        if baseline is None or cached is None:
+            return f'{seconds:.1f} s ({"with" if mode == MODE_USE else "without"} class archive)'
+        return f'{seconds:.1f} s; average {cached:.1f} s with class archive vs {baseline:.1f} s without'
+
+
+# Глобальный экземпляр
+_cds_archives: CdsArchives | None = None
+
+
+def get_cds_archives() -> CdsArchives:
+    """Получить глобальный список архивов AppCDS"""
+    global _cds_archives
+    if _cds_archives is None:
+        _cds_archives = CdsArchives()
+    return _cds_archives
@@ -0,0 +1,279 @@
+"""
+Потоковая загрузка и распаковка архивов
+
+tar.gz распаковывается по мере скачивания: файлы пишутся на диск, пока остаток
+архива ещё идёт по сети, а SHA256 считается на лету. Для ZIP, если сервер
+поддерживает Range, сначала читается центральный каталог, после чего записи
+скачиваются последовательными большими диапазонами и сразу распаковываются
+(SHA256 считается по тем же блокам). Если Range не поддерживается, ZIP
+скачивается во временный файл одним проходом.
+Единственная корневая папка архива (jdk-17.0.x+y-jre/) отбрасывается, поэтому
+файлы сразу попадают в целевую папку без последующих переносов.
+"""
+import hashlib
+import io
+import logging
+import os
+import shutil
+import tarfile
+import tempfile
+import zipfile
+from collections.abc import Callable
+
+import requests
+
+from version_installer import USER_AGENT
+
+CHUNK_SIZE = 1024 * 256
+# Размер одного Range-запроса при чтении ZIP по сети
+RANGE_BLOCK_SIZE = 1024 * 1024 * 8
+
+ProgressCallback = Callable[[int, int], None]
+
+
+class ArchiveError(RuntimeError):
+    pass
+
+
+def _strip_root(name: str) -> str | None:
+    """Отбрасывает корневую папку и проверяет, что путь не выходит за пределы цели"""
+    parts = [p for p in name.replace('\\', '/').split('/') if p and p != '.']
+    if len(parts) < 2 or '..' in parts:
+        return None
+    return '/'.join(parts[1:])
+
+
+class _HashingReader(io.RawIOBase):
+    """Читает поток ответа, считая SHA256 и прогресс"""
+
+    def __init__(self, raw, total: int, progress: ProgressCallback | None) -> None:
+        self._raw = raw
+        self._total = total
+        self._progress = progress
+        self.sha256 = hashlib.sha256()
+        self.read_bytes = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        data = self._raw.read(len(buffer))
+        if not data:
+            return 0
+        n = len(data)
+        buffer[:n] = data
+        self.sha256.update(data)
+        self.read_bytes += n
+        if self._progress:
+            self._progress(self.read_bytes, self._total)
+        return n
+
+    def drain(self) -> None:
+        """Дочитывает хвост архива (паддинг tar), чтобы хэш покрывал весь файл"""
+        while self.read(CHUNK_SIZE):
+            pass
+
+
+def stream_extract_tar_gz(
+    response: requests.Response,
+    target_dir: str,
+    sha256: str | None = None,
+    progress: ProgressCallback | None = None,
+) -> None:
+    """Распаковывает tar.gz прямо из HTTP-ответа"""
+    total = int(response.headers.get('Content-Length') or 0)
+    response.raw.decode_content = False
+    reader = _HashingReader(response.raw, total, progress)
+    buffered = io.BufferedReader(reader, CHUNK_SIZE)
+    with tarfile.open(fileobj=buffered, mode='r|gz') as tf:
+        for member in tf:
+            stripped = _strip_root(member.name)
+            if stripped is None:
+                continue
+            member.name = stripped
+            if member.islnk():
+                link = _strip_root(member.linkname)
+                if link is None:
+                    continue
+                member.linkname = link
+            try:
+                tf.extract(member, target_dir, filter='data')
+            except tarfile.FilterError as e:
+                # Ссылки за пределы папки рантайма пропускаем
+                logging.warning(f'[ARCHIVE] Пропущен {member.name}: {e}')
+    buffered.read()
+    reader.drain()
+    if sha256 and reader.sha256.hexdigest() != sha256.lower():
+        raise ArchiveError(f'SHA256 mismatch: expected {sha256}, got {reader.sha256.hexdigest()}')
+
+
+class HttpRangeFile(io.RawIOBase):
+    """Файл только для чтения поверх HTTP Range-запросов с упреждающим чтением"""
+
+    def __init__(self, session: requests.Session, url: str, size: int, block_size: int = RANGE_BLOCK_SIZE) -> None:
+        self._session = session
+        self._url = url
+        self._size = size
+        self._block_size = block_size
+        self._pos = 0
+        self._buffer = b''
+        self._buffer_start = 0
+        self.requests_made = 0
+        self.bytes_fetched = 0
+        # SHA256 считается по блокам, идущим подряд с начала файла
+        self.sha256 = hashlib.sha256()
+        self._hashed_upto = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        else:
+            self._pos = self._size + offset
+        self._pos = max(0, min(self._pos, self._size))
+        return self._pos
+
+    def _fill(self, start: int, length: int) -> None:
+        head = b''
+        buffer_end = self._buffer_start + len(self._buffer)
+        if self._buffer_start <= start < buffer_end == self._hashed_upto:
+            # Чтение через конец последнего блока: его хвост уже есть, докачиваем только продолжение,
+            # иначе этот участок не попадёт в хэш и hexdigest() скачает его ещё раз
+            head = self._buffer[start - self._buffer_start :]
+            length -= len(head)
+            start = buffer_end
+        elif self._hashed_upto <= start < self._hashed_upto + self._block_size:
+            # Небольшой пропуск после уже прочитанного блока докачиваем, чтобы не рвать цепочку хэша
+            length += start - self._hashed_upto
+            start = self._hashed_upto
+        end = min(self._size, start + max(length, self._block_size)) - 1
+        r = self._session.get(self._url, headers={'Range': f'bytes={start}-{end}'}, timeout=30)
+        if r.status_code != 206:
+            raise ArchiveError(f'Range request failed with HTTP {r.status_code}')
+        self.requests_made += 1
+        self.bytes_fetched += len(r.content)
+        if start == self._hashed_upto:
+            self.sha256.update(r.content)
+            self._hashed_upto += len(r.content)
+        self._buffer = head + r.content
+        self._buffer_start = start - len(head)
+
+    def hexdigest(self) -> str:
+        """SHA256 всего файла; непрочитанные участки докачиваются"""
+        while self._hashed_upto < self._size:
+            self._fill(self._hashed_upto, self._block_size)
+        return self.sha256.hexdigest()
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = self._size - self._pos
+        size = min(size, self._size - self._pos)
+        if size <= 0:
+            return b''
+        offset = self._pos - self._buffer_start
+        if not (0 <= offset and offset + size <= len(self._buffer)):
+            self._fill(self._pos, size)
+            offset = self._pos - self._buffer_start
+        data = self._buffer[offset : offset + size]
+        self._pos += len(data)
+        return data
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+def _extract_zip(zf: zipfile.ZipFile, target_dir: str, progress: ProgressCallback | None, total: int) -> None:
+    done = 0
+    # Записи читаются в порядке их расположения в архиве, чтобы Range-запросы шли последовательно
+    for info in sorted(zf.infolist(), key=lambda i: i.header_offset):
+        stripped = _strip_root(info.filename)
+        done += info.compress_size
+        if stripped is None:
+            continue
+        path = os.path.join(target_dir, *stripped.split('/'))
+        if info.is_dir():
+            os.makedirs(path, exist_ok=True)
+            continue
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with zf.open(info) as src, open(path, 'wb') as dst:
+            shutil.copyfileobj(src, dst, CHUNK_SIZE)
+        # Права доступа из unix-атрибутов (архивы для macOS/Linux)
+        mode = (info.external_attr >> 16) & 0o777
+        if mode and os.name != 'nt':
+            os.chmod(path, mode)
+        if progress:
+            progress(done, total)
+
+
+def _supports_ranges(session: requests.Session, url: str) -> tuple[str, int] | None:
+    """Возвращает (итоговый URL, размер), если сервер отдаёт Range"""
+    try:
+        r = session.head(url, allow_redirects=True, timeout=20)
+    except requests.RequestException:
+        return None
+    size = int(r.headers.get('Content-Length') or 0)
+    if r.status_code == 200 and size and r.headers.get('Accept-Ranges', '').lower() == 'bytes':
+        return r.url, size
+    return None
+
+
+def download_and_extract(
+    url: str,
+    target_dir: str,
+    sha256: str | None = None,
+    progress: ProgressCallback | None = None,
+    session: requests.Session | None = None,
+) -> None:
+    """Скачивает архив (.tar.gz или .zip) и распаковывает его в target_dir за один проход"""
+    session = session or requests.Session()
+    session.headers.setdefault('User-Agent', USER_AGENT)
+    os.makedirs(target_dir, exist_ok=True)
+
+    if url.endswith(('.tar.gz', '.tgz')):
+        with session.get(url, stream=True, timeout=30) as r:
+            r.raise_for_status()
+            stream_extract_tar_gz(r, target_dir, sha256, progress)
+        return
+
+    if not url.endswith('.zip'):
+        raise ArchiveError(f'Unsupported archive type: {url}')
+
+    ranged = _supports_ranges(session, url)
+    if ranged:
+        final_url, size = ranged
+        remote = HttpRangeFile(session, final_url, size)
+        with zipfile.ZipFile(remote) as zf:
+            _extract_zip(zf, target_dir, progress, size)
+        if sha256 and remote.hexdigest() != sha256.lower():
+            raise ArchiveError(f'SHA256 mismatch: expected {sha256}, got {remote.hexdigest()}')
+        return
+
+    # Один проход по сети с подсчётом SHA256, затем распаковка из временного файла
+    with session.get(url, stream=True, timeout=30) as r, tempfile.SpooledTemporaryFile(max_size=1024 * 1024 * 64) as tmp:
+        r.raise_for_status()
+        total = int(r.headers.get('Content-Length') or 0)
+        h = hashlib.sha256()
+        done = 0
+        for chunk in r.iter_content(chunk_size=CHUNK_SIZE):
+            tmp.write(chunk)
+            h.update(chunk)
+            done += len(chunk)
+            if progress:
+                progress(done, total)
+        if sha256 and h.hexdigest() != sha256.lower():
+            raise ArchiveError(f'SHA256 mismatch: expected {sha256}, got {h.hexdigest()}')
+        tmp.seek(0)
+        with zipfile.ZipFile(tmp) as zf:
+            _extract_zip(zf, target_dir, None, total)
@@ -0,0 +1,128 @@
+"""
+Консольные команды лаунчера
+
+    16Launcher launch --version 1.20.1 [--loader fabric] [--user Steve] [--memory 4096]
+    16Launcher provision manifest.json [--dry-run] [--workers 16]
+
+Команды работают без Qt: запуск идёт через LaunchCore с теми же настройками
+(settings.json), кэшами плана запуска, индексом Java, архивами классов и историей
+замеров, что и у окна лаунчера. launch ждёт выхода игры (вывод игры идёт в
+stdout) и возвращает её код выхода, чтобы скрипты могли на него опираться.
+provision ставит версии, загрузчики, Java, моды и ресурспаки по манифесту
+(см. provision.py) и возвращает 1, если что-то поставить не удалось.
+"""
+import argparse
+import logging
+import sys
+
+from launch_core import LaunchCore, LaunchEvents
+from provision import Manifest, ProvisionError, Provisioner
+from util import load_ely_session, load_settings
+from version_installer import DEFAULT_WORKERS
+
+LOADERS = ('vanilla', 'forge', 'fabric', 'optifine', 'quilt', 'neoforge')
+# Код выхода при прерывании с клавиатуры (как у shell для SIGINT)
+EXIT_INTERRUPTED = 130
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='16launcher', description='16Launcher без графического интерфейса')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    launch = commands.add_parser('launch', help='подготовить и запустить игру')
+    launch.add_argument('--version', help='версия Minecraft (по умолчанию — последняя запущенная)')
+    launch.add_argument('--loader', choices=LOADERS, help='загрузчик модов (по умолчанию — последний использованный)')
+    launch.add_argument('--user', help='имя игрока (по умолчанию — последнее использованное)')
+    launch.add_argument('--memory', type=int, help='память для игры в МБ (по умолчанию — из настроек)')
+    launch.add_argument('--ely', action='store_true', help='войти сохранённой сессией Ely.by')
+    launch.add_argument('--quiet', action='store_true', help='не выводить лог игры')
+
+    provision = commands.add_parser('provision', help='установить всё нужное по манифесту')
+    provision.add_argument('manifest', help='путь к JSON-манифесту')
+    provision.add_argument('--dry-run', action='store_true', help='только посчитать, что нужно скачать')
+    provision.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='число параллельных загрузок')
+    return parser
+
+
+def _print_lines(lines: list[str]) -> None:
+    sys.stdout.write('\n'.join(lines) + '\n')
+    sys.stdout.flush()
+
+
+def run_launch(parser: argparse.ArgumentParser, args: argparse.Namespace) -> int:
+    settings = load_settings()
+    ely_session = None
+    if args.ely:
+        saved = load_ely_session(settings)
+        if not saved:
+            parser.error('нет сохранённой сессии Ely.by, войдите через окно лаунчера')
+        ely_session = {'username': saved['username'], 'uuid': saved['uuid'], 'token': saved['access_token']}
+
+    version = args.version or settings.get('last_version')
+    username = ely_session['username'] if ely_session else args.user or settings.get('last_username')
+    if not version:
+        parser.error('не указана версия (--version)')
+    if not username:
+        parser.error('не указано имя игрока (--user)')
+    loader_type = args.loader or (settings.get('last_loader') if not args.version else None) or 'vanilla'
+    memory_mb = args.memory or int(settings.get('memory', 4)) * 1024
+
+    # Ход подготовки уже пишется в logging (stderr и файл лога), в stdout — только вывод игры
+    events = LaunchEvents() if args.quiet else LaunchEvents(log_batch=_print_lines)
+    core = LaunchCore(settings, ely_session, events)
+    try:
+        game_run = core.launch(version, username, loader_type, memory_mb)
+    except KeyboardInterrupt:
+        core.cancel()
+        return EXIT_INTERRUPTED
+    if game_run is None:
+        return 1
+    try:
+        game_run.finished.wait()
+    except KeyboardInterrupt:
+        return EXIT_INTERRUPTED
+    return game_run.process.returncode
+
+
+def _progress_callback() -> dict:
+    """Прогресс общей очереди загрузок в stderr"""
+    state = {'max': 0}
+
+    def set_max(value: int) -> None:
+        state['max'] = value
+
+    def set_progress(value: int) -> None:
+        if state['max']:
+            sys.stderr.write(f'\r{value}/{state["max"]}')
+            sys.stderr.flush()
+
+    def set_status(text: str) -> None:
+        sys.stderr.write(f'\n{text}\n')
+
+    return {'setMax': set_max, 'setProgress': set_progress, 'setStatus': set_status}
+
+
+def run_provision(parser: argparse.ArgumentParser, args: argparse.Namespace) -> int:
+    try:
+        manifest = Manifest.load(args.manifest)
+    except ProvisionError as e:
+        parser.error(str(e))
+    provisioner = Provisioner(max_workers=args.workers, callback=_progress_callback())
+    try:
+        report = provisioner.run(manifest, dry_run=args.dry_run)
+    except KeyboardInterrupt:
+        return EXIT_INTERRUPTED
+    sys.stderr.write('\n')
+    _print_lines([*(f'FAILED {failure}' for failure in report.failed), report.describe()])
+    return 0 if report.ok else 1
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    logging.info(f'[CLI] {args.command}: {vars(args)}')
+    if args.command == 'launch':
+        return run_launch(parser, args)
+    if args.command == 'provision':
+        return run_provision(parser, args)
+    return 2
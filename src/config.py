@@ -3,7 +3,6 @@ import os
 
 from minecraft_launcher_lib.utils import get_minecraft_directory, get_version_list
 
-MINECRAFT_VERSIONS: list[str] = [version['id'] for version in get_version_list() if version['type'] == 'release']
 ELY_CLIENT_ID = '16Launcher'
 RELEASE = False
 ELY_BY_INJECT = '-javaagent:{}=ely.by'
@@ -15,6 +14,8 @@ SHADERPACKS_DIR = os.path.join(MINECRAFT_DIR, 'shaderpacks')
 SETTINGS_PATH: str = os.path.join(MINECRAFT_DIR, 'settings.json')
 LOG_FILE: str = os.path.join(MINECRAFT_DIR, 'launcher_log.txt')
 NEWS_FILE: str = os.path.join(MINECRAFT_DIR, 'launcher_news.json')
+CACHE_DIR: str = os.path.join(MINECRAFT_DIR, 'cache')
+JAVA_DIR: str = os.path.join(MINECRAFT_DIR, 'java')
 """
 ELYBY_API_URL: str = 'https://authserver.ely.by/api/'
 ELYBY_SKINS_URL: str = 'https://skinsystem.ely.by/skins/'
@@ -93,9 +94,22 @@ default_settings = {
     'last_loader': 'vanilla',
     'show_snapshots': False,
     'auto_install_java': False,
+    # Интервал замеров ресурсов процесса игры в секундах (0 — не замерять)
+    'resource_monitor_interval': 2.0,
+    # Подбор памяти по GC-логу: 'off', 'recommend' (только рекомендации) или 'apply'
+    'gc_tuning': 'off',
+    # Архив классов AppCDS для ускорения повторных запусков (Java 13+)
+    'appcds': False,
+    # Прогрев jar-файлов игры в кэше ОС при запуске и в простое
+    'prewarm': False,
+    # Сколько установок версий и загрузчиков может идти одновременно
+    'max_parallel_installs': 2,
     # Обновления лаунчера
     'check_updates_on_start': True,
     'auto_update': False,
+    # Логирование: общий уровень и уровни подсистем ({"mod_manager": "DEBUG", "urllib3": "WARNING"})
+    'log_level': 'INFO',
+    'log_levels': {},
     # Ely.by session data
     'ely_access_token': '',
     'ely_username': '',
@@ -149,3 +163,13 @@ nouns = [
 ]
 numbers = ['123', '42', '99', '2023', '777', '1337', '69', '100', '1', '0']
 versions = 'versions'
+
+
+def __getattr__(name: str):
+    # Список версий запрашивается по сети: при первом обращении, а не при импорте config
+    # (консольный запуск обходится без него)
+    if name == 'MINECRAFT_VERSIONS':
+        global MINECRAFT_VERSIONS
+        MINECRAFT_VERSIONS = [version['id'] for version in get_version_list() if version['type'] == 'release']
+        return MINECRAFT_VERSIONS
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
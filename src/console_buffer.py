@@ -0,0 +1,140 @@
+"""
+Кольцевой буфер строк консоли
+
+Хранит записи (время, уровень, текст) в заранее выделенном списке фиксированной
+ёмкости: добавление и вытеснение старых записей — O(1), доступ по индексу — O(1),
+поэтому представление может запрашивать только видимые строки. Уровень строки
+определяется одним заранее скомпилированным регулярным выражением.
+"""
+import re
+import time
+from typing import NamedTuple
+
+CONSOLE_CAPACITY = 100_000
+
+LEVEL_INFO = 0
+LEVEL_ERROR = 1
+LEVEL_WARN = 2
+LEVEL_SUCCESS = 3
+LEVEL_PROCESS = 4
+LEVEL_LAUNCH = 5
+
+LEVEL_NAMES = {
+    LEVEL_INFO: 'INFO',
+    LEVEL_ERROR: 'ERROR',
+    LEVEL_WARN: 'WARN',
+    LEVEL_SUCCESS: 'SUCCESS',
+    LEVEL_PROCESS: 'PROCESS',
+    LEVEL_LAUNCH: 'LAUNCH',
+}
+
+LEVEL_COLORS = {
+    LEVEL_INFO: '#ffffff',  # Белый по умолчанию
+    LEVEL_ERROR: '#ff6b6b',  # Красный для ошибок
+    LEVEL_WARN: '#ffa500',  # Оранжевый для предупреждений
+    LEVEL_SUCCESS: '#4ecdc4',  # Зеленый для успеха
+    LEVEL_PROCESS: '#74c0fc',  # Голубой для процессов
+    LEVEL_LAUNCH: '#8ce99a',  # Светло-зеленый для запуска
+}
+
+# Одна группа на уровень; при нескольких метках в строке решает первая найденная
+_LEVEL_RE = re.compile(
+    r'(?P<error>ERROR|Failed|FATAL)'
+    r'|(?P<warn>WARN)'
+    r'|(?P<success>\[SUCCESS\]|(?i:successfully|completed))'
+    r'|(?P<process>\[INSTALL\]|\[BUILD\])'
+    r'|(?P<launch>\[LAUNCH\])'
+)
+_GROUP_LEVELS = {
+    'error': LEVEL_ERROR,
+    'warn': LEVEL_WARN,
+    'success': LEVEL_SUCCESS,
+    'process': LEVEL_PROCESS,
+    'launch': LEVEL_LAUNCH,
+}
+
+
+def classify(text: str) -> int:
+    """Уровень строки по первой найденной метке"""
+    match = _LEVEL_RE.search(text)
+    return _GROUP_LEVELS[match.lastgroup] if match else LEVEL_INFO
+
+
+class LogRecord(NamedTuple):
+    timestamp: float
+    level: int
+    text: str
+    # Номер запуска, к которому относится строка (0 — сообщения самого лаунчера)
+    launch_id: int = 0
+
+
+class ConsoleBuffer:
+    """Кольцевой буфер записей консоли фиксированной ёмкости"""
+
+    def __init__(self, capacity: int = CONSOLE_CAPACITY) -> None:
+        self.capacity = capacity
+        self._items: list[LogRecord | None] = [None] * capacity
+        self._start = 0
+        self._count = 0
+        # Сквозной номер первой хранимой записи: номер не меняется при вытеснении соседей
+        self.first_seq = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index: int) -> LogRecord:
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        return self._items[(self._start + index) % self.capacity]
+
+    @property
+    def next_seq(self) -> int:
+        return self.first_seq + self._count
+
+    def overflow(self, count: int) -> int:
+        """Сколько старых записей будет вытеснено при добавлении count новых"""
+        return max(0, self._count + min(count, self.capacity) - self.capacity)
+
+    def drop_front(self, count: int) -> None:
+        count = min(count, self._count)
+        for i in range(count):
+            # Отпускаем ссылки, чтобы вытесненные строки не держали память
+            self._items[(self._start + i) % self.capacity] = None
+        self._start = (self._start + count) % self.capacity
+        self._count -= count
+        self.first_seq += count
+
+    def extend(self, records: list[LogRecord]) -> None:
+        """Добавляет записи; если места нет — вытесняет самые старые"""
+        if len(records) > self.capacity:
+            self.first_seq += len(records) - self.capacity
+            records = records[-self.capacity :]
+        self.drop_front(self.overflow(len(records)))
+        end = (self._start + self._count) % self.capacity
+        head = min(len(records), self.capacity - end)
+        self._items[end : end + head] = records[:head]
+        self._items[: len(records) - head] = records[head:]
+        self._count += len(records)
+
+    def clear(self) -> None:
+        self.first_seq = self.next_seq
+        self._items = [None] * self.capacity
+        self._start = 0
+        self._count = 0
+
+    def get_seq(self, seq: int) -> LogRecord | None:
+        """Запись по сквозному номеру или None, если она уже вытеснена"""
+        index = seq - self.first_seq
+        return self[index] if 0 <= index < self._count else None
+
+    @staticmethod
+    def make_records(
+        messages: list[str], timestamp: float | None = None, level: int | None = None, launch_id: int = 0
+    ) -> list[LogRecord]:
+        """Записи для строк; level задаёт уровень (и цвет) явно вместо определения по тексту"""
+        now = time.time() if timestamp is None else timestamp
+        if level is not None:
+            return [LogRecord(now, level, text, launch_id) for text in messages]
+        return [LogRecord(now, classify(text), text, launch_id) for text in messages]
@@ -0,0 +1,262 @@
+"""
+Поиск по истории консоли
+
+Строки ConsoleBuffer индексируются блоками по BLOCK_LINES: для каждого слова и
+тега ([INSTALL], [Render thread/WARN]) хранится список блоков, где они встречаются,
+а для уровней — список строк. Запрос сначала сужается по индексу до нескольких
+блоков, затем строки этих блоков проверяются точно. Списки растут только в конец
+и остаются отсортированными, вытесненное из буфера отсекается бинарным поиском и
+периодически вычищается. Если новый запрос уточняет предыдущий (допечатали
+символ), проверяются только прежние совпадения и строки, пришедшие после них.
+"""
+import re
+from bisect import bisect_left
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+
+from console_buffer import ConsoleBuffer, LogRecord
+
+# Теги в квадратных скобках, кроме времени: [MC OUT], [INSTALL], [Render thread/WARN]
+_TAG_RE = re.compile(r'\[([A-Za-z][^\[\]\n]{0,48})\]')
+_TAG_TOKEN_RE = re.compile(r'(?:^|\s)tag:(?:"([^"]+)"|(\S+))')
+_WORD_RE = re.compile(r'\w+')
+BLOCK_LINES = 64
+MAX_SESSIONS = 20
+
+
+@dataclass(frozen=True)
+class SearchQuery:
+    text: str = ''
+    levels: frozenset[int] = frozenset()
+    tag: str = ''
+    regex: bool = False
+    # Искать только начиная с этого сквозного номера (например, в текущем запуске)
+    since_seq: int = 0
+    # Только строки этого запуска (при одновременных играх их вывод перемешан); 0 — все
+    launch_id: int = 0
+
+    @classmethod
+    def parse(
+        cls, raw: str, levels: Iterable[int] = (), regex: bool = False, since_seq: int = 0, launch_id: int = 0
+    ) -> 'SearchQuery':
+        """Разбирает строку поиска; tag:<имя> или tag:"имя с пробелами" задаёт фильтр по тегу"""
+        tag = ''
+        match = _TAG_TOKEN_RE.search(raw)
+        if match:
+            tag = match.group(1) or match.group(2)
+            raw = raw[: match.start()] + raw[match.end() :]
+        return cls(raw.strip(), frozenset(levels), tag.lower(), regex, since_seq, launch_id)
+
+    @property
+    def empty(self) -> bool:
+        return not (self.text or self.levels or self.tag or self.launch_id)
+
+    def matcher(self) -> Callable[[str], bool]:
+        """Проверка текста строки; бросает re.error для некорректного регулярного выражения"""
+        if not self.text:
+            return lambda text: True
+        if self.regex:
+            pattern = re.compile(self.text, re.IGNORECASE)
+            return lambda text: pattern.search(text) is not None
+        needle = self.text.lower()
+        return lambda text: needle in text.lower()
+
+    def accepter(self) -> Callable[[LogRecord], bool]:
+        """Полная проверка записи: запуск, уровень, тег и текст"""
+        match = self.matcher()
+        levels = self.levels
+        tag = self.tag
+        launch_id = self.launch_id
+
+        def accepts(record: LogRecord) -> bool:
+            if launch_id and record.launch_id != launch_id:
+                return False
+            if levels and record.level not in levels:
+                return False
+            if tag and (tag not in record.text.lower() or not any(tag in t for t in line_tags(record.text))):
+                return False
+            return match(record.text)
+
+        return accepts
+
+    def refines(self, other: 'SearchQuery') -> bool:
+        """Результат этого запроса — подмножество результата other"""
+        return (
+            not self.regex
+            and not other.regex
+            and self.levels == other.levels
+            and self.tag == other.tag
+            and self.launch_id == other.launch_id
+            and self.since_seq >= other.since_seq
+            and other.text.lower() in self.text.lower()
+        )
+
+
+def line_tags(text: str) -> set[str]:
+    return {tag.lower() for tag in _TAG_RE.findall(text)}
+
+
+@dataclass
+class Session:
+    first_seq: int
+    label: str
+    started: float
+    launch_id: int = 0
+
+
+@dataclass
+class _CachedResult:
+    query: SearchQuery
+    seqs: list[int]
+    next_seq: int
+
+
+@dataclass
+class LogIndex:
+    """Инвертированный индекс по строкам ConsoleBuffer"""
+
+    buffer: ConsoleBuffer
+    sessions: list[Session] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        # слово/тег -> номера блоков, уровень -> сквозные номера строк
+        self._words: dict[str, list[int]] = {}
+        self._tags: dict[str, list[int]] = {}
+        self._levels: dict[int, list[int]] = {}
+        self._next_block = self.buffer.next_seq // BLOCK_LINES
+        self._pruned_at = self.buffer.first_seq
+        self._cache: _CachedResult | None = None
+
+    def add(self, first_seq: int, records: list[LogRecord]) -> None:
+        """Индексирует записи, добавленные в буфер начиная с номера first_seq"""
+        levels = self._levels
+        for seq, record in enumerate(records, first_seq):
+            bucket = levels.get(record.level)
+            if bucket is None:
+                levels[record.level] = [seq]
+            else:
+                bucket.append(seq)
+        self._index_blocks()
+        if self.buffer.first_seq - self._pruned_at > self.buffer.capacity // 2:
+            self.prune()
+
+    def _index_blocks(self) -> None:
+        buffer = self.buffer
+        # Блоки, целиком вытесненные до индексации, пропускаем
+        self._next_block = max(self._next_block, buffer.first_seq // BLOCK_LINES)
+        while (self._next_block + 1) * BLOCK_LINES <= buffer.next_seq:
+            block = self._next_block
+            lo = max(block * BLOCK_LINES, buffer.first_seq)
+            first = buffer.first_seq
+            text = '\n'.join(buffer[seq - first].text for seq in range(lo, (block + 1) * BLOCK_LINES))
+            for table, keys in (
+                (self._tags, {tag.lower() for tag in _TAG_RE.findall(text)}),
+                (self._words, set(_WORD_RE.findall(text.lower()))),
+            ):
+                for key in keys:
+                    bucket = table.get(key)
+                    if bucket is None:
+                        table[key] = [block]
+                    else:
+                        bucket.append(block)
+            self._next_block += 1
+
+    def prune(self) -> None:
+        """Удаляет из индекса вытесненные из буфера строки"""
+        first = self.buffer.first_seq
+        first_block = first // BLOCK_LINES
+        for table, bound in ((self._words, first_block), (self._tags, first_block), (self._levels, first)):
+            for key in list(table):
+                bucket = table[key]
+                cut = bisect_left(bucket, bound)
+                if cut == len(bucket):
+                    del table[key]
+                elif cut:
+                    del bucket[:cut]
+        self.sessions = [s for s in self.sessions if s.first_seq >= first] or self.sessions[-1:]
+        self._pruned_at = first
+
+    def clear(self) -> None:
+        self._words.clear()
+        self._tags.clear()
+        self._levels.clear()
+        self._cache = None
+        self._next_block = self.buffer.next_seq // BLOCK_LINES
+        self._pruned_at = self.buffer.first_seq
+
+    def begin_session(self, label: str, started: float, launch_id: int = 0) -> Session:
+        session = Session(self.buffer.next_seq, label, started, launch_id)
+        self.sessions.append(session)
+        del self.sessions[:-MAX_SESSIONS]
+        return session
+
+    @staticmethod
+    def _blocks_matching(table: dict[str, list[int]], needle: str) -> set[int]:
+        """Блоки, где есть ключ, содержащий needle"""
+        blocks: set[int] = set()
+        for key, bucket in table.items():
+            if needle in key:
+                blocks.update(bucket)
+        return blocks
+
+    def _candidates(self, query: SearchQuery, start: int) -> Iterable[int] | None:
+        """Кандидаты по индексу по возрастанию; None — индекс ничего не сужает"""
+        blocks: set[int] | None = None
+        words = _WORD_RE.findall(query.text.lower()) if query.text and not query.regex else []
+        for word in words:
+            found = self._blocks_matching(self._words, word)
+            blocks = found if blocks is None else blocks & found
+        if query.tag:
+            found = self._blocks_matching(self._tags, query.tag)
+            blocks = found if blocks is None else blocks & found
+
+        end = self.buffer.next_seq
+        tail_start = max(self._next_block * BLOCK_LINES, start)
+        seqs: list[int] | None = None
+        if blocks is not None:
+            seqs = []
+            for block in sorted(blocks):
+                seqs.extend(range(max(block * BLOCK_LINES, start), min((block + 1) * BLOCK_LINES, tail_start)))
+            # Хвост из неполного блока ещё не проиндексирован
+            seqs.extend(range(tail_start, end))
+        if query.levels:
+            merged: list[int] = []
+            for level in query.levels:
+                bucket = self._levels.get(level, [])
+                merged.extend(bucket[bisect_left(bucket, start) :])
+            if seqs is None:
+                seqs = sorted(merged)
+            else:
+                allowed = set(merged)
+                seqs = [seq for seq in seqs if seq in allowed]
+        return seqs
+
+    def search(self, query: SearchQuery) -> list[int]:
+        """Сквозные номера подходящих строк по возрастанию"""
+        buffer = self.buffer
+        start = max(buffer.first_seq, query.since_seq)
+        end = buffer.next_seq
+        if query.empty:
+            return list(range(start, end))
+        accepts = query.accepter()
+
+        cache = self._cache
+        if cache and query.refines(cache.query):
+            # Уточнение предыдущего запроса: проверяем только прежние совпадения и новые строки
+            candidates = cache.seqs[bisect_left(cache.seqs, start) :]
+            fresh_start = max(cache.next_seq, start)
+            fresh = self._candidates(query, fresh_start)
+            candidates += fresh if fresh is not None else range(fresh_start, end)
+        else:
+            indexed = self._candidates(query, start)
+            candidates = indexed if indexed is not None else range(start, end)
+
+        first = buffer.first_seq
+        result = [seq for seq in candidates if accepts(buffer[seq - first])]
+        self._cache = _CachedResult(query, result, end)
+        return result
+
+    def matches(self, query: SearchQuery, first_seq: int, records: list[LogRecord]) -> list[int]:
+        """Номера подходящих строк среди только что добавленных (для живого фильтра)"""
+        accepts = query.accepter()
+        return [seq for seq, record in enumerate(records, first_seq) if seq >= query.since_seq and accepts(record)]
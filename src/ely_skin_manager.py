@@ -1,27 +1,32 @@
 import logging
 import os
 import shutil
+import time
+from uuid import uuid4
 
 import requests
 
 from config import MINECRAFT_DIR, SKINS_DIR, ELYBY_SKIN_UPLOAD_URL, ELYBY_SKINS_URL, ELYBY_TEXTURES_URL
 
+# Таймаут запросов к Ely.by, секунды
+SKIN_TIMEOUT = 10
+# Скин моложе этого срока при запуске не перекачивается, секунды
+SKIN_MAX_AGE = 6 * 60 * 60
+
 
 class ElySkinManager:
     @staticmethod
     def apply_skin(username, version, is_legacy):
         """Применяет скин с учетом версии"""
-        skin_url = ElySkinManager.get_skin_url(username)
-        if not skin_url:
-            return False
-
-        # Для новых версий - через authlib
+        # Для новых версий скин отдаёт authlib-injector, локальная копия нужна лаунчеру
+        downloaded = ElySkinManager.download_skin(username, max_age=SKIN_MAX_AGE)
         if not is_legacy:
-            return ElySkinManager.download_skin(username)
+            return downloaded
 
-        # Для старых версий - напрямую в файлы игры
-        skin_path = os.path.join(MINECRAFT_DIR, 'skins', f'{username}.png')
-        ElySkinManager.download_skin_file(skin_url, skin_path)
+        # Для старых версий - напрямую в файлы игры (без сети подойдёт и устаревшая копия)
+        skin_path = os.path.join(SKINS_DIR, f'{username}.png')
+        if not os.path.isfile(skin_path):
+            return False
         return ElySkinManager.inject_legacy_skin(skin_path, version)
 
     @staticmethod
@@ -42,7 +47,7 @@ class ElySkinManager:
         if not ELYBY_TEXTURES_URL:
             return None
         try:
-            response = requests.get(f'{ELYBY_TEXTURES_URL}{username}')
+            response = requests.get(f'{ELYBY_TEXTURES_URL}{username}', timeout=SKIN_TIMEOUT)
             if response.status_code == 200:
                 data = response.json()
                 return data.get('textures', {}).get('SKIN', {}).get('url')
@@ -59,25 +64,38 @@ class ElySkinManager:
         return f'{ELYBY_SKINS_URL}{username}.png'
 
     @staticmethod
-    def download_skin(username):
-        """Скачиваем скин с Ely.by"""
+    def download_skin(username, max_age=None):
+        """Скачиваем скин с Ely.by; при max_age свежая локальная копия не перекачивается"""
         if not ELYBY_SKINS_URL:
             logging.warning('URL для скинов не настроен в config.py')
             return False
+        dest_path = os.path.join(SKINS_DIR, f'{username}.png')
+        try:
+            if max_age is not None and time.time() - os.path.getmtime(dest_path) < max_age:
+                return True
+        except OSError:
+            pass
+        tmp_path = f'{dest_path}.{uuid4().hex[:12]}.part'
         try:
             skin_url = ElySkinManager.get_skin_image_url(username)
             if not skin_url:
                 return False
-            response = requests.get(skin_url, stream=True)
-            if response.status_code == 200:
+            with requests.get(skin_url, stream=True, timeout=SKIN_TIMEOUT) as response:
+                if response.status_code != 200:
+                    return False
                 os.makedirs(SKINS_DIR, exist_ok=True)
-                dest_path = os.path.join(SKINS_DIR, f'{username}.png')
-                with open(dest_path, 'wb') as f:
+                # Через временный файл: кэш скина читают параллельно (лаунчер, legacy-запуск)
+                with open(tmp_path, 'wb') as f:
                     response.raw.decode_content = True
                     shutil.copyfileobj(response.raw, f)
-                return True
+            os.replace(tmp_path, dest_path)
+            return True
         except Exception as e:
             logging.exception(f'Ошибка при загрузке скина: {e}')
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
         return False
 
     @staticmethod
@@ -100,7 +118,7 @@ class ElySkinManager:
                     'variant': (None, variant),
                 }
 
-                response = requests.put(ELYBY_SKIN_UPLOAD_URL, headers=headers, files=files)
+                response = requests.put(ELYBY_SKIN_UPLOAD_URL, headers=headers, files=files, timeout=SKIN_TIMEOUT)
 
                 if response.status_code == 200:
                     return True, 'Скин успешно загружен!'
@@ -122,6 +140,7 @@ class ElySkinManager:
             response = requests.delete(
                 ELYBY_SKIN_UPLOAD_URL,
                 headers=headers,
+                timeout=SKIN_TIMEOUT,
             )
 
             if response.status_code == 200:
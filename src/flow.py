@@ -62,11 +62,15 @@ __logged_level = 0
 def logged(func: Callable[..., Any]) -> Callable[..., Any]:
     def wrapper(*args: tuple[Any, ...], **kwargs: dict[str, Any]) -> Any:
         global __logged_level
-        logging.debug(' ' * 4 * __logged_level + f'Running {func.__name__}')
+        # Строки не собираем, если DEBUG выключен
+        debug = logging.getLogger().isEnabledFor(logging.DEBUG)
+        if debug:
+            logging.debug('%sRunning %s', ' ' * 4 * __logged_level, func.__name__)
         __logged_level += 1
         r = func(*args, **kwargs)
         __logged_level -= 1
-        logging.debug(' ' * 4 * __logged_level + f'Finished {func.__name__}')
+        if debug:
+            logging.debug('%sFinished %s', ' ' * 4 * __logged_level, func.__name__)
         return r
 
     return wrapper
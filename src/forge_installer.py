@@ -0,0 +1,186 @@
+"""
+Установка Forge с предварительной проверкой библиотек
+
+Установщик Forge скачивается один раз в MINECRAFT_DIR/cache/forge. Из него читаются
+install_profile.json и version.json, после чего все упомянутые в них библиотеки
+проверяются по SHA1 параллельно, а битые и отсутствующие докачиваются одним пакетом.
+Процессоры Forge запускаются только когда все файлы гарантированно на месте.
+"""
+import json
+import logging
+import os
+import shutil
+import tempfile
+import zipfile
+
+import requests
+
+from config import CACHE_DIR
+from java_runtime import DEFAULT_COMPONENT, DEFAULT_MAJOR, get_runtime_manager
+from version_installer import (
+    DEFAULT_WORKERS,
+    Callback,
+    DownloadItem,
+    Downloader,
+    install_version,
+    library_items,
+    library_path,
+)
+
+FORGE_MAVEN_URL = 'https://maven.minecraftforge.net/net/minecraftforge/forge'
+FORGE_INSTALLERS_DIR: str = os.path.join(CACHE_DIR, 'forge')
+
+
+class ForgeInstallError(RuntimeError):
+    pass
+
+
+def installer_url(forge_version: str) -> str:
+    return f'{FORGE_MAVEN_URL}/{forge_version}/forge-{forge_version}-installer.jar'
+
+
+def _fetch_installer_sha1(url: str) -> str | None:
+    try:
+        r = requests.get(f'{url}.sha1', timeout=10)
+        if r.status_code == 200:
+            value = r.text.strip().split()[0].lower()
+            if len(value) == 40:
+                return value
+    except (requests.RequestException, IndexError):
+        pass
+    return None
+
+
+def _is_valid_zip(path: str) -> bool:
+    try:
+        with zipfile.ZipFile(path) as zf:
+            return 'install_profile.json' in zf.namelist()
+    except (OSError, zipfile.BadZipFile):
+        return False
+
+
+def download_installer(forge_version: str, downloader: Downloader) -> str:
+    """Скачивает установщик Forge в кэш (или берёт уже скачанный)"""
+    path = os.path.join(FORGE_INSTALLERS_DIR, f'forge-{forge_version}-installer.jar')
+    if _is_valid_zip(path):
+        return path
+    url = installer_url(forge_version)
+    downloader.fetch(DownloadItem(url, path, _fetch_installer_sha1(url), None, 'installer'), check_existing=False)
+    if not _is_valid_zip(path):
+        raise ForgeInstallError(f'Forge installer {forge_version} is damaged')
+    return path
+
+
+def _extract_member(zf: zipfile.ZipFile, member: str, target: str) -> None:
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with zf.open(member) as src, open(target, 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+
+
+def _set_status(callback: Callback, text: str) -> None:
+    if 'setStatus' in callback:
+        callback['setStatus'](text)
+
+
+def _write_json(path: str, data: dict) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=4)
+
+
+def _read_version(version_id: str, minecraft_dir: str) -> dict:
+    try:
+        with open(os.path.join(minecraft_dir, 'versions', version_id, f'{version_id}.json'), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _default_java(version_data: dict, minecraft_dir: str, callback: Callback | None = None) -> str:
+    """Java для процессоров: рантайм лаунчера под javaVersion профиля (при необходимости ставится), java из PATH — крайний случай"""
+    java_version = version_data.get('javaVersion') or {}
+    component = java_version.get('component') or DEFAULT_COMPONENT
+    major = int(java_version.get('majorVersion') or DEFAULT_MAJOR)
+    manager = get_runtime_manager()
+    java = manager.find(component, major)
+    if java:
+        return java
+    try:
+        return manager.ensure(component, major, callback)
+    except Exception as e:
+        logging.warning(f'[FORGE] Не удалось установить Java {major} для процессоров: {e}')
+
+    # Рантайм, поставленный minecraft_launcher_lib в runtime/ до перехода на MINECRAFT_DIR/java
+    from minecraft_launcher_lib.runtime import get_executable_path
+
+    runtime_java = get_executable_path(component, minecraft_dir)
+    return runtime_java or 'java'
+
+
+def install_forge(
+    forge_version: str,
+    minecraft_dir: str,
+    callback: Callback | None = None,
+    java: str | None = None,
+    max_workers: int = DEFAULT_WORKERS,
+) -> str:
+    """Устанавливает Forge и возвращает id установленного профиля"""
+    callback = callback or {}
+    downloader = Downloader(max_workers=max_workers, callback=callback)
+
+    _set_status(callback, 'Загрузка установщика Forge')
+    installer_path = download_installer(forge_version, downloader)
+
+    with tempfile.TemporaryDirectory(prefix='16launcher-forge-') as tempdir, zipfile.ZipFile(installer_path) as zf:
+        profile = json.loads(zf.read('install_profile.json'))
+        names = set(zf.namelist())
+
+        if 'install' in profile:
+            # Старый формат (до 1.13): профиль версии лежит внутри install_profile.json
+            install = profile['install']
+            version_id = install['target']
+            mc_version = install['minecraft']
+            version_data = profile['versionInfo']
+            if install.get('filePath') in names:
+                _extract_member(zf, install['filePath'], library_path(install['path'], minecraft_dir))
+        else:
+            version_id = profile['version']
+            mc_version = profile['minecraft']
+            version_data = json.loads(zf.read('version.json'))
+            # Артефакты Forge, которых нет в maven, поставляются внутри установщика
+            for name in names:
+                if name.startswith('maven/') and not name.endswith('/'):
+                    _extract_member(zf, name, os.path.join(minecraft_dir, 'libraries', name[len('maven/') :]))
+
+        _write_json(os.path.join(minecraft_dir, 'versions', version_id, f'{version_id}.json'), version_data)
+
+        # Библиотеки процессоров проверяются и докачиваются в одном пакете с файлами профиля
+        processor_libs, _natives = library_items(profile.get('libraries', []), version_id, minecraft_dir)
+        report = install_version(
+            version_id,
+            minecraft_dir,
+            callback=callback,
+            max_workers=max_workers,
+            extra_items=processor_libs,
+        )
+        if report.downloaded:
+            logging.info(f'[FORGE] Докачано/исправлено файлов: {len(report.downloaded)}')
+
+        if profile.get('processors'):
+            from minecraft_launcher_lib.forge import forge_processors
+
+            lzma_path = os.path.join(tempdir, 'client.lzma')
+            if 'data/client.lzma' in names:
+                _extract_member(zf, 'data/client.lzma', lzma_path)
+            _set_status(callback, 'Запуск процессоров Forge')
+            forge_processors(
+                profile,
+                minecraft_dir,
+                lzma_path,
+                installer_path,
+                callback,
+                java or _default_java({**_read_version(mc_version, minecraft_dir), **version_data}, minecraft_dir, callback),
+            )
+
+    logging.info(f'[FORGE] {version_id} установлен')
+    return version_id
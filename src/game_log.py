@@ -0,0 +1,199 @@
+"""
+Приём вывода игры
+
+stdout/stderr JVM читаются большими блоками, строки режутся пачкой, а в UI
+уходят порциями по таймеру (по умолчанию раз в 50 мс) вместо сигнала на каждую
+строку. Если консоль не успевает, самые старые строки отбрасываются, а вместо них
+выводится одна строка-сводка. Полный вывод пишется как есть в переданный поток
+(сжатый лог сессии), минуя logging. StartupTimer по тем же порциям отмечает
+этапы загрузки игры (окно LWJGL, загрузка модов) и момент, когда она готова.
+"""
+import logging
+import re
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from typing import IO
+
+READ_CHUNK = 64 * 1024
+FLUSH_INTERVAL = 0.05
+# Сколько строк максимум отдаётся в UI за один тик и сколько может ждать в очереди
+MAX_BATCH = 2000
+MAX_PENDING = 20000
+
+# Строки, после которых игра считается загруженной (звуковой движок стартует после ресурсов)
+STARTUP_MARKERS = ('Sound engine started',)
+# Промежуточные этапы загрузки: {имя: регулярное выражение}. Для Fabric/Quilt
+# «Loading N mods» — конец поиска модов, для Forge/NeoForge — конец загрузки модов
+STARTUP_MILESTONES: dict[str, str] = {
+    'window': r'Backend library: LWJGL|LWJGL Version: ',
+    'mods_loaded': (
+        r'Loading \d+ mods|Forge Mod Loader has successfully loaded|'
+        r'Injecting existing registry data into this CLIENT instance'
+    ),
+}
+
+DeliverCallback = Callable[[list[str]], None]
+
+
+class StartupTimer:
+    """Время от старта процесса до этапов загрузки и первой строки-маркера готовности игры"""
+
+    def __init__(
+        self,
+        on_ready: Callable[[float], None],
+        markers: tuple[str, ...] = STARTUP_MARKERS,
+        milestones: dict[str, str] = STARTUP_MILESTONES,
+    ) -> None:
+        self.on_ready = on_ready
+        self.markers = markers
+        self._milestone_re = re.compile('|'.join(f'(?P<{name}>{pattern})' for name, pattern in milestones.items()))
+        self.started = time.monotonic()
+        self.elapsed: float | None = None
+        # {имя этапа: секунды от старта процесса}, первая строка вывода — first_output
+        self.milestones: dict[str, float] = {}
+
+    def feed(self, lines: list[str]) -> None:
+        if self.elapsed is not None or not lines:
+            return
+        now = time.monotonic() - self.started
+        self.milestones.setdefault('first_output', now)
+        for line in lines:
+            match = self._milestone_re.search(line) if self._milestone_re.pattern else None
+            if match is not None:
+                self.milestones.setdefault(match.lastgroup, now)
+            if any(marker in line for marker in self.markers):
+                self.elapsed = now
+                try:
+                    self.on_ready(self.elapsed)
+                except Exception:
+                    logging.exception('Startup callback failed')
+                return
+
+
+class GameLogPump:
+    """Читает пайпы процесса и отдаёт строки порциями"""
+
+    def __init__(
+        self,
+        deliver: DeliverCallback,
+        raw: IO[bytes] | None = None,
+        interval: float = FLUSH_INTERVAL,
+        max_batch: int = MAX_BATCH,
+        max_pending: int = MAX_PENDING,
+    ) -> None:
+        self.deliver = deliver
+        self.interval = interval
+        self.max_batch = max_batch
+        self._pending: deque[str] = deque(maxlen=max_pending)
+        self._dropped = 0
+        self._lock = threading.Lock()
+        self._raw_lock = threading.Lock()
+        # Поток для полного вывода; закрывается после разбора пайпов
+        self._raw = raw
+        self._readers: list[threading.Thread] = []
+        self._flusher: threading.Thread | None = None
+        self._stop = threading.Event()
+        self.finished = threading.Event()
+        self.total_lines = 0
+        self.total_bytes = 0
+
+    def _write_raw(self, data: bytes) -> None:
+        if self._raw is None:
+            return
+        with self._raw_lock:
+            try:
+                self._raw.write(data)
+            except (OSError, ValueError):
+                pass
+
+    def _push(self, lines: list[str]) -> None:
+        with self._lock:
+            before = len(self._pending)
+            self._pending.extend(lines)
+            # deque с maxlen сам вытесняет самые старые строки
+            self._dropped += before + len(lines) - len(self._pending)
+            self.total_lines += len(lines)
+
+    def _read_pipe(self, pipe: IO[bytes], prefix: str) -> None:
+        tail = b''
+        try:
+            with pipe:
+                read = getattr(pipe, 'read1', pipe.read)
+                while True:
+                    chunk = read(READ_CHUNK)
+                    if not chunk:
+                        break
+                    self.total_bytes += len(chunk)
+                    data = tail + chunk
+                    cut = data.rfind(b'\n')
+                    if cut < 0:
+                        tail = data
+                        continue
+                    tail = data[cut + 1 :]
+                    complete = data[: cut + 1]
+                    self._write_raw(complete)
+                    # Перевод строки не встречается внутри многобайтного символа, поэтому декодируем целыми строками
+                    text = complete.decode(errors='replace')
+                    self._push([f'{prefix} {line}' for line in text.splitlines() if line])
+        except Exception:
+            logging.exception('Failed to stream process pipe')
+        if tail:
+            self._write_raw(tail + b'\n')
+            self._push([f'{prefix} {tail.decode(errors="replace").rstrip()}'])
+
+    def take_batch(self) -> list[str]:
+        """Забирает очередную порцию строк (со сводкой о пропущенных, если были)"""
+        with self._lock:
+            count = min(len(self._pending), self.max_batch)
+            batch = [self._pending.popleft() for _ in range(count)]
+            dropped, self._dropped = self._dropped, 0
+        if dropped:
+            raw_name = getattr(self._raw, 'name', '')
+            where = f'; full output: {raw_name}' if raw_name else ''
+            batch.insert(0, f'[GAME LOG] {dropped} lines skipped, console is overloaded{where}')
+        return batch
+
+    def _flush_loop(self) -> None:
+        try:
+            while True:
+                readers_done = not any(t.is_alive() for t in self._readers)
+                batch = self.take_batch()
+                if batch:
+                    try:
+                        self.deliver(batch)
+                    except Exception:
+                        logging.exception('Game log delivery failed')
+                with self._lock:
+                    empty = not self._pending
+                if (readers_done or self._stop.is_set()) and empty:
+                    break
+                # Пока очередь не разобрана, следующую порцию отдаём без паузы
+                if empty or len(batch) < self.max_batch:
+                    self._stop.wait(self.interval)
+        finally:
+            if self._raw is not None:
+                with self._raw_lock:
+                    try:
+                        self._raw.close()
+                    except OSError:
+                        logging.exception('Failed to close game output log')
+            self.finished.set()
+
+    def start(self, stdout: IO[bytes] | None, stderr: IO[bytes] | None) -> None:
+        for pipe, prefix in ((stdout, '[MC OUT]'), (stderr, '[MC ERR]')):
+            if pipe is None:
+                continue
+            thread = threading.Thread(target=self._read_pipe, args=(pipe, prefix), daemon=True, name=f'game-log{prefix}')
+            thread.start()
+            self._readers.append(thread)
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True, name='game-log-flush')
+        self._flusher.start()
+
+    def stop(self) -> None:
+        """Прекращает доставку после разбора уже прочитанных строк"""
+        self._stop.set()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self.finished.wait(timeout)
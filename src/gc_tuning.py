@@ -0,0 +1,344 @@
+"""
+Подбор параметров памяти по GC-логу
+
+В режиме подбора к запуску добавляется единое GC-логирование JVM
+(-Xlog:gc*, Java 9+). После выхода игры лог разбирается: паузы, заполнение кучи
+после сборки, скорость выделения памяти, humongous-регионы. Статистика последних
+запусков хранится для каждой сборки (версия + загрузчик) в кэше, по ней считается
+рекомендация -Xmx/-Xms, G1HeapRegionSize и MaxGCPauseMillis для следующего запуска,
+ограниченная объёмом физической памяти. В режиме 'apply' рекомендация
+подставляется в аргументы JVM вместо значений из настроек.
+"""
+import ctypes
+import json
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass, field, fields
+
+from config import CACHE_DIR, MINECRAFT_DIR
+
+GC_STATS_PATH: str = os.path.join(CACHE_DIR, 'gc_stats.json')
+GC_LOGS_DIR: str = os.path.join(MINECRAFT_DIR, 'logs', 'gc')
+GC_STATS_FORMAT = 1
+GC_TUNING_MODES = ('off', 'recommend', 'apply')
+# Сколько последних запусков сборки учитывается
+MAX_RUNS = 5
+# Запуски с меньшим числом пауз ничего не говорят о нагрузке
+MIN_PAUSES = 5
+# G1 работает без лишних сборок, когда куча в 2.5–4 раза больше живых данных
+HEAP_TO_LIVE = 3.0
+MIN_XMX_MB = 1024
+MIN_XMS_MB = 512
+HEAP_STEP_MB = 256
+# Системе и прочим программам оставляем не меньше 2 ГБ и четверти памяти
+RESERVED_MEMORY_MB = 2048
+MAX_HEAP_SHARE = 0.75
+# G1 рассчитан примерно на 2048 регионов, размер региона — степень двойки от 1 до 32 МБ
+TARGET_REGIONS = 2048
+MAX_REGION_MB = 32
+DEFAULT_PAUSE_MS = 50
+RELAXED_PAUSE_MS = 100
+# Доля времени в паузах, выше которой куча считается тесной
+GC_TIME_LIMIT = 0.05
+
+_UNITS = {'B': 1 / (1024 * 1024), 'K': 1 / 1024, 'M': 1, 'G': 1024}
+# Причины паузы в скобках бывают со вложенными скобками: Pause Full (System.gc())
+_PAUSE_RE = re.compile(
+    r'^\[(?P<uptime>[\d.]+)s\].*?GC\(\d+\) (?P<kind>Pause [A-Za-z ]+?)(?: \((?:[^()]|\([^()]*\))*\))* '
+    r'(?P<before>\d+)(?P<bu>[BKMG])->(?P<after>\d+)(?P<au>[BKMG])\((?P<cap>\d+)(?P<cu>[BKMG])\) '
+    r'(?P<ms>[\d.]+)ms'
+)
+_REGION_RE = re.compile(r'Heap Region Size: (\d+)([BKMG])', re.IGNORECASE)
+_HUMONGOUS_RE = re.compile(r'Humongous regions: (\d+)->(\d+)')
+_UPTIME_RE = re.compile(r'^\[(?P<uptime>[\d.]+)s\]')
+
+
+@dataclass
+class GcRunStats:
+    """Итог разбора GC-лога одного запуска"""
+
+    uptime: float = 0.0
+    pauses: int = 0
+    young: int = 0
+    mixed: int = 0
+    full: int = 0
+    pause_total_ms: float = 0.0
+    pause_max_ms: float = 0.0
+    pause_p95_ms: float = 0.0
+    heap_after_avg_mb: float = 0.0
+    heap_after_max_mb: float = 0.0
+    # Оценка живых данных: куча после полной сборки или 90-й перцентиль кучи после сборок
+    live_mb: float = 0.0
+    heap_capacity_mb: float = 0.0
+    alloc_rate_mb_s: float = 0.0
+    region_size_mb: float = 0.0
+    humongous_max: int = 0
+    memory_mb: int | None = None
+    recorded: float = 0.0
+
+    @property
+    def gc_time_fraction(self) -> float:
+        return self.pause_total_ms / 1000 / self.uptime if self.uptime else 0.0
+
+
+@dataclass
+class GcRecommendation:
+    xmx_mb: int
+    xms_mb: int
+    region_size_mb: int
+    pause_ms: int
+    reasons: list[str] = field(default_factory=list)
+
+    def describe(self) -> str:
+        return (
+            f'-Xmx{self.xmx_mb}M -Xms{self.xms_mb}M -XX:G1HeapRegionSize={self.region_size_mb}M '
+            f'-XX:MaxGCPauseMillis={self.pause_ms}'
+        )
+
+    def apply(self, jvm_args: list[str]) -> list[str]:
+        """Заменяет в аргументах размеры кучи и параметры G1 на рекомендованные"""
+        replacements = {
+            '-Xmx': f'-Xmx{self.xmx_mb}M',
+            '-Xms': f'-Xms{self.xms_mb}M',
+            '-XX:G1HeapRegionSize=': f'-XX:G1HeapRegionSize={self.region_size_mb}M',
+            '-XX:MaxGCPauseMillis=': f'-XX:MaxGCPauseMillis={self.pause_ms}',
+        }
+        result = [arg for arg in jvm_args if not any(arg.startswith(prefix) for prefix in replacements)]
+        # Параметры G1 имеют смысл, только если сборщик не переключён на другой
+        other_gc = any(arg.startswith('-XX:+Use') and arg.endswith('GC') and arg != '-XX:+UseG1GC' for arg in result)
+        result[:0] = [replacements['-Xmx'], replacements['-Xms']]
+        if not other_gc:
+            result += [replacements['-XX:G1HeapRegionSize='], replacements['-XX:MaxGCPauseMillis=']]
+        return result
+
+
+def physical_memory_mb() -> int | None:
+    """Объём физической памяти: /proc/meminfo, GlobalMemoryStatusEx или sysconf"""
+    try:
+        with open('/proc/meminfo', encoding='ascii') as f:
+            for line in f:
+                if line.startswith('MemTotal:'):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    if os.name == 'nt':
+
+        class _MemoryStatusEx(ctypes.Structure):
+            _fields_ = [
+                ('dwLength', ctypes.c_ulong),
+                ('dwMemoryLoad', ctypes.c_ulong),
+                ('ullTotalPhys', ctypes.c_ulonglong),
+                ('ullAvailPhys', ctypes.c_ulonglong),
+                ('ullTotalPageFile', ctypes.c_ulonglong),
+                ('ullAvailPageFile', ctypes.c_ulonglong),
+                ('ullTotalVirtual', ctypes.c_ulonglong),
+                ('ullAvailVirtual', ctypes.c_ulonglong),
+                ('ullAvailExtendedVirtual', ctypes.c_ulonglong),
+            ]
+
+        status = _MemoryStatusEx()
+        status.dwLength = ctypes.sizeof(status)
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return status.ullTotalPhys // (1024 * 1024)
+        return None
+    try:
+        return os.sysconf('SC_PHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') // (1024 * 1024)
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def gc_log_path(instance: str) -> str:
+    safe = re.sub(r'[^\w.-]+', '_', instance)
+    return os.path.join(GC_LOGS_DIR, f'{safe}-{time.strftime("%Y%m%d-%H%M%S")}.log')
+
+
+def gc_log_args(path: str, java_major: int | None) -> list[str]:
+    """Аргументы единого GC-логирования; Java 8 и старше его не поддерживают"""
+    if not java_major or java_major < 9:
+        return []
+    # Путь в кавычках: двоеточие после буквы диска иначе считается разделителем -Xlog
+    return [f'-Xlog:gc*:file="{path}":uptime,level,tags:filecount=0']
+
+
+def _percentile(values: list[float], share: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * share))]
+
+
+def parse_gc_log(path: str) -> GcRunStats:
+    """Разбирает лог -Xlog:gc* (декорации uptime)"""
+    stats = GcRunStats(recorded=time.time())
+    pauses: list[float] = []
+    heap_after: list[float] = []
+    full_after: list[float] = []
+    allocated = 0.0
+    previous: tuple[float, float] | None = None
+    with open(path, encoding='utf-8', errors='replace') as f:
+        for line in f:
+            uptime_match = _UPTIME_RE.match(line)
+            if uptime_match:
+                stats.uptime = max(stats.uptime, float(uptime_match.group('uptime')))
+            match = _PAUSE_RE.match(line)
+            if match:
+                uptime = float(match.group('uptime'))
+                before = int(match.group('before')) * _UNITS[match.group('bu')]
+                after = int(match.group('after')) * _UNITS[match.group('au')]
+                capacity = int(match.group('cap')) * _UNITS[match.group('cu')]
+                ms = float(match.group('ms'))
+                kind = match.group('kind')
+                pauses.append(ms)
+                heap_after.append(after)
+                stats.heap_capacity_mb = max(stats.heap_capacity_mb, capacity)
+                if kind.startswith('Pause Full'):
+                    stats.full += 1
+                    full_after.append(after)
+                elif kind.startswith('Pause Young') and '(Mixed)' in line:
+                    stats.mixed += 1
+                elif kind.startswith('Pause Young'):
+                    stats.young += 1
+                # Выделено между сборками: заполнение перед этой паузой минус остаток после прошлой
+                if previous is not None and before > previous[1]:
+                    allocated += before - previous[1]
+                previous = (uptime, after)
+                continue
+            match = _HUMONGOUS_RE.search(line)
+            if match:
+                stats.humongous_max = max(stats.humongous_max, int(match.group(1)))
+                continue
+            match = _REGION_RE.search(line)
+            if match:
+                stats.region_size_mb = int(match.group(1)) * _UNITS[match.group(2).upper()]
+    stats.pauses = len(pauses)
+    if pauses:
+        stats.pause_total_ms = round(sum(pauses), 1)
+        stats.pause_max_ms = max(pauses)
+        stats.pause_p95_ms = _percentile(pauses, 0.95)
+        stats.heap_after_avg_mb = round(sum(heap_after) / len(heap_after), 1)
+        stats.heap_after_max_mb = max(heap_after)
+        stats.live_mb = max(full_after) if full_after else _percentile(heap_after, 0.9)
+    if stats.uptime:
+        stats.alloc_rate_mb_s = round(allocated / stats.uptime, 1)
+    return stats
+
+
+def _round_up(value: float, step: int) -> int:
+    return int(-(-value // step) * step)
+
+
+def recommend(
+    runs: list[GcRunStats], current_mb: int, physical_mb: int | None = None
+) -> GcRecommendation | None:
+    """Рекомендация по последним запускам или None, если данных мало"""
+    runs = [run for run in runs if run.pauses >= MIN_PAUSES]
+    if not runs:
+        return None
+    reasons: list[str] = []
+    live = max(run.live_mb for run in runs)
+    gc_fraction = max(run.gc_time_fraction for run in runs)
+    full = sum(run.full for run in runs)
+
+    target = live * HEAP_TO_LIVE
+    reasons.append(f'live set ~{live:.0f} MB')
+    if full or gc_fraction > GC_TIME_LIMIT:
+        # Полные сборки и долгие паузы — признак тесной кучи
+        target = max(target, current_mb * 1.5)
+        reasons.append(f'{full} full GC, {gc_fraction:.1%} time in pauses')
+    upper = None
+    if physical_mb:
+        upper = max(MIN_XMX_MB, min(int(physical_mb * MAX_HEAP_SHARE), physical_mb - RESERVED_MEMORY_MB))
+    xmx = max(MIN_XMX_MB, _round_up(target, HEAP_STEP_MB))
+    if upper is not None and xmx > upper:
+        xmx = upper // HEAP_STEP_MB * HEAP_STEP_MB
+        reasons.append(f'capped by physical RAM {physical_mb} MB')
+    xms = min(xmx, max(MIN_XMS_MB, _round_up(live * 1.5, HEAP_STEP_MB)))
+
+    region = 1
+    while region * 2 <= min(MAX_REGION_MB, xmx / TARGET_REGIONS):
+        region *= 2
+    humongous = max(run.humongous_max for run in runs)
+    if humongous > xmx / region * 0.05 and region < MAX_REGION_MB:
+        # Крупные объекты занимают заметную часть кучи целыми регионами
+        region *= 2
+        reasons.append(f'{humongous} humongous regions')
+
+    pause = RELAXED_PAUSE_MS if gc_fraction > GC_TIME_LIMIT else DEFAULT_PAUSE_MS
+    return GcRecommendation(xmx, xms, region, pause, reasons)
+
+
+class GcTuner:
+    """Статистика GC по сборкам и рекомендации для следующего запуска"""
+
+    def __init__(self, path: str = GC_STATS_PATH) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._runs: dict[str, list[GcRunStats]] = self._load()
+
+    def _load(self) -> dict[str, list[GcRunStats]]:
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('format') != GC_STATS_FORMAT:
+                return {}
+            known = {f.name for f in fields(GcRunStats)}
+            return {
+                instance: [GcRunStats(**{k: v for k, v in run.items() if k in known}) for run in runs]
+                for instance, runs in data.get('instances', {}).items()
+            }
+        except (OSError, ValueError, TypeError, AttributeError):
+            return {}
+
+    def _save(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(
+                    {
+                        'format': GC_STATS_FORMAT,
+                        'instances': {k: [asdict(run) for run in runs] for k, runs in self._runs.items()},
+                    },
+                    f,
+                    indent=4,
+                )
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logging.warning(f'[GC] Не удалось сохранить статистику GC: {e}')
+
+    def runs(self, instance: str) -> list[GcRunStats]:
+        with self._lock:
+            return list(self._runs.get(instance, []))
+
+    def record(self, instance: str, log_path: str, memory_mb: int | None) -> GcRunStats:
+        """Разбирает GC-лог завершённого запуска и сохраняет его итог; сам лог удаляется"""
+        stats = parse_gc_log(log_path)
+        stats.memory_mb = memory_mb
+        with self._lock:
+            runs = self._runs.setdefault(instance, [])
+            runs.append(stats)
+            del runs[:-MAX_RUNS]
+            self._save()
+        try:
+            os.remove(log_path)
+        except OSError:
+            pass
+        return stats
+
+    def recommendation(self, instance: str, current_mb: int) -> GcRecommendation | None:
+        return recommend(self.runs(instance), current_mb, physical_memory_mb())
+
+
+# Глобальный экземпляр
+_gc_tuner: GcTuner | None = None
+
+
+def get_gc_tuner() -> GcTuner:
+    """Получить глобальный подборщик параметров GC"""
+    global _gc_tuner
+    if _gc_tuner is None:
+        _gc_tuner = GcTuner()
+    return _gc_tuner
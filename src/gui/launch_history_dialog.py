@@ -0,0 +1,149 @@
+import logging
+import time
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QColor
+from PyQt5.QtWidgets import (
+    QAbstractItemView,
+    QComboBox,
+    QDialog,
+    QFileDialog,
+    QHBoxLayout,
+    QHeaderView,
+    QMessageBox,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+)
+
+from launch_history import LaunchHistory, LaunchRecord, get_launch_history
+
+_COLUMNS = (
+    'Дата',
+    'Сборка',
+    'Загрузчик',
+    'Моды',
+    'Java',
+    'Подготовка',
+    'Процесс',
+    'Окно',
+    'Моды загружены',
+    'Готова',
+    'Δ к медиане',
+)
+# Замедление относительно медианы сборки, после которого строка подсвечивается
+_REGRESSION_SHARE = 0.1
+
+
+def _seconds(value: float | None) -> str:
+    return f'{value:.1f} с' if value is not None else '—'
+
+
+class LaunchHistoryDialog(QDialog):
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self.setWindowTitle('Замеры запусков')
+        self.resize(960, 480)
+        self.history = get_launch_history()
+
+        layout = QVBoxLayout()
+
+        self.instance_combo = QComboBox()
+        self.instance_combo.currentIndexChanged.connect(self.fill_table)
+        layout.addWidget(self.instance_combo)
+
+        self.table = QTableWidget(0, len(_COLUMNS))
+        self.table.setHorizontalHeaderLabels(_COLUMNS)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeToContents)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.table)
+
+        buttons = QHBoxLayout()
+        self.csv_btn = QPushButton('Экспорт CSV')
+        self.csv_btn.clicked.connect(lambda: self.export('csv'))
+        self.json_btn = QPushButton('Экспорт JSON')
+        self.json_btn.clicked.connect(lambda: self.export('json'))
+        self.clear_btn = QPushButton('Очистить')
+        self.clear_btn.clicked.connect(self.clear_history)
+        close_btn = QPushButton('Закрыть')
+        close_btn.clicked.connect(self.accept)
+        buttons.addWidget(self.csv_btn)
+        buttons.addWidget(self.json_btn)
+        buttons.addWidget(self.clear_btn)
+        buttons.addStretch()
+        buttons.addWidget(close_btn)
+        layout.addLayout(buttons)
+
+        self.setLayout(layout)
+        self.fill_instances()
+
+    def fill_instances(self) -> None:
+        self.instance_combo.blockSignals(True)
+        self.instance_combo.clear()
+        self.instance_combo.addItem('Все сборки', None)
+        for instance in dict.fromkeys(r.instance for r in self.history.records()):
+            self.instance_combo.addItem(instance, instance)
+        self.instance_combo.blockSignals(False)
+        self.fill_table()
+
+    def selected_records(self) -> list[LaunchRecord]:
+        return self.history.records(self.instance_combo.currentData())
+
+    def fill_table(self) -> None:
+        records = self.selected_records()
+        # Медиана считается по более ранним запускам той же сборки
+        oldest_first = self.history.records()[::-1]
+        position = {id(r): i for i, r in enumerate(oldest_first)}
+        self.table.setRowCount(len(records))
+        for row, record in enumerate(records):
+            previous = [r for r in oldest_first[: position[id(record)]] if r.instance == record.instance]
+            baseline = LaunchHistory.baseline(record, previous)
+            delta = record.ready - baseline if baseline is not None and record.ready is not None else None
+            ready = _seconds(record.ready) if record.ready is not None else f'код {record.exit_code}'
+            values = (
+                time.strftime('%d.%m.%Y %H:%M', time.localtime(record.started)),
+                record.instance,
+                record.loader,
+                f'{record.mods} ({record.mods_hash[:8]})',
+                str(record.java or '—'),
+                _seconds(record.prepared),
+                _seconds(record.spawned),
+                _seconds(record.milestones.get('window')),
+                _seconds(record.milestones.get('mods_loaded')),
+                ready,
+                f'{delta:+.1f} с' if delta is not None else '—',
+            )
+            stages = ', '.join(f'{name} {seconds:.2f} с' for name, seconds in record.stages.items())
+            regression = delta is not None and delta > baseline * _REGRESSION_SHARE
+            for column, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                item.setToolTip(f'Этапы: {stages}\nJVM: {record.jvm_hash}')
+                if regression:
+                    item.setForeground(QColor('#ff5555'))
+                if column >= 5:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.table.setItem(row, column, item)
+
+    def export(self, fmt: str) -> None:
+        name_filter = 'CSV (*.csv)' if fmt == 'csv' else 'JSON (*.json)'
+        path = QFileDialog.getSaveFileName(self, 'Экспорт замеров', f'launch_history.{fmt}', name_filter)[0]
+        if not path:
+            return
+        try:
+            if fmt == 'csv':
+                self.history.export_csv(path, self.selected_records())
+            else:
+                self.history.export_json(path, self.selected_records())
+        except OSError as e:
+            logging.exception('Launch history export failed')
+            QMessageBox.warning(self, 'Ошибка', f'Не удалось сохранить файл: {e}')
+
+    def clear_history(self) -> None:
+        answer = QMessageBox.question(self, 'Замеры запусков', 'Удалить все замеры запусков?')
+        if answer == QMessageBox.Yes:
+            self.history.clear()
+            self.fill_instances()
@@ -39,9 +39,13 @@ from PyQt5.QtWidgets import (
 import constants
 
 import ely
-from config import AUTHLIB_JAR_PATH, MINECRAFT_DIR, SKINS_DIR
+from config import MINECRAFT_DIR, SKINS_DIR
 from ely_by_skin_manager import ElyBySkinManager
 from ely_skin_manager import ElySkinManager
+from flow import dedicate
+from java_discovery import get_java_discovery
+from prewarm import get_prewarmer
+from process_registry import get_process_registry
 from discord_rpc import get_discord_rpc, init_discord_rpc, shutdown_discord_rpc
 from translator import Translator
 from version import VERSION
@@ -57,7 +61,7 @@ from util import (
     clear_ely_session,
 )
 from .custom_line_edit import CustomLineEdit
-from .threads.launch_thread import LaunchThread
+from .threads.launch_manager import LaunchManager
 from .widgets.mod_loader_tab import ModLoaderTab
 from .widgets.modpack_tab import ModpackTab
 from .widgets.mods_tab import ModsTab
@@ -173,6 +177,12 @@ class MainWindow(QMainWindow):
         self.splash.update_progress(6, 'Загружаем настройки')
         self.settings = load_settings()
 
+        # Индекс Java прогреваем в фоне, чтобы при запуске выбор Java был мгновенным
+        dedicate(get_java_discovery().scan)
+        # Файлы последнего запуска подгружаем в кэш ОС, пока лаунчер простаивает
+        if self.settings.get('prewarm', False):
+            dedicate(get_prewarmer().prewarm_last)
+
         self.splash.update_progress(7, 'Устанавливаем никнейм')
         self.last_username = self.settings.get('last_username', '')
 
@@ -190,11 +200,14 @@ class MainWindow(QMainWindow):
 
         logging.debug('Создаем UI элементы')
         self.splash.update_progress(23, 'Создаем UI элементы')
-        self.launch_thread = LaunchThread(self)
-        self.launch_thread.state_update_signal.connect(self.state_update)
-        self.launch_thread.progress_update_signal.connect(self.update_progress)
-        self.launch_thread.close_launcher_signal.connect(self.close_launcher)
-        self.launch_thread.log_signal.connect(self.on_launch_log)
+        # Каждый запуск идёт в своём LaunchThread, несколько версий можно запускать одновременно
+        self.launch_manager = LaunchManager(self)
+        self.launch_manager.state_update_signal.connect(self.state_update)
+        self.launch_manager.progress_update_signal.connect(self.update_progress)
+        self.launch_manager.close_launcher_signal.connect(self.close_launcher)
+        self.launch_manager.log_signal.connect(self.on_launch_log)
+        self.launch_manager.log_batch_signal.connect(self.on_launch_log_batch)
+        self.launch_manager.resource_signal.connect(self.on_resource_sample)
 
         logging.debug('Создаём основной контейнер')
         self.splash.update_progress(25, 'Создаём основной экран')
@@ -2089,7 +2102,10 @@ class MainWindow(QMainWindow):
             self.settings['hide_console_after_launch'] = self.settings_tab.hide_console_checkbox.isChecked()
             
         save_settings(self.settings)
-        
+
+        # Прерываем подготовку к запускам, которые ещё идут
+        self.launch_manager.cancel_all()
+
         # Отключаем Discord RPC
         logging.info('Отключение Discord Rich Presence...')
         shutdown_discord_rpc()
@@ -2100,69 +2116,29 @@ class MainWindow(QMainWindow):
         """Закрывает лаунчер после запуска игры"""
         self.close()
 
-    def is_minecraft_running(self) -> bool:
-        """Проверяет, запущен ли уже процесс Minecraft"""
+    def is_minecraft_running(self, version: str | None = None, loader_type: str | None = None) -> bool:
+        """Проверяет, жив ли процесс игры, запущенный лаунчером (при указании — той же версии и загрузчика)"""
         try:
-            if platform.system() == 'Windows':
-                # Для Windows используем tasklist
-                result = subprocess.run(
-                    ['tasklist', '/FI', 'IMAGENAME eq java.exe', '/FO', 'CSV'],
-                    capture_output=True,
-                    text=True,
-                    creationflags=subprocess.CREATE_NO_WINDOW
-                )
-                if result.returncode == 0 and 'java.exe' in result.stdout:
-                    # Дополнительная проверка - ищем процессы с аргументами Minecraft
-                    result_detailed = subprocess.run(
-                        ['wmic', 'process', 'where', 'name="java.exe"', 'get', 'commandline'],
-                        capture_output=True,
-                        text=True,
-                        creationflags=subprocess.CREATE_NO_WINDOW
-                    )
-                    if result_detailed.returncode == 0:
-                        command_lines = result_detailed.stdout.lower()
-                        # Проверяем наличие ключевых слов Minecraft
-                        minecraft_keywords = ['minecraft', 'net.minecraft', 'modlauncher', 'forge', 'fabric']
-                        for keyword in minecraft_keywords:
-                            if keyword in command_lines:
-                                logging.info(f'[LAUNCHER] Found running Minecraft process with keyword: {keyword}')
-                                return True
-            else:
-                # Для Linux/macOS используем ps
-                result = subprocess.run(
-                    ['ps', 'aux'],
-                    capture_output=True,
-                    text=True
-                )
-                if result.returncode == 0:
-                    lines = result.stdout.lower()
-                    minecraft_keywords = ['minecraft', 'net.minecraft', 'modlauncher', 'forge', 'fabric']
-                    for keyword in minecraft_keywords:
-                        if keyword in lines and 'java' in lines:
-                            logging.info(f'[LAUNCHER] Found running Minecraft process with keyword: {keyword}')
-                            return True
-            
-            logging.info('[LAUNCHER] No running Minecraft processes found')
-            return False
-            
+            running = [
+                p
+                for p in get_process_registry().alive()
+                if (version is None or p.version == version) and (loader_type is None or p.loader == loader_type)
+            ]
         except Exception as e:
             logging.exception(f'[LAUNCHER] Error checking for running Minecraft processes: {e}')
             # В случае ошибки разрешаем запуск (безопасный вариант)
             return False
+        if running:
+            pids = ', '.join(f'{p.pid} ({p.version})' for p in running)
+            logging.info(f'[LAUNCHER] Found running Minecraft process: {pids}')
+            return True
+        logging.info('[LAUNCHER] No running Minecraft processes found')
+        return False
 
     def launch_game(self) -> None:
         try:
             logging.info('[LAUNCHER] Starting game launch process...')
 
-            # Проверяем, не запущена ли уже игра (если включена проверка)
-            if self.settings.get('check_running_processes', True) and self.is_minecraft_running():
-                QMessageBox.warning(
-                    self, 
-                    'Игра уже запущена', 
-                    'Minecraft уже запущен! Пожалуйста, закройте текущий экземпляр игры перед запуском нового.\n\nВы можете отключить эту проверку в настройках.'
-                )
-                return
-
             username = self.username.text().strip()
             if not username:
                 QMessageBox.warning(self, 'Ошибка', 'Введите имя игрока!')
@@ -2173,6 +2149,19 @@ class MainWindow(QMainWindow):
             memory_mb = self.get_selected_memory()
             close_on_launch = self.settings_tab.close_on_launch_checkbox.isChecked()
 
+            if self.launch_manager.is_preparing(version, loader_type):
+                QMessageBox.information(self, 'Запуск уже идёт', f'{version} ({loader_type}) уже готовится к запуску.')
+                return
+            # Другие версии можно запускать параллельно; проверяем только ту же версию (если включена проверка)
+            if self.settings.get('check_running_processes', True) and self.is_minecraft_running(version, loader_type):
+                QMessageBox.warning(
+                    self,
+                    'Игра уже запущена',
+                    f'Minecraft {version} ({loader_type}) уже запущен! Пожалуйста, закройте его перед повторным запуском.'
+                    '\n\nВы можете отключить эту проверку в настройках.',
+                )
+                return
+
             logging.info(
                 f'[LAUNCHER] Launch parameters: '
                 f'User: {username}, '
@@ -2203,15 +2192,14 @@ class MainWindow(QMainWindow):
             # Handle authlib for Ely.by
             if hasattr(self, 'ely_session') and self.ely_session:
                 logging.info('[LAUNCHER] Ely.by session detected, checking authlib...')
-                if not os.path.exists(AUTHLIB_JAR_PATH):
-                    logging.info('[LAUNCHER] Downloading authlib-injector...')
-                    if not download_authlib_injector():
-                        QMessageBox.critical(
-                            self,
-                            'Ошибка',
-                            'Не удалось загрузить Authlib Injector',
-                        )
-                        return
+                # Быстрая проверка по кэшу; обновление, если нужно, идёт в фоне
+                if not download_authlib_injector():
+                    QMessageBox.critical(
+                        self,
+                        'Ошибка',
+                        'Не удалось загрузить Authlib Injector',
+                    )
+                    return
 
             # Save last used settings
             self.settings['last_version'] = version
@@ -2225,14 +2213,16 @@ class MainWindow(QMainWindow):
             QApplication.processEvents()  # Force UI update
 
             logging.info('[LAUNCHER] Starting launch thread...')
-            self.launch_thread.launch_setup(
+            session = self.launch_manager.launch(
                 version,
                 username,
                 loader_type,
                 memory_mb,
                 close_on_launch,
             )
-            self.launch_thread.start()
+            # Вывод потока запуска приходит через очередь событий, поэтому сессия консоли начнётся раньше него
+            if self.console_widget:
+                self.console_widget.begin_session(f'{version} ({loader_type})', session.id)
             
             # Обновляем статус Discord на "Играет в Minecraft"
             discord_rpc = get_discord_rpc()
@@ -2255,13 +2245,14 @@ class MainWindow(QMainWindow):
             self.start_progress_label.setText(text)
 
     def state_update(self, is_running: bool) -> None:
+        """Идёт ли подготовка хотя бы одного запуска; кнопка остаётся доступной для параллельных запусков"""
         if is_running:
-            self.start_button.setEnabled(False)
+            self.start_progress_label.setVisible(True)
+            self.start_progress.setVisible(True)
             # Показать консоль при запуске, если включена в настройках
             if hasattr(self.settings_tab, 'show_console_checkbox') and self.settings_tab.show_console_checkbox.isChecked():
                 self.console_widget.show_console()
         else:
-            self.start_button.setEnabled(True)
             self.start_progress_label.setVisible(False)
             self.start_progress.setVisible(False)
             # Скрыть консоль после запуска, если включена соответствующая настройка
@@ -2276,10 +2267,20 @@ class MainWindow(QMainWindow):
             if discord_rpc.is_connected:
                 discord_rpc.set_menu_status()
 
-    def on_launch_log(self, message: str) -> None:
-        """Обработчик логов от launch_thread"""
-        if self.console_widget and self.console_widget.isVisible():
-            self.console_widget.add_log_with_color(message)
+    def on_launch_log(self, launch_id: int, message: str) -> None:
+        """Обработчик логов от launch_thread (история пишется и при скрытой консоли — по ней работает поиск)"""
+        if self.console_widget:
+            self.console_widget.add_log(message, launch_id=launch_id)
+
+    def on_launch_log_batch(self, launch_id: int, messages: list) -> None:
+        """Порция строк вывода игры запуска launch_id"""
+        if self.console_widget:
+            self.console_widget.add_logs(messages, launch_id=launch_id)
+
+    def on_resource_sample(self, launch_id: int, sample, memory_mb: int) -> None:
+        """Замер ресурсов запущенной игры"""
+        if self.console_widget:
+            self.console_widget.show_resources(sample, memory_mb, launch_id)
 
     def show_message_of_the_day(self) -> None:
         if hasattr(self, 'motd_label') and self.settings.get('show_motd', True):
@@ -0,0 +1,137 @@
+# launch_manager.py
+import logging
+from dataclasses import dataclass
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from .launch_thread import LaunchThread
+
+
+@dataclass
+class LaunchSession:
+    """Один запуск: своя подготовка (LaunchThread), свой вывод, процесс и прогресс"""
+
+    id: int
+    version: str
+    loader: str
+    thread: LaunchThread
+    preparing: bool = True
+    # Поток подготовки завершился / процесс игры завершился (или не был запущен)
+    thread_done: bool = False
+    game_done: bool = False
+    current: int = 0
+    total: int = 100
+    text: str = ''
+
+
+class LaunchManager(QObject):
+    """Несколько одновременных запусков; UI получает сводное состояние и прогресс"""
+
+    # Идёт ли подготовка хотя бы одного запуска
+    state_update_signal = pyqtSignal(bool)
+    progress_update_signal = pyqtSignal(int, int, str)
+    close_launcher_signal = pyqtSignal()
+    # id запуска и строки его вывода: у каждого запуска свой поток лога
+    log_signal = pyqtSignal(int, str)
+    log_batch_signal = pyqtSignal(int, list)
+    # id запуска, замер ресурсов (None после выхода игры), -Xmx в МБ
+    resource_signal = pyqtSignal(int, object, int)
+
+    def __init__(self, parent_window=None):
+        super().__init__(parent_window)
+        self.parent_window = parent_window
+        self.sessions: dict[int, LaunchSession] = {}
+        self._next_id = 1
+
+    def launch(self, version: str, username: str, loader_type: str, memory_mb: int, close_on_launch: bool) -> LaunchSession:
+        """Запускает подготовку и игру в отдельном LaunchThread"""
+        launch_id = self._next_id
+        self._next_id += 1
+        thread = LaunchThread(self.parent_window)
+        session = LaunchSession(launch_id, version, loader_type, thread)
+        self.sessions[launch_id] = session
+
+        thread.state_update_signal.connect(lambda running: self._on_state(launch_id, running))
+        thread.progress_update_signal.connect(lambda cur, total, text: self._on_progress(launch_id, cur, total, text))
+        thread.close_launcher_signal.connect(self.close_launcher_signal)
+        thread.log_signal.connect(lambda message: self.log_signal.emit(launch_id, message))
+        thread.log_batch_signal.connect(lambda lines: self.log_batch_signal.emit(launch_id, lines))
+        thread.resource_signal.connect(lambda sample, memory: self.resource_signal.emit(launch_id, sample, memory))
+        thread.game_exited_signal.connect(lambda _rc: self._on_game_exited(launch_id))
+        thread.finished.connect(lambda: self._on_thread_finished(launch_id))
+
+        thread.launch_setup(version, username, loader_type, memory_mb, close_on_launch)
+        thread.start()
+        logging.info(f'[LAUNCHER] Launch #{launch_id} started: {version} ({loader_type}), active: {len(self.sessions)}')
+        self.state_update_signal.emit(True)
+        return session
+
+    def is_preparing(self, version: str, loader_type: str) -> bool:
+        """Идёт ли уже подготовка той же версии с тем же загрузчиком"""
+        return any(s.preparing and s.version == version and s.loader == loader_type for s in self.sessions.values())
+
+    @property
+    def preparing_count(self) -> int:
+        return sum(1 for s in self.sessions.values() if s.preparing)
+
+    def cancel_all(self) -> None:
+        """Отменяет все подготовки; запущенные игры продолжают работать"""
+        for session in self.sessions.values():
+            if session.thread.isRunning():
+                session.thread.cancel()
+
+    def _on_state(self, launch_id: int, running: bool) -> None:
+        session = self.sessions.get(launch_id)
+        if session is None:
+            return
+        session.preparing = running
+        if not running:
+            self._emit_progress()
+        self.state_update_signal.emit(self.preparing_count > 0)
+
+    def _on_progress(self, launch_id: int, current: int, total: int, text: str) -> None:
+        session = self.sessions.get(launch_id)
+        if session is None:
+            return
+        session.current, session.total = current, total
+        if text:
+            session.text = text
+        self._emit_progress(session)
+
+    def _emit_progress(self, latest: LaunchSession | None = None) -> None:
+        """Сводный прогресс всех готовящихся запусков"""
+        preparing = [s for s in self.sessions.values() if s.preparing]
+        if not preparing:
+            return
+        current = sum(s.current for s in preparing)
+        total = sum(max(s.total, 1) for s in preparing)
+        text = (latest or preparing[-1]).text
+        if len(preparing) > 1:
+            text = f'Запусков: {len(preparing)} · {text}'
+        self.progress_update_signal.emit(current, total, text)
+
+    def _on_game_exited(self, launch_id: int) -> None:
+        session = self.sessions.get(launch_id)
+        if session is not None:
+            session.game_done = True
+            self._release(session)
+
+    def _on_thread_finished(self, launch_id: int) -> None:
+        session = self.sessions.get(launch_id)
+        if session is None:
+            return
+        session.thread_done = True
+        session.preparing = False
+        # Игра не запускалась (ошибка или отмена) — ждать её выхода не нужно
+        if session.thread.game_run is None:
+            session.game_done = True
+        self._release(session)
+        self.state_update_signal.emit(self.preparing_count > 0)
+
+    def _release(self, session: LaunchSession) -> None:
+        """Освобождает поток запуска, когда и подготовка, и игра завершены"""
+        if not (session.thread_done and session.game_done):
+            return
+        self.sessions.pop(session.id, None)
+        session.thread.deleteLater()
+        logging.info(f'[LAUNCHER] Launch #{session.id} finished, active: {len(self.sessions)}')
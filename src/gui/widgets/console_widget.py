@@ -1,15 +1,141 @@
-import datetime
-from PyQt5.QtCore import Qt, QTimer
-from PyQt5.QtGui import QFont, QTextCursor
+import re
+import time
+from bisect import bisect_left
+from collections import deque
+
+from PyQt5.QtCore import QAbstractListModel, QModelIndex, Qt, QTimer
+from PyQt5.QtGui import QBrush, QColor, QFont, QKeySequence
 from PyQt5.QtWidgets import (
+    QAbstractItemView,
+    QAction,
+    QApplication,
+    QCheckBox,
+    QComboBox,
+    QLineEdit,
+    QMenu,
     QWidget, 
     QVBoxLayout, 
-    QTextEdit, 
+    QHeaderView,
+    QTableView,
     QLabel,
     QHBoxLayout,
     QPushButton
 )
 
+from console_buffer import CONSOLE_CAPACITY, LEVEL_COLORS, LEVEL_ERROR, LEVEL_PROCESS, LEVEL_WARN, ConsoleBuffer, LogRecord
+from console_search import MAX_SESSIONS, LogIndex, SearchQuery
+from resource_monitor import MIB, ResourceSample
+from session_logs import get_session_logs
+
+from ..launch_history_dialog import LaunchHistoryDialog
+
+
+# Сколько последних сессий показывать в меню истории
+HISTORY_MENU_SIZE = 20
+# Значение пункта «Текущий запуск» в выборе запуска (остальные пункты — id запуска)
+CURRENT_LAUNCH = -1
+# Сколько последних замеров RSS рисуется в подсказке индикатора ресурсов
+RESOURCE_HISTORY_SIZE = 60
+_SPARK_CHARS = '▁▂▃▄▅▆▇█'
+
+
+def format_record(record: LogRecord) -> str:
+    return f"[{time.strftime('%H:%M:%S', time.localtime(record.timestamp))}] {record.text}"
+
+
+class ConsoleModel(QAbstractListModel):
+    """Модель поверх кольцевого буфера: представление запрашивает только видимые строки.
+    В режиме фильтра показываются только строки, подходящие под запрос."""
+
+    def __init__(self, capacity: int = CONSOLE_CAPACITY, parent=None):
+        super().__init__(parent)
+        self.buffer = ConsoleBuffer(capacity)
+        self.log_index = LogIndex(self.buffer)
+        self._brushes = {level: QBrush(QColor(color)) for level, color in LEVEL_COLORS.items()}
+        # Сквозные номера видимых строк в режиме фильтра
+        self._filter: list[int] | None = None
+        self._query: SearchQuery | None = None
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._filter) if self._filter is not None else len(self.buffer)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        record = self.record(index.row())
+        if record is None:
+            return None
+        if role == Qt.DisplayRole:
+            return format_record(record)
+        if role == Qt.ForegroundRole:
+            return self._brushes[record.level]
+        return None
+
+    def seq_for_row(self, row: int) -> int:
+        return self._filter[row] if self._filter is not None else self.buffer.first_seq + row
+
+    def record(self, row: int) -> LogRecord | None:
+        """Запись видимой строки (в режиме фильтра строка не совпадает с индексом буфера)"""
+        return self.buffer.get_seq(self.seq_for_row(row))
+
+    def row_for_seq(self, seq: int) -> int | None:
+        if self._filter is not None:
+            row = bisect_left(self._filter, seq)
+            return row if row < len(self._filter) and self._filter[row] == seq else None
+        row = seq - self.buffer.first_seq
+        return row if 0 <= row < len(self.buffer) else None
+
+    def append_records(self, records: list[LogRecord]) -> None:
+        if not records:
+            return
+        records = records[-self.buffer.capacity :]
+        evicted = self.buffer.overflow(len(records))
+        first_seq = self.buffer.next_seq
+        if self._filter is None:
+            if evicted:
+                self.beginRemoveRows(QModelIndex(), 0, evicted - 1)
+                self.buffer.drop_front(evicted)
+                self.endRemoveRows()
+            first = len(self.buffer)
+            self.beginInsertRows(QModelIndex(), first, first + len(records) - 1)
+            self.buffer.extend(records)
+            self.endInsertRows()
+        else:
+            stale = bisect_left(self._filter, self.buffer.first_seq + evicted)
+            if stale:
+                self.beginRemoveRows(QModelIndex(), 0, stale - 1)
+                del self._filter[:stale]
+                self.endRemoveRows()
+            self.buffer.extend(records)
+            matched = self.log_index.matches(self._query, first_seq, records)
+            if matched:
+                first = len(self._filter)
+                self.beginInsertRows(QModelIndex(), first, first + len(matched) - 1)
+                self._filter.extend(matched)
+                self.endInsertRows()
+        self.log_index.add(first_seq, records)
+
+    def set_filter(self, query: SearchQuery | None) -> None:
+        """Показывать только подходящие строки; None — все строки"""
+        self.beginResetModel()
+        self._query = query
+        self._filter = self.log_index.search(query) if query is not None else None
+        self.endResetModel()
+
+    @property
+    def filtered(self) -> bool:
+        return self._filter is not None
+
+    def clear(self) -> None:
+        self.beginResetModel()
+        self.buffer.clear()
+        self.log_index.clear()
+        if self._filter is not None:
+            self._filter = []
+        self.endResetModel()
+
 
 class ConsoleWidget(QWidget):
     #виджет консоли для отображения логов запуска игры
@@ -36,6 +162,13 @@ class ConsoleWidget(QWidget):
             }
         """)
         
+        # Ресурсы запущенной игры: RSS относительно -Xmx, CPU и потоки
+        self.resource_label = QLabel("")
+        self.resource_label.setStyleSheet("QLabel { color: #aaaaaa; font-size: 11px; padding: 2px 5px; }")
+        self._rss_history: deque[int] = deque(maxlen=RESOURCE_HISTORY_SIZE)
+        # Последний замер каждой запущенной игры: {id запуска: (замер, -Xmx в МБ)}
+        self._resources: dict[int, tuple[ResourceSample, int]] = {}
+
         # Кнопка очистки консоли
         self.clear_button = QPushButton("Очистить")
         self.clear_button.setFixedSize(60, 25)
@@ -56,6 +189,14 @@ class ConsoleWidget(QWidget):
             }
         """)
         self.clear_button.clicked.connect(self.clear_console)
+
+        # Кнопка истории: логи прошлых запусков из архива сессий
+        self.history_button = QPushButton("История")
+        self.history_button.setFixedSize(60, 25)
+        self.history_button.setStyleSheet(self.clear_button.styleSheet())
+        self.history_menu = QMenu(self.history_button)
+        self.history_menu.aboutToShow.connect(self.fill_history_menu)
+        self.history_button.setMenu(self.history_menu)
         
         # Кнопка закрытия консоли
         self.close_button = QPushButton("Закрыть")
@@ -79,20 +220,100 @@ class ConsoleWidget(QWidget):
         self.close_button.clicked.connect(self.hide_console)
         
         header_layout.addWidget(self.title_label)
+        header_layout.addWidget(self.resource_label)
         header_layout.addStretch()
+        header_layout.addWidget(self.history_button)
         header_layout.addWidget(self.clear_button)
         header_layout.addWidget(self.close_button)
         
         layout.addLayout(header_layout)
+
+        # Панель поиска: текст (tag:<тег> — фильтр по тегу), уровень, регулярка, запуск
+        search_layout = QHBoxLayout()
+        search_style = """
+            QLineEdit, QComboBox, QPushButton {
+                background-color: #2d2d2d;
+                border: 1px solid #555555;
+                border-radius: 3px;
+                color: white;
+                font-size: 11px;
+                padding: 2px 4px;
+            }
+            QPushButton:hover {
+                background-color: #4d4d4d;
+            }
+            QCheckBox, QLabel {
+                color: #cccccc;
+                font-size: 11px;
+            }
+        """
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("Поиск (tag:main/WARN для фильтра по тегу)")
+        self.search_edit.setClearButtonEnabled(True)
+        self.level_select = QComboBox()
+        self.level_select.addItem("Все уровни", frozenset())
+        self.level_select.addItem("Ошибки", frozenset({LEVEL_ERROR}))
+        self.level_select.addItem("Ошибки и предупреждения", frozenset({LEVEL_ERROR, LEVEL_WARN}))
+        self.session_select = QComboBox()
+        self.session_select.addItem("Все запуски", 0)
+        self.session_select.addItem("Текущий запуск", CURRENT_LAUNCH)
+        self.regex_checkbox = QCheckBox("Regex")
+        self.filter_checkbox = QCheckBox("Только совпадения")
+        self.prev_button = QPushButton("▲")
+        self.next_button = QPushButton("▼")
+        for button in (self.prev_button, self.next_button):
+            button.setFixedSize(25, 22)
+        self.match_label = QLabel("")
+        for widget in (
+            self.search_edit,
+            self.level_select,
+            self.session_select,
+            self.regex_checkbox,
+            self.filter_checkbox,
+            self.prev_button,
+            self.next_button,
+            self.match_label,
+        ):
+            widget.setStyleSheet(search_style)
+            search_layout.addWidget(widget)
+        search_layout.setStretch(0, 1)
+        layout.addLayout(search_layout)
+
+        # Поиск запускается после паузы в наборе, а не на каждое нажатие
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(150)
+        self._search_timer.timeout.connect(self.run_search)
+        self.search_edit.textChanged.connect(self._search_timer.start)
+        self.search_edit.returnPressed.connect(self.next_match)
+        self.level_select.currentIndexChanged.connect(self.run_search)
+        self.session_select.currentIndexChanged.connect(self.run_search)
+        self.regex_checkbox.toggled.connect(self.run_search)
+        self.filter_checkbox.toggled.connect(self.run_search)
+        self.prev_button.clicked.connect(self.prev_match)
+        self.next_button.clicked.connect(self.next_match)
+        self._matches: list[int] = []
+        self._match_pos = -1
         
-        # Текстовая область для логов
-        self.console_text = QTextEdit()
-        self.console_text.setReadOnly(True)
-        self.console_text.setFixedHeight(200)
+        # Виртуализированная таблица в одну колонку: строки фиксированной высоты,
+        # отрисовываются только видимые (QListView обходит все строки при раскладке)
+        self.console_model = ConsoleModel(parent=self)
+        self.console_view = QTableView()
+        self.console_view.setModel(self.console_model)
+        self.console_view.horizontalHeader().hide()
+        self.console_view.horizontalHeader().setStretchLastSection(True)
+        self.console_view.verticalHeader().hide()
+        self.console_view.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.console_view.setShowGrid(False)
+        self.console_view.setWordWrap(False)
+        self.console_view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.console_view.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.console_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.console_view.setFixedHeight(200)
         
         # Настройка стилей консоли
-        self.console_text.setStyleSheet("""
-            QTextEdit {
+        self.console_view.setStyleSheet("""
+            QTableView {
                 background-color: #1e1e1e;
                 border: 1px solid #555555;
                 border-radius: 5px;
@@ -101,6 +322,9 @@ class ConsoleWidget(QWidget):
                 font-size: 11px;
                 padding: 5px;
             }
+            QTableView::item:selected {
+                background-color: #3d3d3d;
+            }
             QScrollBar:vertical {
                 background-color: #2d2d2d;
                 width: 12px;
@@ -127,74 +351,208 @@ class ConsoleWidget(QWidget):
             font = QFont("Monaco", 10)
             if not font.exactMatch():
                 font = QFont("Courier New", 10)
-        self.console_text.setFont(font)
+        self.console_view.setFont(font)
+        self.console_view.verticalHeader().setDefaultSectionSize(self.console_view.fontMetrics().height() + 2)
+
+        # Копирование выделенных строк (Ctrl+C и контекстное меню)
+        copy_action = QAction("Копировать", self.console_view)
+        copy_action.setShortcut(QKeySequence.Copy)
+        copy_action.setShortcutContext(Qt.WidgetShortcut)
+        copy_action.triggered.connect(self.copy_selection)
+        self.console_view.addAction(copy_action)
+        self.console_view.setContextMenuPolicy(Qt.ActionsContextMenu)
         
-        layout.addWidget(self.console_text)
+        layout.addWidget(self.console_view)
         
-        # Автопрокрутка
+        # Автопрокрутка (только если пользователь не отмотал консоль вверх)
         self.auto_scroll = True
         
-    def add_log(self, message: str):
-        """Добавить сообщение в консоль"""
-        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-        formatted_message = f"[{timestamp}] {message}"
-        
-        # Добавляем сообщение
-        self.console_text.append(formatted_message)
-        
-        # Автопрокрутка к концу
-        if self.auto_scroll:
-            cursor = self.console_text.textCursor()
-            cursor.movePosition(QTextCursor.End)
-            self.console_text.setTextCursor(cursor)
-            
-        # Ограничиваем количество строк (оставляем последние 1000 строк)
-        self.limit_lines()
+    def add_log(self, message: str, level: int | None = None, launch_id: int = 0):
+        """Добавить сообщение в консоль; цвет — по уровню строки (по умолчанию определяется по тексту)"""
+        self.add_logs([message], level, launch_id)
+
+    def add_logs(self, messages: list[str], level: int | None = None, launch_id: int = 0):
+        """Добавить порцию сообщений одной вставкой"""
+        if not messages:
+            return
+        scrollbar = self.console_view.verticalScrollBar()
+        at_bottom = scrollbar.value() >= scrollbar.maximum()
+        self.console_model.append_records(ConsoleBuffer.make_records(messages, level=level, launch_id=launch_id))
+        if self.auto_scroll and at_bottom:
+            scrollbar.setValue(scrollbar.maximum())
+
+    def copy_selection(self):
+        """Скопировать выделенные строки в буфер обмена"""
+        rows = sorted(index.row() for index in self.console_view.selectionModel().selectedIndexes())
+        records = [record for record in map(self.console_model.record, rows) if record is not None]
+        if records:
+            QApplication.clipboard().setText('\n'.join(format_record(record) for record in records))
     
-    def add_log_with_color(self, message: str, color: str = "#ffffff"):
-        """Добавить сообщение с определенным цветом"""
-        timestamp = datetime.datetime.now().strftime("%H:%M:%S")
-        
-        # Определяем цвет на основе типа сообщения
-        if "[ERROR]" in message or "ERROR" in message or "Failed" in message:
-            color = "#ff6b6b"  # Красный для ошибок
-        elif "[WARN]" in message or "WARNING" in message:
-            color = "#ffa500"  # Оранжевый для предупреждений
-        elif "[SUCCESS]" in message or "successfully" in message.lower() or "completed" in message.lower():
-            color = "#4ecdc4"  # Зеленый для успеха
-        elif "[INSTALL]" in message or "[BUILD]" in message:
-            color = "#74c0fc"  # Голубой для процессов
-        elif "[LAUNCH]" in message:
-            color = "#8ce99a"  # Светло-зеленый для запуска
+    def fill_history_menu(self):
+        """Список последних сессий из индекса архива (сами логи не читаются)"""
+        self.history_menu.clear()
+        self.history_menu.addAction("Замеры запусков…").triggered.connect(self.show_launch_history)
+        self.history_menu.addSeparator()
+        sessions = get_session_logs().list()[:HISTORY_MENU_SIZE]
+        if not sessions:
+            self.history_menu.addAction("Нет сохранённых сессий").setEnabled(False)
+            return
+        for session in sessions:
+            started = time.strftime('%d.%m %H:%M', time.localtime(session.started))
+            if session.running:
+                status = "идёт"
+            else:
+                status = f"код {session.exit_code}, {int(session.duration // 60)} мин"
+                if session.resources:
+                    status += f", пик RAM {session.resources['peak_rss_mb'] / 1024:.1f} ГБ"
+            action = self.history_menu.addAction(f"{started}  {session.version} ({session.loader}) — {status}")
+            action.triggered.connect(lambda _checked=False, session_id=session.id: self.load_session(session_id))
+
+    def show_launch_history(self):
+        """Таблица времени запуска по сборкам с экспортом"""
+        LaunchHistoryDialog(self).exec_()
+
+    def load_session(self, session_id: str):
+        """Загрузить лог сохранённой сессии в консоль"""
+        archive = get_session_logs()
+        session = archive.get(session_id)
+        if session is None:
+            return
+        started = time.strftime('%d.%m.%Y %H:%M', time.localtime(session.started))
+        self.begin_session(f"{session.version} ({session.loader}), {started}")
+        batch: list[str] = []
+        try:
+            for line in archive.read_lines(session_id):
+                if line:
+                    batch.append(line)
+                if len(batch) >= 5000:
+                    self.add_logs(batch)
+                    batch = []
+        except OSError as e:
+            batch.append(f"[ERROR] Не удалось прочитать лог сессии: {e}")
+        self.add_logs(batch)
+
+    def show_resources(self, sample: ResourceSample | None, memory_mb: int, key: int = 0):
+        """Обновить индикатор ресурсов игры key (при нескольких играх — сумма); None — процесс завершился"""
+        if sample is None:
+            self._resources.pop(key, None)
         else:
-            color = "#ffffff"  # Белый по умолчанию
-            
-        formatted_message = f'<span style="color: {color};">[{timestamp}] {message}</span>'
-        self.console_text.append(formatted_message)
-        
-        # Автопрокрутка к концу
-        if self.auto_scroll:
-            cursor = self.console_text.textCursor()
-            cursor.movePosition(QTextCursor.End)
-            self.console_text.setTextCursor(cursor)
-            
-        self.limit_lines()
-    
+            self._resources[key] = (sample, memory_mb)
+        if not self._resources:
+            self.resource_label.setText("")
+            self.resource_label.setToolTip("")
+            self._rss_history.clear()
+            return
+        samples = [item[0] for item in self._resources.values()]
+        rss = sum(s.rss for s in samples)
+        memory_mb = sum(item[1] for item in self._resources.values())
+        threads = sum(s.threads or 0 for s in samples)
+        if sample is not None:
+            self._rss_history.append(rss)
+        text = f"RAM {rss / MIB / 1024:.1f} / {memory_mb / 1024:.1f} ГБ · CPU {sum(s.cpu_percent for s in samples):.0f}%"
+        if threads:
+            text += f" · {threads} потоков"
+        if len(samples) > 1:
+            text += f" · игр: {len(samples)}"
+        self.resource_label.setText(text)
+        # RSS близко к -Xmx и выше — сборщику мусора, скорее всего, тесно
+        starving = any(mem and s.rss / MIB >= mem * 0.9 for s, mem in self._resources.values())
+        color = "#ffaa00" if starving else "#aaaaaa"
+        self.resource_label.setStyleSheet(f"QLabel {{ color: {color}; font-size: 11px; padding: 2px 5px; }}")
+        if not self._rss_history:
+            return
+        peak = max(self._rss_history)
+        levels = len(_SPARK_CHARS)
+        spark = ''.join(_SPARK_CHARS[min(levels - 1, value * levels // (peak + 1))] for value in self._rss_history)
+        self.resource_label.setToolTip(f"RSS за последние замеры (пик {peak / MIB:.0f} МБ):\n{spark}")
+
+    def begin_session(self, label: str, launch_id: int = 0):
+        """Отметить начало нового запуска: поиск можно ограничить текущим или любым идущим запуском"""
+        self.console_model.log_index.begin_session(label, time.time(), launch_id)
+        self.add_log(f"[SESSION] ───── {label} ─────", launch_id=launch_id)
+        if launch_id:
+            # Вывод одновременных игр перемешан в общей ленте — у каждого запуска свой пункт фильтра
+            self.session_select.addItem(f"#{launch_id} {label}", launch_id)
+            while self.session_select.count() > 2 + MAX_SESSIONS:
+                self.session_select.removeItem(2)
+        if self.session_select.currentData() == CURRENT_LAUNCH:
+            self.run_search()
+
+    def current_query(self) -> SearchQuery | None:
+        """Запрос из панели поиска или None, если фильтры пусты"""
+        since_seq = launch_id = 0
+        sessions = self.console_model.log_index.sessions
+        selected = self.session_select.currentData()
+        if selected == CURRENT_LAUNCH and sessions:
+            since_seq, launch_id = sessions[-1].first_seq, sessions[-1].launch_id
+        elif selected:
+            launch_id = selected
+            since_seq = next((s.first_seq for s in reversed(sessions) if s.launch_id == selected), 0)
+        query = SearchQuery.parse(
+            self.search_edit.text(),
+            levels=self.level_select.currentData() or (),
+            regex=self.regex_checkbox.isChecked(),
+            since_seq=since_seq,
+            launch_id=launch_id,
+        )
+        return None if query.empty and not since_seq else query
+
+    def run_search(self):
+        """Выполнить поиск по индексу и перейти к последнему совпадению"""
+        try:
+            query = self.current_query()
+            if query is not None and query.regex:
+                re.compile(query.text)
+        except re.error:
+            self.match_label.setText("Ошибка в regex")
+            return
+        if self.filter_checkbox.isChecked():
+            self.console_model.set_filter(query)
+            self._matches = []
+            self.match_label.setText(f"{self.console_model.rowCount()} строк" if query else "")
+            self.console_view.scrollToBottom()
+            return
+        if self.console_model.filtered:
+            self.console_model.set_filter(None)
+        self._matches = self.console_model.log_index.search(query) if query is not None else []
+        self._match_pos = len(self._matches)
+        if self._matches:
+            self.prev_match()
+        else:
+            self.match_label.setText("Нет совпадений" if query else "")
+
+    def _jump_to_match(self):
+        seq = self._matches[self._match_pos]
+        row = self.console_model.row_for_seq(seq)
+        if row is None:
+            # Строка уже вытеснена из буфера — пересчитываем совпадения
+            self.run_search()
+            return
+        index = self.console_model.index(row, 0)
+        self.console_view.setCurrentIndex(index)
+        self.console_view.scrollTo(index, QAbstractItemView.PositionAtCenter)
+        self.match_label.setText(f"{self._match_pos + 1}/{len(self._matches)}")
+
+    def next_match(self):
+        """Следующее совпадение (по кругу)"""
+        if not self._matches:
+            return
+        self._match_pos = (self._match_pos + 1) % len(self._matches)
+        self._jump_to_match()
+
+    def prev_match(self):
+        """Предыдущее совпадение (по кругу)"""
+        if not self._matches:
+            return
+        self._match_pos = (self._match_pos - 1) % len(self._matches)
+        self._jump_to_match()
+
     def clear_console(self):
         """Очистить консоль"""
-        self.console_text.clear()
-        self.add_log_with_color("Консоль очищена", "#74c0fc")
-    
-    def limit_lines(self):
-        """Ограничить количество строк в консоли"""
-        document = self.console_text.document()
-        if document.blockCount() > 1000:
-            cursor = QTextCursor(document)
-            cursor.movePosition(QTextCursor.Start)
-            for _ in range(100):  # Удаляем первые 100 строк
-                cursor.select(QTextCursor.BlockUnderCursor)
-                cursor.removeSelectedText()
-                cursor.deleteChar()  # Удаляем символ новой строки
+        self.console_model.clear()
+        self._matches = []
+        self.match_label.setText("")
+        self.add_log("Консоль очищена", LEVEL_PROCESS)
     
     def set_visible(self, visible: bool):
         """Показать/скрыть консоль"""
@@ -203,7 +561,7 @@ class ConsoleWidget(QWidget):
     def show_console(self):
         """Показать консоль"""
         self.setVisible(True)
-        self.add_log_with_color("Консоль запуска активирована", "#74c0fc")
+        self.add_log("Консоль запуска активирована", LEVEL_PROCESS)
         
     def hide_console(self):
         """Скрыть консоль"""
@@ -6,7 +6,7 @@ import time
 from typing import Any, Callable
 import zipfile
 
-from PyQt5.QtCore import QSize, Qt, QEvent, QObject, QRegExp
+from PyQt5.QtCore import QSize, Qt, QEvent, QObject, QRegExp, pyqtSignal
 from PyQt5.QtGui import QCursor, QDragEnterEvent, QDropEvent, QFont, QIcon, QPixmap, QRegExpValidator
 from PyQt5.QtWidgets import (
     QAction,
@@ -44,13 +44,18 @@ from config import (
     RESOURCEPACKS_DIR,
     SHADERPACKS_DIR,
 )
+from flow import dedicate
 from mod_manager import ModManager
 from util import resource_path
 
 
 class ModpackTab(QWidget):
+    # Результат проверки Java из фонового потока: (установка или None, модлоадер)
+    java_checked = pyqtSignal(object, str)
+
     def __init__(self, parent: QWidget | None = None) -> None:
         super().__init__(parent)
+        self.java_checked.connect(self.show_java_check)
         self.parent_window = parent
         self.modpacks_dir = os.path.join(MINECRAFT_DIR, 'modpacks')
         self.icons_dir = os.path.join(
@@ -1170,9 +1175,9 @@ class ModpackTab(QWidget):
         
         # Кнопка проверки Java
         java_check_layout = QHBoxLayout()
-        java_check_btn = QPushButton('Проверить Java')
-        java_check_btn.clicked.connect(self.check_java_version)
-        java_check_layout.addWidget(java_check_btn)
+        self.java_check_btn = QPushButton('Проверить Java')
+        self.java_check_btn.clicked.connect(self.check_java_version)
+        java_check_layout.addWidget(self.java_check_btn)
         java_check_layout.addStretch()
         java_check_container = QWidget()
         java_check_container.setLayout(java_check_layout)
@@ -1741,26 +1746,34 @@ class ModpackTab(QWidget):
             QMessageBox.critical(self, 'Ошибка', f'Не удалось применить текущие параметры: {e}')
 
     def check_java_version(self):
-        """Проверяет версию Java и показывает результат"""
+        """Запускает проверку Java в фоне: при устаревшем индексе path_java() опрашивает бинарник"""
+        self.java_check_btn.setEnabled(False)
+        self.java_check_btn.setText('Проверка Java...')
+        dedicate(self._probe_path_java, self.pack_loader.currentText())
+
+    def _probe_path_java(self, loader: str) -> None:
         try:
-            import subprocess
-            import re
-            
-            result = subprocess.run(['java', '-version'], 
-                                  stdout=subprocess.PIPE, 
-                                  stderr=subprocess.PIPE, 
-                                  check=False, 
-                                  text=True)
-            output = result.stderr or result.stdout
-            
-            # Ищем версию в выводе
-            version_match = re.search(r'version "(\d+)\.(\d+)', output)
-            if version_match:
-                major = int(version_match.group(1))
-                minor = int(version_match.group(2))
+            from java_discovery import get_java_discovery
+
+            installation = get_java_discovery().path_java()
+        except Exception as e:
+            logging.exception(f'[JAVA] Ошибка проверки Java: {e}')
+            installation = None
+        self.java_checked.emit(installation, loader)
+
+    def show_java_check(self, installation, loader: str) -> None:
+        """Показывает результат проверки Java (в потоке GUI)"""
+        try:
+            # Диалог создания сборки могли закрыть, пока шла проверка
+            self.java_check_btn.setEnabled(True)
+            self.java_check_btn.setText('Проверить Java')
+        except RuntimeError:
+            pass
+        try:
+            if installation:
+                major = installation.major
                 
                 # Определяем совместимость с выбранным модлоадером
-                loader = self.pack_loader.currentText()
                 requirements = {
                     'Forge': (8, 'Forge работает с Java 8+'),
                     'Fabric': (8, 'Fabric работает с Java 8+'),
@@ -1770,13 +1783,13 @@ class ModpackTab(QWidget):
                 min_java, description = requirements.get(loader, (8, 'Требования Java зависят от модлоадера'))
                 
                 if major >= min_java:
-                    message = f"Java {major}.{minor} подходит для {loader}!\n\n{description}"
+                    message = f"Java {installation.version} подходит для {loader}!\n\n{description}"
                     icon = QMessageBox.Information
                 else:
                     if loader == 'Quilt':
-                        message = f"Java {major}.{minor} слишком старая для Quilt!\n\nQuilt требует Java 17 или выше.\n\nРекомендации:\n- Скачайте Java 17+ с https://adoptium.net/\n- Или используйте более старую версию Minecraft"
+                        message = f"Java {installation.version} слишком старая для Quilt!\n\nQuilt требует Java 17 или выше.\n\nРекомендации:\n- Скачайте Java 17+ с https://adoptium.net/\n- Или используйте более старую версию Minecraft"
                     else:
-                        message = f"Java {major}.{minor} подходит для {loader}!\n\n{description}"
+                        message = f"Java {installation.version} подходит для {loader}!\n\n{description}"
                     icon = QMessageBox.Warning
             else:
                 message = "Не удалось определить версию Java!\n\nУстановите Java с https://adoptium.net/"
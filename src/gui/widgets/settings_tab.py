@@ -165,6 +165,19 @@ class SettingsTab(QWidget):
         optimized_row.addWidget(self.jre_optimized_combo)
         java_layout.addLayout(optimized_row)
 
+        # Подбор памяти по GC-логу прошлых запусков
+        gc_tuning_row = QHBoxLayout()
+        gc_tuning_label = QLabel('Подбор памяти по GC-логу')
+        gc_tuning_label.setStyleSheet('color: #ffffff; font-size: 15px;')
+        self.gc_tuning_combo = self._NoWheelCombo()
+        self.gc_tuning_combo.setStyleSheet('color: #ffffff; background-color: #3d3d3d;')
+        self.gc_tuning_combo.addItem('Выключен', 'off')
+        self.gc_tuning_combo.addItem('Только рекомендации', 'recommend')
+        self.gc_tuning_combo.addItem('Применять автоматически', 'apply')
+        gc_tuning_row.addWidget(gc_tuning_label)
+        gc_tuning_row.addWidget(self.gc_tuning_combo)
+        java_layout.addLayout(gc_tuning_row)
+
         # Java аргументы
         jre_args_layout = QVBoxLayout()
         jre_args_label = QLabel('Аргументы Java')
@@ -186,6 +199,18 @@ class SettingsTab(QWidget):
         self.ssl_legacy_checkbox.toggled.connect(self._save_ssl_legacy_setting)
         java_layout.addWidget(self.ssl_legacy_checkbox)
 
+        # Архив классов AppCDS
+        self.appcds_checkbox = QCheckBox('Ускорять повторные запуски архивом классов (AppCDS, Java 13+)')
+        self.appcds_checkbox.setStyleSheet('color: #ffffff; font-size: 15px;')
+        self.appcds_checkbox.toggled.connect(self._save_appcds_setting)
+        java_layout.addWidget(self.appcds_checkbox)
+
+        # Прогрев файлов игры
+        self.prewarm_checkbox = QCheckBox('Прогревать файлы игры в кэше системы перед запуском')
+        self.prewarm_checkbox.setStyleSheet('color: #ffffff; font-size: 15px;')
+        self.prewarm_checkbox.toggled.connect(self._save_prewarm_setting)
+        java_layout.addWidget(self.prewarm_checkbox)
+
         # Игровые настройки
         game_card = QWidget()
         game_card.setStyleSheet(card_style)
@@ -668,9 +693,12 @@ class SettingsTab(QWidget):
         self.java_path_edit.setText(settings.get('java_path', ''))
         self.jre_args_edit.setText(settings.get('jre_args', '') if isinstance(settings, dict) else '')
         self.ssl_legacy_checkbox.setChecked(bool(settings.get('update_legacy_ssl', False)))
+        self.appcds_checkbox.setChecked(bool(settings.get('appcds', False)))
+        self.prewarm_checkbox.setChecked(bool(settings.get('prewarm', False)))
         preset = settings.get('jre_optimized_profile', 'auto')
         idx = max(0, self.jre_optimized_combo.findData(preset if preset in ('auto','g1gc','none') else 'auto'))
         self.jre_optimized_combo.setCurrentIndex(idx)
+        self.gc_tuning_combo.setCurrentIndex(max(0, self.gc_tuning_combo.findData(settings.get('gc_tuning', 'off'))))
         # Game
         self.mc_args_edit.setText(settings.get('mc_args', ''))
         self.wrapper_edit.setText(settings.get('wrapper_cmd', ''))
@@ -840,6 +868,16 @@ class SettingsTab(QWidget):
             self.parent_window.settings['update_legacy_ssl'] = bool(checked)
             save_settings(self.parent_window.settings)
 
+    def _save_appcds_setting(self, checked: bool):
+        if self.parent_window and hasattr(self.parent_window, 'settings'):
+            self.parent_window.settings['appcds'] = bool(checked)
+            save_settings(self.parent_window.settings)
+
+    def _save_prewarm_setting(self, checked: bool):
+        if self.parent_window and hasattr(self.parent_window, 'settings'):
+            self.parent_window.settings['prewarm'] = bool(checked)
+            save_settings(self.parent_window.settings)
+
     def _save_mc_args_setting(self):
         if self.parent_window and hasattr(self.parent_window, 'settings'):
             self.parent_window.settings['mc_args'] = self.mc_args_edit.text()
@@ -880,8 +918,11 @@ class SettingsTab(QWidget):
                 'java_mode': 'custom' if self.java_radio_custom.isChecked() else ('current' if self.java_radio_current.isChecked() else 'recommended'),
                 'java_path': self.java_path_edit.text(),
                 'jre_optimized_profile': self.jre_optimized_combo.currentData() or 'auto',
+                'gc_tuning': self.gc_tuning_combo.currentData() or 'off',
                 'jre_args': self.jre_args_edit.text(),
                 'update_legacy_ssl': self.ssl_legacy_checkbox.isChecked(),
+                'appcds': self.appcds_checkbox.isChecked(),
+                'prewarm': self.prewarm_checkbox.isChecked(),
                 'mc_args': self.mc_args_edit.text(),
                 'wrapper_cmd': self.wrapper_edit.text(),
                 'show_console': self.show_console_checkbox.isChecked(),
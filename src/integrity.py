@@ -0,0 +1,204 @@
+"""
+Индекс целостности установленных версий
+
+Для каждой версии хранит размер, mtime и ожидаемый SHA1 всех файлов, на которые
+она ссылается (клиент, библиотеки, natives, ассеты). Быстрая проверка перед
+запуском смотрит только на stat и пересчитывает хэш лишь у изменившихся файлов,
+а режим восстановления перекачивает только повреждённые и отсутствующие файлы.
+"""
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from config import CACHE_DIR
+from version_installer import (
+    Callback,
+    DownloadItem,
+    DownloadReport,
+    Downloader,
+    NativesExtract,
+    collect_version_files,
+    extract_natives,
+    sha1_of_file,
+)
+
+INTEGRITY_DIR: str = os.path.join(CACHE_DIR, 'integrity')
+INTEGRITY_FORMAT = 1
+
+
+@dataclass
+class VerifyResult:
+    checked: int = 0
+    hashed: int = 0
+    missing: list[DownloadItem] = field(default_factory=list)
+    corrupt: list[DownloadItem] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.missing and not self.corrupt
+
+    @property
+    def bad(self) -> list[DownloadItem]:
+        return self.missing + self.corrupt
+
+
+def _stat(path: str) -> tuple[int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+class IntegrityIndex:
+    """Индекс файлов одной версии"""
+
+    def __init__(self, version_id: str, minecraft_dir: str, index_dir: str = INTEGRITY_DIR) -> None:
+        self.version_id = version_id
+        self.minecraft_dir = minecraft_dir
+        safe_name = ''.join(c if c.isalnum() or c in '._-' else '_' for c in version_id)
+        self.path = os.path.join(index_dir, f'{safe_name}.json')
+        self._lock = threading.Lock()
+        self._data: dict = self._load()
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('format') == INTEGRITY_FORMAT:
+                return data
+        except (OSError, ValueError, AttributeError):
+            pass
+        return {}
+
+    def save(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._data, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logging.warning(f'[INTEGRITY] Не удалось сохранить индекс {self.version_id}: {e}')
+
+    def _version_json_stats(self) -> dict[str, list[int]]:
+        """stat всех JSON цепочки inheritsFrom — если они изменились, список файлов устарел"""
+        stats: dict[str, list[int]] = {}
+        current: str | None = self.version_id
+        while current and len(stats) < 16:
+            path = os.path.join(self.minecraft_dir, 'versions', current, f'{current}.json')
+            st = _stat(path)
+            if st is None:
+                break
+            stats[path] = list(st)
+            try:
+                with open(path, encoding='utf-8') as f:
+                    current = json.load(f).get('inheritsFrom')
+            except (OSError, ValueError):
+                break
+        return stats
+
+    def _is_list_fresh(self) -> bool:
+        return bool(self._data.get('files')) and self._data.get('sources') == self._version_json_stats()
+
+    def refresh(self, downloader: Downloader | None = None) -> None:
+        """Перестраивает список файлов версии, сохраняя уже проверенные stat"""
+        files = collect_version_files(self.version_id, self.minecraft_dir, downloader)
+        old_files = self._data.get('files', {})
+        new_files: dict[str, dict] = {}
+        for item in files.items:
+            entry = {'url': item.url, 'sha1': item.sha1, 'size': item.size, 'kind': item.kind}
+            previous = old_files.get(item.path)
+            if previous and previous.get('sha1') == item.sha1 and previous.get('verified'):
+                entry['verified'] = previous['verified']
+            new_files[item.path] = entry
+        self._data = {
+            'format': INTEGRITY_FORMAT,
+            'version': self.version_id,
+            'sources': self._version_json_stats(),
+            'files': new_files,
+            'natives': [[n.path, n.target_dir, n.exclude] for n in files.natives],
+        }
+        self.save()
+
+    def items(self) -> list[DownloadItem]:
+        return [
+            DownloadItem(entry['url'], path, entry.get('sha1'), entry.get('size'), entry.get('kind', 'file'))
+            for path, entry in self._data.get('files', {}).items()
+        ]
+
+    def mark_valid(self, items: list[DownloadItem]) -> None:
+        """Запоминает stat файлов, которые только что были проверены по SHA1 (например, установщиком)"""
+        files = self._data.get('files', {})
+        with self._lock:
+            for item in items:
+                entry = files.get(item.path)
+                st = _stat(item.path)
+                if entry is not None and st is not None:
+                    entry['verified'] = list(st)
+        self.save()
+
+    def _check(self, path: str, entry: dict, result: VerifyResult) -> DownloadItem | None:
+        """Возвращает DownloadItem, если файл нужно перекачать"""
+        item = DownloadItem(entry['url'], path, entry.get('sha1'), entry.get('size'), entry.get('kind', 'file'))
+        st = _stat(path)
+        if st is None:
+            with self._lock:
+                result.missing.append(item)
+            return item
+        size, _mtime = st
+        if (item.size is not None and size != item.size) or (item.size is None and size == 0):
+            with self._lock:
+                result.corrupt.append(item)
+            return item
+        if entry.get('verified') == list(st) or not item.sha1:
+            return None
+
+        # stat изменился с прошлой проверки — пересчитываем хэш
+        actual = sha1_of_file(path)
+        with self._lock:
+            result.hashed += 1
+            if actual == item.sha1:
+                entry['verified'] = list(st)
+                return None
+            result.corrupt.append(item)
+        return item
+
+    def verify(self, downloader: Downloader | None = None, max_workers: int = 8) -> VerifyResult:
+        """Быстрая проверка: stat для всех файлов, SHA1 — только для изменившихся"""
+        if not self._is_list_fresh():
+            self.refresh(downloader)
+
+        result = VerifyResult()
+        files = self._data.get('files', {})
+        result.checked = len(files)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(lambda kv: self._check(kv[0], kv[1], result), files.items()))
+        self.save()
+        return result
+
+    def repair(self, result: VerifyResult, callback: Callback | None = None) -> DownloadReport:
+        """Перекачивает только отсутствующие и повреждённые файлы"""
+        downloader = Downloader(callback=callback)
+        report = downloader.download_all(result.bad, status='Восстановление файлов', check_existing=False)
+        self.mark_valid(report.downloaded)
+        if any(item.kind == 'native' for item in report.downloaded):
+            extract_natives([NativesExtract(*entry) for entry in self._data.get('natives', [])])
+        report.raise_for_failures()
+        return report
+
+
+def verify_version(version_id: str, minecraft_dir: str, repair: bool = False, callback: Callback | None = None) -> VerifyResult:
+    """Проверяет файлы версии и при repair=True перекачивает испорченные"""
+    index = IntegrityIndex(version_id, minecraft_dir)
+    result = index.verify()
+    logging.info(
+        f'[INTEGRITY] {version_id}: проверено {result.checked}, хэшировано {result.hashed}, '
+        f'отсутствует {len(result.missing)}, повреждено {len(result.corrupt)}'
+    )
+    if repair and not result.ok:
+        index.repair(result, callback)
+    return result
@@ -0,0 +1,270 @@
+"""
+Индекс установленных Java
+
+Ищет java в PATH, JAVA_HOME, MINECRAFT_DIR/java, runtime/ minecraft_launcher_lib и в
+типичных папках установки JDK. Каждый бинарник опрашивается один раз: сначала читается
+файл release рядом с bin/, и только если его нет — запускается java. Результат
+(версия, вендор, архитектура) кэшируется по пути + mtime, так что при запуске игры
+выбор Java сводится к поиску в словаре.
+"""
+import glob
+import json
+import logging
+import os
+import platform
+import re
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+
+from config import CACHE_DIR, JAVA_DIR, MINECRAFT_DIR
+from java_runtime import find_java_binary
+
+JAVA_INDEX_PATH: str = os.path.join(CACHE_DIR, 'java_index.json')
+JAVA_INDEX_FORMAT = 1
+_JAVA_NAMES = ('javaw.exe', 'java.exe') if os.name == 'nt' else ('java',)
+
+
+@dataclass
+class JavaInstallation:
+    path: str
+    version: str
+    major: int
+    vendor: str = ''
+    arch: str = ''
+    source: str = ''
+
+
+def parse_major(version: str) -> int:
+    """'1.8.0_392' -> 8, '17.0.8' -> 17, '21' -> 21"""
+    parts = re.findall(r'\d+', version)
+    if not parts:
+        return 0
+    if parts[0] == '1' and len(parts) > 1:
+        return int(parts[1])
+    return int(parts[0])
+
+
+def _read_release(java_path: str) -> dict[str, str] | None:
+    """Читает файл release из JAVA_HOME (на уровень выше bin/)"""
+    release_path = os.path.join(os.path.dirname(os.path.dirname(java_path)), 'release')
+    try:
+        with open(release_path, encoding='utf-8', errors='replace') as f:
+            content = f.read()
+    except OSError:
+        return None
+    values = dict(re.findall(r'^([A-Z_]+)="?(.*?)"?\s*$', content, re.MULTILINE))
+    return values if values.get('JAVA_VERSION') else None
+
+
+def _spawn_probe(java_path: str) -> dict[str, str] | None:
+    """Запускает java и читает системные свойства (только если нет файла release)"""
+    try:
+        result = subprocess.run(
+            [java_path, '-XshowSettings:properties', '-version'],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            timeout=15,
+            creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0),
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    output = result.stderr or result.stdout
+    props = dict(re.findall(r'^\s+([\w.]+) = (.*)$', output, re.MULTILINE))
+    version = props.get('java.version')
+    if not version:
+        match = re.search(r'version "([^"]+)"', output)
+        version = match.group(1) if match else None
+    if not version:
+        return None
+    return {'JAVA_VERSION': version, 'IMPLEMENTOR': props.get('java.vendor', ''), 'OS_ARCH': props.get('os.arch', '')}
+
+
+def probe_java(java_path: str, source: str = '') -> JavaInstallation | None:
+    info = _read_release(java_path) or _spawn_probe(java_path)
+    if not info:
+        return None
+    version = info['JAVA_VERSION']
+    return JavaInstallation(
+        path=java_path,
+        version=version,
+        major=parse_major(version),
+        vendor=info.get('IMPLEMENTOR', ''),
+        arch=info.get('OS_ARCH', ''),
+        source=source,
+    )
+
+
+def _binary_in(home: str) -> str | None:
+    for name in _JAVA_NAMES:
+        path = os.path.join(home, 'bin', name)
+        if os.path.isfile(path):
+            return path
+    return None
+
+
+def _common_homes() -> list[str]:
+    """Типичные папки установки JDK/JRE для текущей ОС"""
+    patterns: list[str] = []
+    home = os.path.expanduser('~')
+    if os.name == 'nt':
+        for root in {os.environ.get('ProgramFiles', r'C:\Program Files'), os.environ.get('ProgramFiles(x86)', '')}:
+            if not root:
+                continue
+            for vendor in ('Java', 'Eclipse Adoptium', 'Eclipse Foundation', 'Zulu', 'Microsoft', 'BellSoft', 'Amazon Corretto'):
+                patterns.append(os.path.join(root, vendor, '*'))
+    elif platform.system() == 'Darwin':
+        patterns += [
+            '/Library/Java/JavaVirtualMachines/*/Contents/Home',
+            os.path.join(home, 'Library/Java/JavaVirtualMachines/*/Contents/Home'),
+        ]
+    else:
+        patterns += ['/usr/lib/jvm/*', '/usr/java/*', '/opt/java/*', '/opt/jdk*']
+    patterns += [os.path.join(home, '.sdkman/candidates/java/*'), os.path.join(home, '.jdks/*')]
+
+    homes: list[str] = []
+    for pattern in patterns:
+        homes.extend(glob.glob(pattern))
+    return homes
+
+
+def discover_candidates(minecraft_dir: str = MINECRAFT_DIR, java_dir: str = JAVA_DIR) -> dict[str, str]:
+    """Все найденные бинарники java: {путь: источник}"""
+    found: dict[str, str] = {}
+
+    def add(path: str | None, source: str) -> None:
+        if path and os.path.isfile(path):
+            found.setdefault(os.path.realpath(path), source)
+
+    for directory in os.environ.get('PATH', '').split(os.pathsep):
+        if directory:
+            for name in _JAVA_NAMES:
+                add(os.path.join(directory, name), 'path')
+    if os.environ.get('JAVA_HOME'):
+        add(_binary_in(os.environ['JAVA_HOME']), 'java_home')
+    for root in glob.glob(os.path.join(java_dir, '*')):
+        add(find_java_binary(root), 'launcher')
+    # Рантаймы minecraft_launcher_lib: runtime/<component>/<platform>/<component>
+    for root in glob.glob(os.path.join(minecraft_dir, 'runtime', '*', '*', '*')):
+        add(find_java_binary(root), 'launcher')
+    for home in _common_homes():
+        add(_binary_in(home), 'system')
+    return found
+
+
+def _stat_key(path: str) -> list[int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+class JavaDiscovery:
+    """Кэшированный индекс установленных Java"""
+
+    def __init__(self, index_path: str = JAVA_INDEX_PATH) -> None:
+        self.index_path = index_path
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] = self._load()
+        self._installations: dict[str, JavaInstallation] | None = None
+
+    def _load(self) -> dict[str, dict]:
+        try:
+            with open(self.index_path, encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('format') == JAVA_INDEX_FORMAT:
+                return data.get('entries', {})
+        except (OSError, ValueError, AttributeError):
+            pass
+        return {}
+
+    def _save(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            tmp_path = f'{self.index_path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'format': JAVA_INDEX_FORMAT, 'entries': self._entries}, f, indent=4)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            logging.warning(f'[JAVA] Не удалось сохранить индекс Java: {e}')
+
+    def _lookup(self, path: str, source: str) -> JavaInstallation | None:
+        """Берёт данные из индекса, если бинарник не менялся, иначе опрашивает его"""
+        key = _stat_key(path)
+        if key is None:
+            return None
+        entry = self._entries.get(path)
+        if entry and entry.get('stat') == key:
+            info = entry.get('info')
+            return JavaInstallation(**{**info, 'source': source}) if info else None
+        installation = probe_java(path, source)
+        with self._lock:
+            self._entries[path] = {'stat': key, 'info': asdict(installation) if installation else None}
+        return installation
+
+    def scan(self, force: bool = False) -> list[JavaInstallation]:
+        """Находит все Java; повторные вызовы берут результат из памяти"""
+        if self._installations is not None and not force:
+            return list(self._installations.values())
+
+        candidates = discover_candidates()
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda kv: self._lookup(*kv), candidates.items()))
+
+        installations = {item.path: item for item in results if item is not None}
+        with self._lock:
+            # Удаляем из индекса исчезнувшие бинарники
+            self._entries = {path: entry for path, entry in self._entries.items() if os.path.isfile(path)}
+            self._save()
+            self._installations = installations
+        logging.debug(f'[JAVA] Найдено установок Java: {len(installations)}')
+        return list(installations.values())
+
+    def get(self, java_path: str) -> JavaInstallation | None:
+        """Данные о конкретном бинарнике (например, пользовательском пути из настроек)"""
+        path = os.path.realpath(java_path)
+        self.scan()
+        installation = self._installations.get(path) if self._installations else None
+        if installation is None:
+            installation = self._lookup(path, 'custom')
+            if installation is not None:
+                with self._lock:
+                    self._save()
+        return installation
+
+    def path_java(self) -> JavaInstallation | None:
+        """Java, которая будет запущена командой java из PATH"""
+        for directory in os.environ.get('PATH', '').split(os.pathsep):
+            for name in _JAVA_NAMES:
+                candidate = os.path.join(directory, name)
+                if directory and os.path.isfile(candidate):
+                    return self.get(candidate)
+        return None
+
+    def find(self, major: int, exact: bool = True) -> JavaInstallation | None:
+        """Подходящая Java: точное совпадение major-версии, при exact=False — ближайшая новее"""
+        installations = self.scan()
+        # Рантаймы лаунчера предпочтительнее системных
+        priority = {'launcher': 0, 'java_home': 1, 'path': 2, 'system': 3}
+        exact_matches = [i for i in installations if i.major == major]
+        if exact_matches:
+            return min(exact_matches, key=lambda i: priority.get(i.source, 9))
+        if exact:
+            return None
+        newer = [i for i in installations if i.major > major]
+        return min(newer, key=lambda i: (i.major, priority.get(i.source, 9))) if newer else None
+
+
+# Глобальный экземпляр
+_java_discovery: JavaDiscovery | None = None
+
+
+def get_java_discovery() -> JavaDiscovery:
+    """Получить глобальный индекс установленных Java"""
+    global _java_discovery
+    if _java_discovery is None:
+        _java_discovery = JavaDiscovery()
+    return _java_discovery
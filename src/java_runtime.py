@@ -0,0 +1,376 @@
+"""
+Менеджер сред выполнения Java
+
+Нужная версия Java берётся из javaVersion в JSON версии (component и majorVersion).
+Рантайм ставится из манифеста java-runtime Mojang для текущей ОС/архитектуры,
+а если Mojang не поставляет его для этой платформы — из Adoptium.
+Каждый компонент хранится в MINECRAFT_DIR/java/<component> и выбирается при запуске
+автоматически, поэтому на чистой машине любую версию можно запустить без ручной установки Java.
+"""
+import json
+import logging
+import os
+import platform
+import shutil
+import stat
+import tempfile
+import threading
+from dataclasses import dataclass, field
+
+import requests
+
+from archive_stream import download_and_extract
+from config import JAVA_DIR
+from version_installer import Callback, DownloadItem, Downloader, USER_AGENT, resolve_version_chain
+
+JAVA_RUNTIME_MANIFEST_URL = (
+    'https://launchermeta.mojang.com/v1/products/java-runtime/2ec0cc96c44e5a76b9c8b7c39df7210883d12871/all.json'
+)
+ADOPTIUM_API_URL = 'https://api.adoptium.net/v3'
+# Файл с описанием установленного рантайма внутри его папки
+RUNTIME_INFO_FILE = '.16launcher-runtime.json'
+# Для версий без javaVersion (до 1.17) Mojang использует Java 8
+DEFAULT_COMPONENT = 'jre-legacy'
+DEFAULT_MAJOR = 8
+# Компоненты Mojang для известных major-версий; для остальных используется adoptium-<major>
+MOJANG_COMPONENTS: dict[int, str] = {
+    8: 'jre-legacy',
+    16: 'java-runtime-alpha',
+    17: 'java-runtime-gamma',
+    21: 'java-runtime-delta',
+}
+
+
+class JavaRuntimeError(RuntimeError):
+    pass
+
+
+@dataclass
+class MojangRuntimeFiles:
+    """Файлы рантайма Mojang, которые нужно скачать в staging-папку перед установкой"""
+
+    component: str
+    major: int
+    platform: str
+    version: str | None
+    staging: str
+    items: list[DownloadItem] = field(default_factory=list)
+    executables: list[str] = field(default_factory=list)
+    links: list[tuple[str, str]] = field(default_factory=list)
+
+
+def _machine() -> str:
+    machine = platform.machine().lower()
+    if machine in ('amd64', 'x86_64', 'x64'):
+        return 'x64'
+    if machine in ('arm64', 'aarch64', 'armv8l'):
+        return 'arm64'
+    if machine in ('i386', 'i686', 'x86'):
+        return 'x86'
+    return machine
+
+
+def mojang_platform() -> str:
+    """Ключ платформы в манифесте java-runtime Mojang"""
+    system = platform.system()
+    machine = _machine()
+    if system == 'Windows':
+        return {'x86': 'windows-x86', 'arm64': 'windows-arm64'}.get(machine, 'windows-x64')
+    if system == 'Darwin':
+        return 'mac-os-arm64' if machine == 'arm64' else 'mac-os'
+    if system == 'Linux':
+        # У Mojang есть только x64 и i386; для ARM и прочих ключа нет, и рантайм берётся из Adoptium
+        return {'x64': 'linux', 'x86': 'linux-i386'}.get(machine, f'linux-{machine}')
+    return 'gamecore'
+
+
+def adoptium_platform() -> tuple[str, str]:
+    """(os, architecture) в терминах API Adoptium"""
+    system = platform.system()
+    os_name = {'Windows': 'windows', 'Darwin': 'mac', 'Linux': 'linux'}.get(system, system.lower())
+    arch = {'x64': 'x64', 'arm64': 'aarch64', 'x86': 'x32'}.get(_machine(), _machine())
+    return os_name, arch
+
+
+def required_java(version_id: str, minecraft_dir: str) -> tuple[str, int]:
+    """(component, majorVersion) для версии с учётом цепочки inheritsFrom"""
+    for data in resolve_version_chain(version_id, minecraft_dir):
+        java_version = data.get('javaVersion')
+        if java_version:
+            return java_version.get('component') or DEFAULT_COMPONENT, int(java_version.get('majorVersion') or DEFAULT_MAJOR)
+    return DEFAULT_COMPONENT, DEFAULT_MAJOR
+
+
+def component_for_major(major: int) -> str:
+    return MOJANG_COMPONENTS.get(major, f'adoptium-{major}')
+
+
+def find_java_binary(root: str) -> str | None:
+    """Ищет исполняемый файл java внутри распакованного рантайма"""
+    names = ('javaw.exe', 'java.exe') if os.name == 'nt' else ('java',)
+    # Mojang на macOS кладёт JRE в jre.bundle, Adoptium — в Contents/Home
+    prefixes = ('', 'jre.bundle/Contents/Home', 'Contents/Home')
+    for prefix in prefixes:
+        for name in names:
+            path = os.path.join(root, prefix, 'bin', name)
+            if os.path.isfile(path):
+                return path
+    return None
+
+
+def _noop(*_args) -> None:
+    pass
+
+
+def _make_executable(path: str) -> None:
+    if os.name == 'nt':
+        return
+    try:
+        mode = os.stat(path).st_mode
+        os.chmod(path, mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    except OSError:
+        pass
+
+
+class JavaRuntimeManager:
+    """Установка и выбор рантаймов Java в MINECRAFT_DIR/java"""
+
+    def __init__(self, java_dir: str = JAVA_DIR) -> None:
+        self.java_dir = java_dir
+        self._lock = threading.Lock()
+        self._mojang_manifest: dict | None = None
+
+    def runtime_dir(self, component: str) -> str:
+        return os.path.join(self.java_dir, component)
+
+    def _read_info(self, root: str) -> dict | None:
+        try:
+            with open(os.path.join(root, RUNTIME_INFO_FILE), encoding='utf-8') as f:
+                info = json.load(f)
+            return info if isinstance(info, dict) else None
+        except (OSError, ValueError):
+            return None
+
+    def _write_info(self, root: str, info: dict) -> None:
+        with open(os.path.join(root, RUNTIME_INFO_FILE), 'w', encoding='utf-8') as f:
+            json.dump(info, f, indent=4)
+
+    def installed(self) -> dict[str, dict]:
+        """Установленные рантаймы: {component: info}"""
+        result: dict[str, dict] = {}
+        try:
+            names = os.listdir(self.java_dir)
+        except OSError:
+            return result
+        for name in names:
+            root = self.runtime_dir(name)
+            info = self._read_info(root)
+            if info and find_java_binary(root):
+                result[name] = info
+        return result
+
+    def find(self, component: str | None = None, major: int | None = None) -> str | None:
+        """Путь к java для компонента (или любого рантайма нужной major-версии) без сетевых запросов"""
+        if component:
+            root = self.runtime_dir(component)
+            if self._read_info(root):
+                java = find_java_binary(root)
+                if java:
+                    return java
+        if major is not None:
+            for name, info in self.installed().items():
+                if info.get('major') == major:
+                    return find_java_binary(self.runtime_dir(name))
+        return None
+
+    def _load_mojang_manifest(self) -> dict:
+        if self._mojang_manifest is None:
+            r = requests.get(JAVA_RUNTIME_MANIFEST_URL, headers={'User-Agent': USER_AGENT}, timeout=20)
+            r.raise_for_status()
+            self._mojang_manifest = r.json()
+        return self._mojang_manifest
+
+    def _staging_dir(self, component: str) -> str:
+        os.makedirs(self.java_dir, exist_ok=True)
+        return tempfile.mkdtemp(prefix=f'.{component}-', dir=self.java_dir)
+
+    def _commit(self, staging: str, component: str) -> str:
+        """Атомарно заменяет папку рантайма подготовленной staging-папкой"""
+        target = self.runtime_dir(component)
+        if os.path.exists(target):
+            old = f'{target}.old'
+            shutil.rmtree(old, ignore_errors=True)
+            os.replace(target, old)
+            os.replace(staging, target)
+            shutil.rmtree(old, ignore_errors=True)
+        else:
+            os.replace(staging, target)
+        return target
+
+    def prepare_mojang(self, component: str, major: int) -> MojangRuntimeFiles | None:
+        """Список файлов рантайма из манифеста Mojang со staging-папкой; None — если для платформы его нет"""
+        platform_key = mojang_platform()
+        entries = self._load_mojang_manifest().get(platform_key, {}).get(component) or []
+        if not entries:
+            return None
+        entry = entries[0]
+        r = requests.get(entry['manifest']['url'], headers={'User-Agent': USER_AGENT}, timeout=20)
+        r.raise_for_status()
+        files: dict[str, dict] = r.json().get('files', {})
+
+        staging = self._staging_dir(component)
+        result = MojangRuntimeFiles(component, major, platform_key, entry.get('version', {}).get('name'), staging)
+        try:
+            for rel_path, meta in files.items():
+                path = os.path.join(staging, rel_path)
+                if meta.get('type') == 'directory':
+                    os.makedirs(path, exist_ok=True)
+                elif meta.get('type') == 'link':
+                    result.links.append((path, meta['target']))
+                elif meta.get('type') == 'file':
+                    raw = meta['downloads']['raw']
+                    result.items.append(DownloadItem(raw['url'], path, raw.get('sha1'), raw.get('size'), 'runtime'))
+                    if meta.get('executable'):
+                        result.executables.append(path)
+
+            # Файлы уже установленного рантайма переиспользуем, если их SHA1 совпадает
+            current = self.runtime_dir(component)
+            if os.path.isdir(current):
+                for item in result.items:
+                    existing = os.path.join(current, os.path.relpath(item.path, staging))
+                    if os.path.isfile(existing):
+                        os.makedirs(os.path.dirname(item.path), exist_ok=True)
+                        shutil.copy2(existing, item.path)
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        return result
+
+    def commit_mojang(self, files: MojangRuntimeFiles) -> str:
+        """Завершает установку скачанного рантайма: права, ссылки, описание и замена папки"""
+        for path in files.executables:
+            _make_executable(path)
+        for path, target in files.links:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            try:
+                os.symlink(target, path)
+            except OSError:
+                pass
+
+        self._write_info(
+            files.staging,
+            {
+                'component': files.component,
+                'major': files.major,
+                'version': files.version,
+                'source': 'mojang',
+                'platform': files.platform,
+            },
+        )
+        return self._commit(files.staging, files.component)
+
+    def install_mojang(self, component: str, major: int, callback: Callback | None = None) -> str | None:
+        """Устанавливает рантайм из манифеста Mojang; None — если для платформы его нет"""
+        files = self.prepare_mojang(component, major)
+        if files is None:
+            return None
+        try:
+            report = Downloader(callback=callback).download_all(files.items, status=f'Загрузка Java ({component})')
+            report.raise_for_failures()
+            return self.commit_mojang(files)
+        finally:
+            shutil.rmtree(files.staging, ignore_errors=True)
+
+    def install_adoptium(self, component: str, major: int, callback: Callback | None = None) -> str:
+        """Устанавливает JRE (или JDK, если JRE нет) нужной major-версии из Adoptium"""
+        os_name, arch = adoptium_platform()
+        package = None
+        release_name = None
+        for image_type in ('jre', 'jdk'):
+            r = requests.get(
+                f'{ADOPTIUM_API_URL}/assets/latest/{major}/hotspot',
+                params={'architecture': arch, 'os': os_name, 'image_type': image_type},
+                headers={'User-Agent': USER_AGENT},
+                timeout=20,
+            )
+            if r.status_code == 404:
+                continue
+            r.raise_for_status()
+            for asset in r.json() or []:
+                candidate = (asset.get('binary') or {}).get('package') or {}
+                if candidate.get('link', '').endswith(('.zip', '.tar.gz')):
+                    package = candidate
+                    release_name = asset.get('release_name')
+                    break
+            if package:
+                break
+        if package is None:
+            raise JavaRuntimeError(f'Java {major} for {os_name}/{arch} not found')
+
+        staging = self._staging_dir(component)
+        try:
+            # Архив распаковывается прямо в staging по мере скачивания, корневая папка отбрасывается
+            callback = callback or {}
+            total_max = max(int(package.get('size') or 0), 1)
+            callback.get('setStatus', _noop)(f'Загрузка Java {major}')
+            callback.get('setMax', _noop)(total_max)
+            last_reported = 0
+
+            def on_progress(done: int, _total: int) -> None:
+                nonlocal last_reported
+                if done - last_reported >= total_max // 100 or done >= total_max:
+                    last_reported = done
+                    callback.get('setProgress', _noop)(done)
+
+            download_and_extract(package['link'], staging, package.get('checksum'), on_progress)
+
+            java = find_java_binary(staging)
+            if not java:
+                raise JavaRuntimeError('java executable not found in Adoptium archive')
+            _make_executable(java)
+            self._write_info(
+                staging,
+                {'component': component, 'major': major, 'version': release_name, 'source': 'adoptium'},
+            )
+            return self._commit(staging, component)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def ensure(self, component: str, major: int, callback: Callback | None = None) -> str:
+        """Возвращает java для компонента, устанавливая рантайм при необходимости"""
+        java = self.find(component)
+        if java:
+            return java
+        with self._lock:
+            java = self.find(component)
+            if java:
+                return java
+            logging.info(f'[JAVA] Установка рантайма {component} (Java {major})')
+            try:
+                root = self.install_mojang(component, major, callback)
+            except requests.RequestException as e:
+                logging.warning(f'[JAVA] Манифест Mojang недоступен: {e}')
+                root = None
+            if root is None:
+                logging.info(f'[JAVA] Mojang не поставляет {component} для {mojang_platform()}, используем Adoptium')
+                root = self.install_adoptium(component, major, callback)
+            java = find_java_binary(root)
+            if not java:
+                raise JavaRuntimeError(f'java executable not found in {root}')
+            return java
+
+    def ensure_for_version(self, version_id: str, minecraft_dir: str, callback: Callback | None = None) -> str:
+        component, major = required_java(version_id, minecraft_dir)
+        return self.ensure(component, major, callback)
+
+
+# Глобальный экземпляр
+_runtime_manager: JavaRuntimeManager | None = None
+
+
+def get_runtime_manager() -> JavaRuntimeManager:
+    """Получить глобальный менеджер рантаймов Java"""
+    global _runtime_manager
+    if _runtime_manager is None:
+        _runtime_manager = JavaRuntimeManager()
+    return _runtime_manager
@@ -0,0 +1,800 @@
+"""
+Запуск игры без привязки к UI
+
+LaunchCore выполняет всю подготовку (конвейер этапов: authlib, индекс Java,
+определение и установка версии, план запуска, прогрев, выбор Java), собирает
+команду, запускает процесс и подводит итоги после его выхода. Настройки и сессия
+Ely.by передаются явно, а о ходе запуска ядро сообщает через колбэки
+LaunchEvents, поэтому его используют и окно лаунчера (через LaunchThread), и
+консольная команда launch без Qt.
+"""
+import logging
+import os
+import re
+import subprocess
+import traceback
+from uuid import uuid1
+from datetime import datetime
+
+import shlex
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+from agent_artifacts import get_agent_artifacts
+from appcds import MODE_CREATE, CdsEntry, archive_key, get_cds_archives
+from config import MINECRAFT_DIR, ELYBY_HOST
+from ely_skin_manager import SKIN_MAX_AGE, ElySkinManager
+from flow import dedicate
+from game_log import GameLogPump, StartupTimer
+from gc_tuning import GC_LOGS_DIR, gc_log_args, gc_log_path, get_gc_tuner
+from launch_plan import LaunchPlan, get_launch_plan_cache
+from launch_stages import DEFAULT_HEAVY_SLOTS, LaunchCancelled, Stage, StagePipeline, StageResults, get_heavy_phase_limiter
+from legacy_patch import ensure_patched_jar, substitute_jar
+from integrity import IntegrityIndex
+from java_discovery import get_java_discovery
+from java_runtime import DEFAULT_COMPONENT, DEFAULT_MAJOR, get_runtime_manager
+from launch_history import LaunchRecord, get_launch_history, jvm_args_hash, mods_fingerprint
+from loader_meta import get_loader_metadata
+from prewarm import PrewarmJob, collect_paths, get_prewarmer
+from process_registry import get_process_registry
+from resource_monitor import DEFAULT_INTERVAL, ProcessMonitor
+from session_logs import GameSession, get_session_logs
+from version_installer import install_version
+
+
+# Выход раньше этого числа секунд после старта считается ранним
+EARLY_EXIT_WINDOW = 10
+
+
+@dataclass
+class GameRun:
+    """Состояние одного запущенного процесса игры, нужное после его выхода"""
+
+    process: subprocess.Popen
+    version: str
+    heap_mb: int
+    game_log: GameLogPump | None = None
+    session: GameSession | None = None
+    monitor: ProcessMonitor | None = None
+    gc_log: str | None = None
+    cds_entry: CdsEntry | None = None
+    cds_mode: str | None = None
+    prewarm: PrewarmJob | None = None
+    startup: StartupTimer | None = None
+    # Замер времени запуска; None после сохранения в историю
+    bench: LaunchRecord | None = None
+    started: float = field(default_factory=time.time)
+    # Итоги запуска подведены (процесс завершился)
+    finished: threading.Event = field(default_factory=threading.Event)
+
+
+def _ignore(*_args) -> None:
+    pass
+
+
+@dataclass
+class LaunchEvents:
+    """Колбэки хода запуска; вызываются из рабочих потоков, а не из вызывающего"""
+
+    log: Callable[[str], None] = _ignore
+    # Текущее значение, максимум и текст этапа (пустой текст — этап не сменился)
+    progress: Callable[[int, int, str], None] = _ignore
+    # Идёт ли подготовка к запуску
+    state: Callable[[bool], None] = _ignore
+    # Порция строк вывода игры (stdout/stderr JVM)
+    log_batch: Callable[[list[str]], None] = _ignore
+    # Замер ресурсов процесса игры (ResourceSample или None после выхода) и -Xmx запуска в МБ
+    resources: Callable[[object, int], None] = _ignore
+    # Процесс игры завершился (код выхода)
+    game_exited: Callable[[int], None] = _ignore
+    close_launcher: Callable[[], None] = _ignore
+
+
+class LaunchCore:
+    """Подготовка и запуск игры; настройки и сессия Ely.by передаются явно"""
+
+    def __init__(self, settings: dict | None = None, ely_session: dict | None = None, events: LaunchEvents | None = None):
+        self.settings = settings or {}
+        self.ely_session = ely_session
+        self.events = events or LaunchEvents()
+        self.version_id = ''
+        self.username = ''
+        self.loader_type = 'vanilla'
+        self.memory_mb = 4096
+        self.close_on_launch = False
+
+        self._install_max = 100
+        self._cancel_event = threading.Event()
+        self._pipeline: StagePipeline | None = None
+        self._options: dict = {}
+        self.game_log: GameLogPump | None = None
+        # Процесс игры, запущенный последним вызовом launch (None, пока не запущен)
+        self.game_run: GameRun | None = None
+
+    def launch(
+        self,
+        version_id: str,
+        username: str,
+        loader_type: str = 'vanilla',
+        memory_mb: int = 4096,
+        close_on_launch: bool = False,
+    ) -> GameRun | None:
+        """Готовит и запускает игру; возвращает запущенный процесс или None при ошибке и отмене"""
+        self.version_id = version_id
+        self.username = username
+        self.loader_type = loader_type
+        self.memory_mb = memory_mb
+        self.close_on_launch = close_on_launch
+        try:
+            self.log(f'Starting Minecraft launch process for user: {self.username}')
+            self.events.state(True)
+
+            # 1. Определение базовых параметров
+            self._cancel_event.clear()
+            self.game_run = None
+            # Точка отсчёта замеров: нажатие «Играть»
+            self._launch_started = time.monotonic()
+            # Рабочая директория — глобальная папка лаунчера
+            self.effective_dir = MINECRAFT_DIR
+            options = {
+                'username': self.username,
+                'uuid': str(uuid1()),
+                'token': '',
+                'jvmArguments': [
+                    f'-Xmx{self.memory_mb}M',
+                    f'-Xms{min(self.memory_mb // 2, 2048)}M',
+                ],
+                'launcherName': '16Launcher',
+                'launcherVersion': '1.0.3',
+                'demo': False,
+                'fullscreen': 'false',
+            }
+
+            # Добавляем пользовательские JRE аргументы из настроек
+            try:
+                raw_args = self.settings.get('jre_args', '') or ''
+                if isinstance(raw_args, str) and raw_args.strip():
+                    split_args = shlex.split(raw_args, posix=(os.name != 'nt'))
+                    options['jvmArguments'].extend(split_args)
+            except Exception:
+                logging.exception('Failed to parse custom JRE args; ignoring')
+
+            ely_session = self.ely_session
+            if ely_session:
+                self.log('Applying Ely.by session...')
+                options.update(
+                    {
+                        'username': ely_session['username'],
+                        'uuid': ely_session['uuid'],
+                        'token': ely_session['token'],
+                    }
+                )
+                if not self.is_legacy_version(self.version_id):
+                    dedicate(self.sync_skin, ely_session['username'])
+
+            # Оптимизационные профили JVM (после Xmx/Xms и пользовательских аргументов)
+            try:
+                settings_obj = self.settings
+                preset = settings_obj.get('jre_optimized_profile', 'auto')
+                if preset in ('auto', 'g1gc'):
+                    options['jvmArguments'].extend(
+                        [
+                            '-XX:+UseG1GC',
+                            '-XX:+UnlockExperimentalVMOptions',
+                            '-XX:G1NewSizePercent=20',
+                            '-XX:G1ReservePercent=20',
+                            '-XX:MaxGCPauseMillis=50',
+                            '-XX:G1HeapRegionSize=16M',
+                        ]
+                    )
+            except Exception:
+                logging.exception('Failed to apply optimized JVM preset')
+
+            # Обновлять устаревшие SSL-сертификаты (Windows trust store)
+            try:
+                settings_obj = self.settings
+                if bool(settings_obj.get('update_legacy_ssl', False)):
+                    options['jvmArguments'].append('-Djavax.net.ssl.trustStoreType=Windows-ROOT')
+            except Exception:
+                logging.exception('Failed to apply legacy SSL setting')
+
+            # 2-6. Подготовка: независимые этапы (authlib, индекс Java, определение версии) идут параллельно
+            self._pipeline = StagePipeline(
+                [
+                    # Без authlib-injector сессия Ely.by не работает: ошибка этапа останавливает запуск
+                    Stage('authlib', self.stage_authlib, optional=not ely_session),
+                    Stage('legacy_skin', self.stage_legacy_skin, optional=True),
+                    Stage('java_index', self.stage_java_index, optional=True),
+                    Stage('resolve', self.stage_resolve),
+                    Stage('install', self.stage_install, deps=('resolve',)),
+                    Stage('legacy_patch', self.stage_legacy_patch, deps=('install',), optional=True),
+                    Stage('plan', self.stage_plan, deps=('install',)),
+                    Stage('prewarm', self.stage_prewarm, deps=('plan',), optional=True),
+                    Stage('java', self.stage_java, deps=('plan', 'java_index')),
+                ],
+                cancel_event=self._cancel_event,
+            )
+            self._options = options
+            try:
+                results = self._pipeline.run()
+            finally:
+                self.log(f'[STAGES] {self._pipeline.summary()}')
+            prepared = time.monotonic()
+
+            if results['authlib']:
+                options['jvmArguments'].append(f'-javaagent:{results["authlib"]}={ELYBY_HOST}')
+            launch_version = results['resolve']
+            java_path = results['java'] or results['plan'].java_executable()
+            java_major = self.java_major(java_path, results['plan'])
+            jvm_args, gc_log, heap_mb = self.tune_jvm_args(options['jvmArguments'], launch_version, java_major)
+            # Хэш флагов JVM без аргументов архива классов: они чередуются между запусками
+            jvm_hash = jvm_args_hash(jvm_args)
+            cds_args, cds_entry, cds_mode = self.prepare_cds(launch_version, java_path, java_major, results['plan'])
+            jvm_args = jvm_args + cds_args
+            command = results['plan'].build_command(
+                options['username'],
+                options['uuid'],
+                options['token'],
+                jvm_args=jvm_args,
+            )
+            if results['legacy_patch']:
+                original_jar = os.path.join(self.effective_dir, 'versions', launch_version, f'{launch_version}.jar')
+                command = substitute_jar(command, original_jar, results['legacy_patch'])
+            if results['java']:
+                command[0] = results['java']
+            self.log(f'[JAVA] {command[0]}')
+
+            # Аргументы Minecraft (добавляем в конец)
+            try:
+                settings_obj = self.settings
+                mc_raw = settings_obj.get('mc_args', '') or ''
+                if isinstance(mc_raw, str) and mc_raw.strip():
+                    mc_parts = shlex.split(mc_raw, posix=(os.name != 'nt'))
+                    command = command + mc_parts
+            except Exception:
+                logging.exception('Failed to append Minecraft args')
+            # Обрезаем/маскируем чувствительные части, если нужно — тут просто логим команду
+            try:
+                command_str = ' '.join(command)
+            except Exception:
+                command_str = str(command)
+            self.log(f'[BUILD] Final command: {command_str}')
+
+            # Команда-обёртка: подставляем %command%
+            exec_command = command
+            use_shell = False
+            try:
+                settings_obj = self.settings
+                wrapper = settings_obj.get('wrapper_cmd', '') or ''
+                if isinstance(wrapper, str) and wrapper.strip():
+                    quoted = ' '.join(shlex.quote(p) for p in command)
+                    wrapper_str = wrapper.replace('%command%', quoted)
+                    exec_command = wrapper_str
+                    use_shell = True
+                    self.log(f'[BUILD] Wrapper applied: {wrapper_str}')
+            except Exception:
+                logging.exception('Failed to apply wrapper command')
+
+            # 7. Запуск процесса
+            if self._cancel_event.is_set():
+                raise LaunchCancelled()
+            self.log('[LAUNCH] Starting Minecraft process...')
+            # Для Windows добавляем флаг CREATE_NO_WINDOW чтобы скрыть консольное окно
+            creation_flags = 0
+            if os.name == 'nt':  # Windows
+                creation_flags = subprocess.CREATE_NEW_PROCESS_GROUP | subprocess.CREATE_NO_WINDOW
+            
+            minecraft_process = subprocess.Popen(
+                exec_command,
+                creationflags=creation_flags,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                shell=use_shell,
+            )
+
+            game_run = GameRun(
+                minecraft_process,
+                launch_version,
+                heap_mb,
+                gc_log=gc_log,
+                cds_entry=cds_entry,
+                cds_mode=cds_mode,
+                prewarm=results['prewarm'],
+            )
+            self.game_run = game_run
+            startup = game_run.startup = StartupTimer(lambda seconds: self.on_game_ready(game_run, seconds))
+            game_run.bench = self.begin_benchmark(launch_version, java_major, jvm_hash, game_run, prepared)
+
+            def deliver(batch: list[str]) -> None:
+                startup.feed(batch)
+                self.events.log_batch(batch)
+
+            # Вывод игры читается блоками и уходит в консоль порциями, а полностью — в сжатый лог сессии
+            raw_log = None
+            try:
+                game_run.session, raw_log = get_session_logs().start(launch_version, self.loader_type, heap_mb)
+            except Exception:
+                logging.exception('Failed to open game session log')
+            try:
+                self.game_log = game_run.game_log = GameLogPump(deliver, raw=raw_log)
+                self.game_log.start(minecraft_process.stdout, minecraft_process.stderr)
+            except Exception:
+                logging.exception('Failed to start game output pump')
+            # С командой-обёрткой Popen возвращает PID оболочки, а не JVM: после перезапуска лаунчера
+            # проверка жизни следила бы не за тем процессом. Такой запуск отслеживается только в этой сессии
+            if not use_shell:
+                try:
+                    get_process_registry().register(
+                        minecraft_process.pid,
+                        self.version_id,
+                        self.loader_type,
+                        exec_command,
+                        game_run.session.id if game_run.session else None,
+                    )
+                except Exception:
+                    logging.exception('Failed to register game process')
+            game_run.monitor = self.start_resource_monitor(minecraft_process.pid, heap_mb)
+
+            self.log(f'[LAUNCH] Minecraft process started (PID {minecraft_process.pid}).')
+
+            # Завершение процесса (и ранний выход) отслеживается в фоне, запуск не ждёт
+            dedicate(self.watch_process, game_run)
+
+            # 8. Закрытие лаунчера если нужно
+            if self.close_on_launch:
+                self.log('[LAUNCH] Closing launcher as requested...')
+                self.events.close_launcher()
+
+            self.events.state(False)
+            self.log('[LAUNCH] Launch completed successfully')
+            return game_run
+
+        except LaunchCancelled:
+            self.log('[LAUNCH] Launch cancelled')
+            self.events.state(False)
+        except Exception as e:
+            self.log(f'[LAUNCH ERROR] {e!s}')
+            logging.exception(f'Launch failed: {traceback.format_exc()}')
+            self.events.state(False)
+        return None
+
+    def cancel(self) -> None:
+        """Отменяет подготовку к запуску; уже запущенный процесс игры не трогается"""
+        self._cancel_event.set()
+
+    def start_resource_monitor(self, pid: int, memory_mb: int) -> ProcessMonitor | None:
+        """Запускает замеры ресурсов процесса игры (интервал 0 в настройках отключает их)"""
+        settings_obj = self.settings
+        try:
+            interval = float(settings_obj.get('resource_monitor_interval', DEFAULT_INTERVAL))
+        except (TypeError, ValueError):
+            interval = DEFAULT_INTERVAL
+        if interval <= 0:
+            return None
+        try:
+            monitor = ProcessMonitor(pid, interval, on_sample=lambda sample: self.events.resources(sample, memory_mb))
+            monitor.start()
+        except Exception:
+            logging.exception('Failed to start resource monitor')
+            return None
+        return monitor
+
+    def watch_process(self, game_run: GameRun) -> None:
+        """Ждёт завершения игры в фоне и подводит итоги запуска"""
+        process = game_run.process
+        rc = process.wait()
+        try:
+            self.finish_game_run(game_run, rc)
+        finally:
+            game_run.finished.set()
+            self.events.game_exited(rc)
+
+    def finish_game_run(self, game_run: GameRun, rc: int) -> None:
+        """Итоги запуска: замеры ресурсов, GC-лог, архив классов, ранний выход и запись сессии"""
+        session, game_log, monitor = game_run.session, game_run.game_log, game_run.monitor
+        process = game_run.process
+        get_process_registry().unregister(process.pid)
+        resources = None
+        if monitor is not None:
+            monitor.stop()
+            resources = monitor.summary(game_run.heap_mb)
+            self.events.resources(None, 0)
+            if resources:
+                ratio = resources.get('peak_rss_to_xmx')
+                share = f' ({ratio:.0%} of -Xmx)' if ratio else ''
+                self.log(
+                    f'[RESOURCES] Peak RSS {resources["peak_rss_mb"]:.0f} MB{share}, '
+                    f'avg CPU {resources["avg_cpu_percent"]:.0f}%, threads {resources["max_threads"]}'
+                )
+        if game_run.gc_log and os.path.isfile(game_run.gc_log):
+            self.record_gc_log(game_run.version, game_run.gc_log, game_run.heap_mb)
+        if game_run.cds_entry is not None:
+            self.finish_cds(game_run)
+        if time.time() - game_run.started < EARLY_EXIT_WINDOW:
+            if rc != 0:
+                self.log(f'[LAUNCH] Minecraft process exited early with return code {rc}')
+            else:
+                self.log(f'[LAUNCH] Minecraft process exited quickly with return code {rc}')
+        # Файл сессии закрывается, когда дочитаны пайпы
+        if game_log is not None:
+            game_log.wait(30)
+        if game_run.bench is not None:
+            # Игра завершилась, так и не став готовой
+            self.record_benchmark(game_run, rc)
+        if session is None:
+            return
+        try:
+            get_session_logs().finish(session, rc, game_log.total_lines if game_log else 0, resources)
+        except Exception:
+            logging.exception('Failed to finalize game session log')
+
+    def begin_benchmark(
+        self, launch_version: str, java_major: int | None, jvm_hash: str, game_run: GameRun, prepared: float
+    ) -> LaunchRecord | None:
+        """Замер запуска: этапы подготовки и старт процесса; маркеры загрузки добавятся из вывода игры"""
+        try:
+            mods_hash, mods = mods_fingerprint(os.path.join(self.effective_dir, 'mods'))
+            return LaunchRecord(
+                instance=launch_version,
+                version=self.version_id,
+                loader=self.loader_type,
+                mods_hash=mods_hash,
+                mods=mods,
+                java=java_major,
+                jvm_hash=jvm_hash,
+                stages={t.name: round(t.duration, 2) for t in self._pipeline.timings},
+                prepared=round(prepared - self._launch_started, 2),
+                spawned=round(game_run.startup.started - self._launch_started, 2),
+                cds=game_run.cds_mode,
+                prewarm=game_run.prewarm is not None,
+            )
+        except Exception:
+            logging.exception('Failed to start launch benchmark')
+            return None
+
+    def record_benchmark(self, game_run: GameRun, exit_code: int | None = None) -> None:
+        """Сохраняет замер запуска в историю (один раз: при готовности игры или при её выходе)"""
+        record, game_run.bench = game_run.bench, None
+        if record is None:
+            return
+        startup = game_run.startup
+        record.milestones = {name: round(record.spawned + seconds, 2) for name, seconds in startup.milestones.items()}
+        if startup.elapsed is not None:
+            record.ready = round(record.spawned + startup.elapsed, 2)
+        else:
+            record.exit_code = exit_code
+        try:
+            summary = get_launch_history().add(record)
+        except Exception:
+            logging.exception('Failed to save launch benchmark')
+            return
+        self.log(f'[BENCH] {summary}')
+
+    def on_game_ready(self, game_run: GameRun, seconds: float) -> None:
+        """Игра загрузилась: логирует время запуска и сравнение с архивом классов и прогревом"""
+        self.record_benchmark(game_run)
+        summary = f'{seconds:.1f} s'
+        comparison = None
+        try:
+            if game_run.cds_entry is not None:
+                summary = get_cds_archives().record_startup(game_run.cds_entry, game_run.cds_mode, seconds)
+            comparison = get_prewarmer().record_startup(game_run.version, game_run.prewarm is not None, seconds)
+        except Exception:
+            logging.exception('Failed to record startup time')
+        self.log(f'[LAUNCH] Game ready in {summary}')
+        if game_run.prewarm is not None and game_run.prewarm.done.is_set():
+            details = f'; {comparison}' if comparison else ''
+            self.log(f'[PREWARM] {game_run.prewarm.stats.describe()}{details}')
+
+    def prepare_cds(
+        self, launch_version: str, java_path: str, java_major: int | None, plan: LaunchPlan
+    ) -> tuple[list[str], CdsEntry | None, str | None]:
+        """Аргументы архива классов AppCDS для сборки, если он включён в настройках"""
+        settings_obj = self.settings
+        if not settings_obj.get('appcds', False):
+            return [], None, None
+        try:
+            key = archive_key(java_path, plan.classpath, os.path.join(self.effective_dir, 'mods'))
+            args, entry, mode = get_cds_archives().prepare(launch_version, key, java_major)
+        except Exception:
+            logging.exception('Failed to prepare class data archive')
+            return [], None, None
+        if entry is None:
+            java_name = f'Java {java_major}' if java_major else 'Unknown Java version'
+            self.log(f'[CDS] {java_name} does not support dynamic class archives')
+        elif mode == MODE_CREATE:
+            self.log('[CDS] Class archive will be created when the game exits')
+        else:
+            self.log(f'[CDS] Using class archive {entry.file}')
+        return args, entry, mode
+
+    def finish_cds(self, game_run: GameRun) -> None:
+        try:
+            created = get_cds_archives().finish(game_run.cds_entry, game_run.cds_mode)
+        except Exception:
+            logging.exception('Failed to finalize class data archive')
+            return
+        if game_run.cds_mode != MODE_CREATE:
+            return
+        if created:
+            self.log(f'[CDS] Class archive {game_run.cds_entry.file} created, next launch will use it')
+        else:
+            self.log('[CDS] Class archive was not written (the game did not exit normally)')
+
+    def java_major(self, java_path: str, plan: LaunchPlan) -> int | None:
+        """Major-версия Java, которой будет запущена игра"""
+        try:
+            discovery = get_java_discovery()
+            installation = discovery.get(java_path) if os.path.isabs(java_path) else discovery.path_java()
+            if installation is not None:
+                return installation.major
+        except Exception:
+            logging.exception('Failed to detect Java version')
+        return plan.java_major
+
+    def tune_jvm_args(
+        self, jvm_args: list[str], launch_version: str, java_major: int | None
+    ) -> tuple[list[str], str | None, int]:
+        """Подбор памяти по GC-логу: аргументы JVM, путь GC-лога этого запуска и итоговый -Xmx в МБ"""
+        settings_obj = self.settings
+        mode = settings_obj.get('gc_tuning', 'off')
+        if mode not in ('recommend', 'apply'):
+            return jvm_args, None, self.memory_mb
+        heap_mb = self.memory_mb
+        try:
+            recommendation = get_gc_tuner().recommendation(launch_version, self.memory_mb)
+            if recommendation is not None:
+                reasons = ', '.join(recommendation.reasons)
+                if mode == 'apply':
+                    jvm_args = recommendation.apply(jvm_args)
+                    heap_mb = recommendation.xmx_mb
+                    self.log(f'[GC] Applying tuned heap settings: {recommendation.describe()} ({reasons})')
+                else:
+                    self.log(f'[GC] Recommended: {recommendation.describe()} ({reasons})')
+            path = gc_log_path(launch_version)
+            log_args = gc_log_args(path, java_major)
+            if not log_args:
+                java_name = f'Java {java_major}' if java_major else 'Unknown Java version'
+                self.log(f'[GC] {java_name} does not support unified GC logging, GC statistics skipped')
+                return jvm_args, None, heap_mb
+            os.makedirs(GC_LOGS_DIR, exist_ok=True)
+            return jvm_args + log_args, path, heap_mb
+        except Exception:
+            logging.exception('Failed to prepare GC tuning')
+            return jvm_args, None, heap_mb
+
+    def record_gc_log(self, launch_version: str, path: str, memory_mb: int | None) -> None:
+        """Разбирает GC-лог завершившейся игры и сохраняет статистику сборки"""
+        try:
+            stats = get_gc_tuner().record(launch_version, path, memory_mb)
+        except Exception:
+            logging.exception('Failed to parse GC log')
+            return
+        self.log(
+            f'[GC] {stats.pauses} pauses (full {stats.full}), max {stats.pause_max_ms:.0f} ms, '
+            f'p95 {stats.pause_p95_ms:.0f} ms, {stats.gc_time_fraction:.1%} of time; '
+            f'live ~{stats.live_mb:.0f} MB, allocation {stats.alloc_rate_mb_s:.0f} MB/s'
+        )
+
+    def install_callback(self) -> dict:
+        """Колбэки установщика: прогресс и логи идут в UI, отмена проверяется на каждом шаге"""
+
+        def set_status(text):
+            # текст этапа установки
+            self._pipeline.check_cancelled()
+            self.log(f'[INSTALL] {text}')
+            try:
+                self.events.progress(0, 100, text)
+            except Exception:
+                logging.exception('progress emit failed')
+
+        def set_progress(value):
+            # прогресс текущего шага инсталляции (вызывается не чаще ~10 раз в секунду)
+            try:
+                self.events.progress(value, self._install_max, '')
+            except Exception:
+                logging.exception('progress emit failed')
+
+        def set_max(value):
+            self._install_max = max(int(value), 1)
+            try:
+                self.events.progress(0, self._install_max, '')
+            except Exception:
+                logging.exception('progress emit failed')
+
+        self._install_max = 100
+        return {
+            'setStatus': set_status,
+            'setProgress': set_progress,
+            'setMax': set_max,
+        }
+
+    def stage_authlib(self, results: StageResults) -> str | None:
+        """authlib-injector для сессии Ely.by (обычно это только stat файла)"""
+        if not self.ely_session:
+            return None
+        return get_agent_artifacts().ensure('authlib-injector')
+
+    def sync_skin(self, username: str) -> None:
+        """Фоновое обновление скина Ely.by: новым версиям его отдаёт authlib-injector, запуск не ждёт"""
+        if not ElySkinManager.download_skin(username, max_age=SKIN_MAX_AGE):
+            self.log(f'[SKIN] Skin sync failed for {username}')
+
+    def stage_legacy_skin(self, results: StageResults) -> bool:
+        """Скин для legacy-версий кладётся в ресурсы игры, поэтому нужен до старта JVM"""
+        if not self.ely_session or not self.is_legacy_version(self.version_id):
+            return False
+        username = self.ely_session['username']
+        synced = ElySkinManager.apply_skin(username, self.version_id, True)
+        if not synced:
+            self.log(f'[SKIN] Skin sync failed for {username}')
+        return synced
+
+    def stage_java_index(self, results: StageResults) -> None:
+        # Прогрев индекса Java, пока идёт проверка файлов версии
+        get_java_discovery().scan()
+
+    def stage_resolve(self, results: StageResults) -> str:
+        """Определение версии для модлоадеров: сначала установленные профили, затем кэш метаданных"""
+        if self.loader_type == 'vanilla':
+            return self.version_id
+        tag = {'forge': 'Forge', 'fabric': 'Fabric', 'quilt': 'Quilt', 'optifine': 'OptiFine', 'neoforge': 'NeoForge'}.get(
+            self.loader_type, self.loader_type
+        )
+        self.log(f'[{tag}] Processing {tag} version...')
+        try:
+            launch_version = get_loader_metadata().resolve_launch_version(
+                self.version_id, self.loader_type, self.effective_dir
+            )
+        except Exception as e:
+            raise Exception(f'{tag} version resolve error: {e!s}')
+        self.log(f'[{tag}] Launch version: {launch_version}')
+        return launch_version
+
+    def stage_install(self, results: StageResults) -> None:
+        """Установка версии если требуется, иначе быстрая проверка целостности"""
+        launch_version = results['resolve']
+        self.log(f'[CHECK] Checking version {launch_version}...')
+        version_json = os.path.join(self.effective_dir, 'versions', launch_version, f'{launch_version}.json')
+        integrity = IntegrityIndex(launch_version, self.effective_dir)
+
+        if not os.path.isfile(version_json):
+            with self.heavy_phase():
+                self.log('[INSTALL] Installing version...')
+                report = install_version(
+                    launch_version,
+                    self.effective_dir,
+                    callback=self.install_callback(),
+                    install_runtime=self.custom_java() is None,
+                )
+            # Установщик уже проверил SHA1 всех файлов — запоминаем их stat в индексе
+            try:
+                integrity.refresh()
+                integrity.mark_valid(report.downloaded + report.skipped)
+            except Exception:
+                logging.exception('Failed to seed integrity index')
+            return
+
+        result = integrity.verify()
+        self.log(
+            f'[CHECK] {result.checked} files checked, {result.hashed} rehashed, '
+            f'{len(result.missing)} missing, {len(result.corrupt)} corrupt'
+        )
+        if not result.ok:
+            self._pipeline.check_cancelled()
+            with self.heavy_phase():
+                self.log(f'[CHECK] Repairing {len(result.bad)} file(s)...')
+                integrity.repair(result, callback=self.install_callback())
+
+    def heavy_phase(self):
+        """Место в общем лимите установок: параллельные запуски не качают больше N версий сразу"""
+        settings_obj = self.settings
+        limiter = get_heavy_phase_limiter()
+        try:
+            limiter.set_limit(int(settings_obj.get('max_parallel_installs', DEFAULT_HEAVY_SLOTS)))
+        except (TypeError, ValueError):
+            pass
+        return limiter.slot(self._cancel_event, on_wait=lambda: self.log('[INSTALL] Waiting for other installs to finish...'))
+
+    def stage_legacy_patch(self, results: StageResults) -> str | None:
+        """Патч для legacy версий (собирается один раз в отдельный jar)"""
+        if not self.is_legacy_version(self.version_id):
+            return None
+        self.log('[Legacy] Applying legacy patch...')
+        return self.apply_legacy_patch(results['resolve'])
+
+    def stage_plan(self, results: StageResults) -> LaunchPlan:
+        """Кэшированный план запуска (classpath, аргументы, Java версии)"""
+        self.log('[BUILD] Building command...')
+        return get_launch_plan_cache().get(
+            results['resolve'],
+            self.effective_dir,
+            {k: v for k, v in self._options.items() if k not in ('username', 'uuid', 'token', 'jvmArguments')},
+        )
+
+    def stage_prewarm(self, results: StageResults) -> PrewarmJob | None:
+        """Начинает прогрев classpath, natives и модов; он идёт в фоне параллельно выбору Java и старту JVM"""
+        settings_obj = self.settings
+        if not settings_obj.get('prewarm', False):
+            return None
+        plan: LaunchPlan = results['plan']
+        paths = collect_paths(plan.classpath, plan.natives_dir, os.path.join(self.effective_dir, 'mods'))
+        return get_prewarmer().start(results['resolve'], paths)
+
+    def custom_java(self) -> str | None:
+        """Путь к Java, заданный пользователем; с ним рантайм лаунчера не нужен"""
+        java_path = self.settings.get('java_path', '')
+        if self.settings.get('java_mode', 'recommended') == 'custom' and isinstance(java_path, str) and java_path.strip():
+            return java_path.strip()
+        return None
+
+    def stage_java(self, results: StageResults) -> str | None:
+        """Выбор Java: пользовательский путь или рантайм под javaVersion версии; None — оставить из плана"""
+        plan: LaunchPlan = results['plan']
+        try:
+            settings_obj = self.settings
+            java_mode = settings_obj.get('java_mode', 'recommended')
+            custom_java = self.custom_java()
+            if custom_java:
+                return custom_java
+            if java_mode == 'current':
+                path_java = get_java_discovery().path_java()
+                if path_java:
+                    if plan.java_major and path_java.major != plan.java_major:
+                        self.log(f'[WARN] Java {path_java.major} from PATH, version requires Java {plan.java_major}')
+                    return path_java.path
+            elif java_mode == 'recommended' and not os.path.isabs(plan.java_executable()):
+                # Рантайма лаунчера нет: берём уже установленную Java той же версии или ставим рантайм
+                major = plan.java_major or DEFAULT_MAJOR
+                installed = get_java_discovery().find(major)
+                if installed:
+                    return installed.path
+                return get_runtime_manager().ensure(
+                    plan.java_component or DEFAULT_COMPONENT,
+                    major,
+                    callback=self.install_callback(),
+                )
+        except Exception:
+            logging.exception('Failed to select Java runtime')
+        return None
+
+    @staticmethod
+    def is_legacy_version(version: str):
+        """Проверяет, является ли версия старой (до 1.7.5)"""
+        try:
+            m = re.match(r'(\d+)\.(\d+)\.?(\d+)?', version)
+            if not m:
+                return False
+            major, minor, patch = m.groups()
+            if int(major) == 1 and (int(minor) < 7 or (int(minor) == 7 and int(patch or 0) < 5)):
+                return True
+            return False
+        except Exception:
+            return False
+
+    def apply_legacy_patch(self, version: str) -> str | None:
+        """Применяет патч для старых версий; возвращает путь к пропатченному jar"""
+        try:
+            target_dir = getattr(self, 'effective_dir', MINECRAFT_DIR)
+            patched = ensure_patched_jar(version, target_dir)
+            self.log(f'[LEGACY] Using patched jar: {os.path.basename(patched)}')
+            return patched
+        except Exception as e:
+            logging.exception(f'Legacy patch failed: {e!s}')
+            self.log(f'[LEGACY] Patch failed: {e!s}')
+            # не поднимаем дальше — просто логируем и продолжаем
+            return None
+
+    def log(self, text: str):
+        """Удобный helper для логирования + эмита событий в UI"""
+        try:
+            ts = datetime.now().strftime('%H:%M:%S')
+            safe_text = f'[{ts}] {text}'
+            # отправляем в UI
+            self.events.log(text)
+            # и в стандартный лог
+            logging.info(text)
+        except Exception:
+            logging.exception('Failed to deliver log message')
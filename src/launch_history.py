@@ -0,0 +1,202 @@
+"""
+История замеров времени запуска
+
+Для каждого запуска сохраняется, сколько заняли этапы подготовки (из конвейера
+этапов), когда стартовал процесс и когда в выводе игры появились маркеры
+загрузки: первая строка, окно LWJGL, загрузка модов и готовность игры. Всё время
+считается от нажатия «Играть». Записи группируются по сборке: версия запуска и
+хэш набора модов, а также хэш аргументов JVM, поэтому замедление после
+обновления модов или смены флагов JVM видно сразу. Историю можно выгрузить в
+CSV или JSON.
+"""
+import csv
+import hashlib
+import json
+import logging
+import os
+import statistics
+import threading
+import time
+from dataclasses import asdict, dataclass, field, fields
+
+from config import CACHE_DIR
+
+LAUNCH_HISTORY_PATH: str = os.path.join(CACHE_DIR, 'launch_history.json')
+LAUNCH_HISTORY_FORMAT = 1
+MAX_RECORDS = 500
+# По скольким последним запускам той же сборки считается медиана для сравнения
+BASELINE_RUNS = 5
+# Этапы загрузки игры в порядке появления (колонки таблицы и экспорта)
+MILESTONES = ('first_output', 'window', 'mods_loaded')
+
+
+def _short_hash(parts: list[str]) -> str:
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(f'{part}\n'.encode())
+    return digest.hexdigest()[:12]
+
+
+def mods_fingerprint(mods_dir: str) -> tuple[str, int]:
+    """Хэш набора модов (имя и размер файла) и их количество"""
+    mods = []
+    try:
+        with os.scandir(mods_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith(('.jar', '.zip')):
+                    mods.append(f'{entry.name}\0{entry.stat().st_size}')
+    except OSError:
+        pass
+    return _short_hash(sorted(mods)), len(mods)
+
+
+def jvm_args_hash(jvm_args: list[str]) -> str:
+    return _short_hash(jvm_args)
+
+
+@dataclass
+class LaunchRecord:
+    instance: str
+    version: str
+    loader: str
+    mods_hash: str
+    mods: int = 0
+    java: int | None = None
+    jvm_hash: str = ''
+    started: float = field(default_factory=time.time)
+    # Длительность этапов подготовки, секунды
+    stages: dict[str, float] = field(default_factory=dict)
+    # От нажатия «Играть» до конца подготовки и до старта процесса, секунды
+    prepared: float | None = None
+    spawned: float | None = None
+    # От нажатия «Играть» до маркеров загрузки и до готовности игры, секунды
+    milestones: dict[str, float] = field(default_factory=dict)
+    ready: float | None = None
+    # Код выхода, если игра завершилась раньше, чем стала готова
+    exit_code: int | None = None
+    cds: str | None = None
+    prewarm: bool = False
+
+    @property
+    def key(self) -> str:
+        return f'{self.instance}@{self.mods_hash}'
+
+
+class LaunchHistory:
+    """Локальная история замеров запуска по сборкам"""
+
+    def __init__(self, path: str = LAUNCH_HISTORY_PATH) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._records: list[LaunchRecord] = self._load()
+
+    def _load(self) -> list[LaunchRecord]:
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('format') != LAUNCH_HISTORY_FORMAT:
+                return []
+            known = {f.name for f in fields(LaunchRecord)}
+            return [LaunchRecord(**{k: v for k, v in item.items() if k in known}) for item in data.get('records', [])]
+        except (OSError, ValueError, TypeError, AttributeError):
+            return []
+
+    def _save(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'format': LAUNCH_HISTORY_FORMAT, 'records': [asdict(r) for r in self._records]}, f, indent=4)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logging.warning(f'[BENCH] Не удалось сохранить историю запусков: {e}')
+
+    def records(self, instance: str | None = None) -> list[LaunchRecord]:
+        """Записи от новых к старым"""
+        with self._lock:
+            records = list(self._records)
+        if instance is not None:
+            records = [r for r in records if r.instance == instance]
+        return records[::-1]
+
+    def add(self, record: LaunchRecord) -> str:
+        """Сохраняет замер и возвращает сравнение с прошлыми запусками этой сборки"""
+        with self._lock:
+            previous = [r for r in self._records if r.instance == record.instance]
+            self._records.append(record)
+            del self._records[:-MAX_RECORDS]
+            self._save()
+        return self.compare(record, previous)
+
+    @staticmethod
+    def baseline(record: LaunchRecord, previous: list[LaunchRecord]) -> float | None:
+        """Медиана времени до готовности по последним запускам той же сборки"""
+        same = [r.ready for r in previous if r.key == record.key and r.ready is not None][-BASELINE_RUNS:]
+        return statistics.median(same) if same else None
+
+    def compare(self, record: LaunchRecord, previous: list[LaunchRecord]) -> str:
+        if record.ready is None:
+            return f'game exited with code {record.exit_code} before it was ready'
+        summary = f'{record.ready:.1f} s from click to playable'
+        baseline = self.baseline(record, previous)
+        if baseline is not None:
+            summary += f' (median {baseline:.1f} s for this mod set, {record.ready - baseline:+.1f} s)'
+        if previous:
+            last = previous[-1]
+            changes = [
+                name
+                for name, changed in (
+                    ('mod set', last.mods_hash != record.mods_hash),
+                    ('JVM arguments', last.jvm_hash != record.jvm_hash),
+                    ('Java', last.java != record.java),
+                )
+                if changed
+            ]
+            if changes:
+                summary += f'; changed since last launch: {", ".join(changes)}'
+        return summary
+
+    def clear(self) -> None:
+        with self._lock:
+            self._records = []
+            self._save()
+
+    def export_json(self, path: str, records: list[LaunchRecord] | None = None) -> None:
+        records = self.records() if records is None else records
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump([{**asdict(r), 'key': r.key} for r in records], f, indent=4, ensure_ascii=False)
+
+    def export_csv(self, path: str, records: list[LaunchRecord] | None = None) -> None:
+        """Одна строка на запуск; этапы подготовки — колонки stage_<имя>"""
+        records = self.records() if records is None else records
+        stages = list(dict.fromkeys(name for r in records for name in r.stages))
+        plain = ('instance', 'version', 'loader', 'mods_hash', 'mods', 'java', 'jvm_hash', 'prepared', 'spawned')
+        columns = ['started', *plain, *MILESTONES, 'ready', 'exit_code', 'cds', 'prewarm']
+        columns += [f'stage_{name}' for name in stages]
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, columns)
+            writer.writeheader()
+            for r in records:
+                row = {name: getattr(r, name) for name in plain}
+                row.update(r.milestones)
+                row.update({f'stage_{name}': value for name, value in r.stages.items()})
+                row.update(
+                    started=time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(r.started)),
+                    ready=r.ready,
+                    exit_code=r.exit_code,
+                    cds=r.cds,
+                    prewarm=int(r.prewarm),
+                )
+                writer.writerow({name: row.get(name) for name in columns})
+
+
+# Глобальный экземпляр
+_launch_history: LaunchHistory | None = None
+
+
+def get_launch_history() -> LaunchHistory:
+    """Получить глобальную историю замеров запуска"""
+    global _launch_history
+    if _launch_history is None:
+        _launch_history = LaunchHistory()
+    return _launch_history
@@ -0,0 +1,253 @@
+"""
+Кэш планов запуска
+
+План запуска — это уже разрешённая команда для версии: classpath, папка natives,
+главный класс и шаблоны аргументов. План строится один раз через
+minecraft_launcher_lib и хранится в MINECRAFT_DIR/cache/launch_plans, а при
+запуске в него подставляются только значения сессии (ник, uuid, токен, память).
+Кэш сбрасывается сам, если изменился любой JSON из цепочки inheritsFrom.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from dataclasses import asdict, dataclass, field
+
+from config import CACHE_DIR
+
+LAUNCH_PLANS_DIR: str = os.path.join(CACHE_DIR, 'launch_plans')
+# Меняется при изменении формата плана, чтобы старые файлы кэша не использовались
+LAUNCH_PLAN_FORMAT = 2
+
+# Заглушки для значений сессии, которые подставляются при каждом запуске
+SESSION_PLACEHOLDERS: dict[str, str] = {
+    'username': '{16launcher:username}',
+    'uuid': '{16launcher:uuid}',
+    'token': '{16launcher:token}',
+}
+
+
+@dataclass
+class LaunchPlan:
+    version: str
+    minecraft_dir: str
+    java: str
+    java_component: str | None
+    jvm_args: list[str]
+    main_class: str
+    game_args: list[str]
+    natives_dir: str
+    classpath: list[str] = field(default_factory=list)
+    java_major: int | None = None
+
+    def java_executable(self) -> str:
+        """Возвращает java: рантайм из MINECRAFT_DIR/java или runtime/, иначе сохранённое значение"""
+        from java_runtime import get_runtime_manager
+
+        managed_java = get_runtime_manager().find(self.java_component, self.java_major)
+        if managed_java:
+            return managed_java
+        if self.java_component:
+            from minecraft_launcher_lib.runtime import get_executable_path
+
+            runtime_java = get_executable_path(self.java_component, self.minecraft_dir)
+            if runtime_java:
+                return runtime_java
+        return self.java
+
+    def build_command(self, username: str, uuid: str, token: str, jvm_args: list[str] | None = None) -> list[str]:
+        """Собирает команду запуска, подставляя значения текущей сессии"""
+        values = {
+            SESSION_PLACEHOLDERS['username']: username,
+            SESSION_PLACEHOLDERS['uuid']: uuid,
+            SESSION_PLACEHOLDERS['token']: token,
+        }
+
+        def substitute(arg: str) -> str:
+            if '{16launcher:' not in arg:
+                return arg
+            for placeholder, value in values.items():
+                arg = arg.replace(placeholder, value)
+            return arg
+
+        return [
+            self.java_executable(),
+            *(jvm_args or []),
+            *(substitute(a) for a in self.jvm_args),
+            self.main_class,
+            *(substitute(a) for a in self.game_args),
+        ]
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'LaunchPlan':
+        return cls(**data)
+
+
+def _version_json_path(version: str, minecraft_dir: str) -> str:
+    return os.path.join(minecraft_dir, 'versions', version, f'{version}.json')
+
+
+def _safe_name(version: str) -> str:
+    return ''.join(c if c.isalnum() or c in '._-' else '_' for c in version)
+
+
+def _stat_key(path: str) -> list[int]:
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def _read_version_chain(version: str, minecraft_dir: str) -> list[tuple[str, dict]]:
+    """Читает JSON версии и все JSON из цепочки inheritsFrom: [(путь, данные), ...]"""
+    chain: list[tuple[str, dict]] = []
+    current: str | None = version
+    while current and len(chain) < 16:
+        path = _version_json_path(current, minecraft_dir)
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        chain.append((path, data))
+        current = data.get('inheritsFrom')
+    return chain
+
+
+def _options_key(minecraft_dir: str, options: dict) -> str:
+    relevant = {k: v for k, v in sorted(options.items()) if k not in SESSION_PLACEHOLDERS and k != 'jvmArguments'}
+    raw = json.dumps([LAUNCH_PLAN_FORMAT, os.path.abspath(minecraft_dir), relevant], sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def build_launch_plan(version: str, minecraft_dir: str, options: dict) -> LaunchPlan:
+    """Строит план запуска через minecraft_launcher_lib с заглушками вместо данных сессии"""
+    from minecraft_launcher_lib.command import get_minecraft_command
+
+    chain = [data for _path, data in _read_version_chain(version, minecraft_dir)]
+    # Дочерний профиль (Forge/Fabric/Quilt) переопределяет mainClass родителя
+    main_class = next((d['mainClass'] for d in chain if d.get('mainClass')), '')
+    java_version = next((d['javaVersion'] for d in chain if d.get('javaVersion')), {})
+    java_component = java_version.get('component')
+    java_major = java_version.get('majorVersion')
+    root_id = chain[-1].get('id', version) if len(chain) > 1 else version
+
+    template_options = {k: v for k, v in options.items() if k != 'jvmArguments'}
+    template_options.update(SESSION_PLACEHOLDERS)
+    command = get_minecraft_command(version=version, minecraft_directory=minecraft_dir, options=template_options)
+
+    try:
+        main_index = command.index(main_class, 1)
+    except ValueError:
+        raise ValueError(f'Main class {main_class!r} not found in command for {version}')
+
+    jvm_args = command[1:main_index]
+    classpath: list[str] = []
+    if '-cp' in jvm_args:
+        cp_index = jvm_args.index('-cp')
+        if cp_index + 1 < len(jvm_args):
+            classpath = [p for p in jvm_args[cp_index + 1].split(os.pathsep) if p]
+
+    natives_dir = options.get('nativesDirectory') or os.path.join(minecraft_dir, 'versions', version, 'natives')
+    if not os.path.isdir(natives_dir) and root_id != version:
+        root_natives = os.path.join(minecraft_dir, 'versions', root_id, 'natives')
+        if os.path.isdir(root_natives):
+            natives_dir = root_natives
+
+    return LaunchPlan(
+        version=version,
+        minecraft_dir=minecraft_dir,
+        java=command[0],
+        java_component=java_component,
+        jvm_args=jvm_args,
+        main_class=main_class,
+        game_args=command[main_index + 1 :],
+        natives_dir=natives_dir,
+        classpath=classpath,
+        java_major=int(java_major) if java_major else None,
+    )
+
+
+class LaunchPlanCache:
+    """Кэш планов запуска в памяти и на диске"""
+
+    def __init__(self, plans_dir: str = LAUNCH_PLANS_DIR) -> None:
+        self.plans_dir = plans_dir
+        self._lock = threading.Lock()
+        self._memory: dict[str, dict] = {}
+
+    def _plan_path(self, version: str, options_key: str) -> str:
+        return os.path.join(self.plans_dir, f'{_safe_name(version)}-{options_key[:12]}.json')
+
+    @staticmethod
+    def _is_fresh(entry: dict) -> bool:
+        try:
+            return all(_stat_key(path) == list(stat) for path, stat in entry['sources'].items())
+        except (OSError, KeyError, TypeError):
+            return False
+
+    def _load(self, path: str) -> dict | None:
+        try:
+            with open(path, encoding='utf-8') as f:
+                entry = json.load(f)
+            return entry if isinstance(entry, dict) else None
+        except (OSError, ValueError):
+            return None
+
+    def _save(self, path: str, entry: dict) -> None:
+        try:
+            os.makedirs(self.plans_dir, exist_ok=True)
+            tmp_path = f'{path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.warning(f'[LAUNCH PLAN] Не удалось сохранить план: {e}')
+
+    def get(self, version: str, minecraft_dir: str, options: dict) -> LaunchPlan:
+        """Возвращает актуальный план запуска, при необходимости перестраивая его"""
+        options_key = _options_key(minecraft_dir, options)
+        path = self._plan_path(version, options_key)
+
+        with self._lock:
+            entry = self._memory.get(path) or self._load(path)
+            if entry and entry.get('options_key') == options_key and self._is_fresh(entry):
+                self._memory[path] = entry
+                logging.debug(f'[LAUNCH PLAN] Используется кэшированный план для {version}')
+                return LaunchPlan.from_dict(entry['plan'])
+
+        logging.debug(f'[LAUNCH PLAN] Строим план запуска для {version}')
+        sources = {path: _stat_key(path) for path, _data in _read_version_chain(version, minecraft_dir)}
+        plan = build_launch_plan(version, minecraft_dir, options)
+        entry = {'options_key': options_key, 'sources': sources, 'plan': plan.to_dict()}
+
+        with self._lock:
+            self._memory[path] = entry
+            self._save(path, entry)
+        return plan
+
+    def invalidate(self, version: str | None = None) -> None:
+        """Сбрасывает планы для версии (или все планы)"""
+        with self._lock:
+            self._memory.clear()
+            try:
+                names = os.listdir(self.plans_dir)
+            except OSError:
+                return
+            for name in names:
+                if version is None or name.startswith(f'{_safe_name(version)}-'):
+                    try:
+                        os.remove(os.path.join(self.plans_dir, name))
+                    except OSError:
+                        pass
+
+
+# Глобальный экземпляр
+_launch_plans: LaunchPlanCache | None = None
+
+
+def get_launch_plan_cache() -> LaunchPlanCache:
+    """Получить глобальный кэш планов запуска"""
+    global _launch_plans
+    if _launch_plans is None:
+        _launch_plans = LaunchPlanCache()
+    return _launch_plans
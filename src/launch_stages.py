@@ -0,0 +1,197 @@
+"""
+Конвейер этапов запуска
+
+Подготовка к запуску описывается небольшим графом этапов: у каждого этапа есть
+список зависимостей, и все этапы, зависимости которых уже выполнены, идут
+параллельно в пуле потоков. Для каждого этапа замеряется время, а отмена
+(кнопка, закрытие лаунчера) не даёт стартовать новым этапам и прерывает ожидание.
+Тяжёлые этапы (установка версий и загрузчиков) всех одновременных запусков делят
+общий лимит PhaseLimiter.
+"""
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any
+
+# Результаты уже выполненных этапов: {имя этапа: возвращённое значение}
+StageResults = dict[str, Any]
+# Сколько установок может идти одновременно во всех запусках
+DEFAULT_HEAVY_SLOTS = 2
+
+
+class LaunchCancelled(Exception):
+    pass
+
+
+class StageError(RuntimeError):
+    def __init__(self, stage: str, error: BaseException) -> None:
+        super().__init__(f'{stage}: {error!s}')
+        self.stage = stage
+        self.error = error
+
+
+@dataclass
+class Stage:
+    name: str
+    func: Callable[[StageResults], Any]
+    deps: tuple[str, ...] = ()
+    # Ошибка необязательного этапа только логируется, его результат — None
+    optional: bool = False
+
+
+@dataclass
+class StageTiming:
+    name: str
+    # Смещение начала от старта конвейера и длительность, секунды
+    started: float
+    duration: float
+    status: str = 'ok'
+
+
+@dataclass
+class StagePipeline:
+    stages: list[Stage]
+    max_workers: int = 4
+    cancel_event: threading.Event = field(default_factory=threading.Event)
+    timings: list[StageTiming] = field(default_factory=list)
+
+    def __post_init__(self) -> None:
+        names = {stage.name for stage in self.stages}
+        for stage in self.stages:
+            missing = [dep for dep in stage.deps if dep not in names]
+            if missing:
+                raise ValueError(f'Stage {stage.name} depends on unknown stage(s): {", ".join(missing)}')
+
+    def cancel(self) -> None:
+        self.cancel_event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def check_cancelled(self) -> None:
+        """Вызывается внутри долгих этапов между шагами"""
+        if self.cancel_event.is_set():
+            raise LaunchCancelled()
+
+    def _run_stage(self, stage: Stage, results: StageResults, start: float) -> Any:
+        self.check_cancelled()
+        began = time.perf_counter()
+        status = 'ok'
+        try:
+            return stage.func(results)
+        except LaunchCancelled:
+            status = 'cancelled'
+            raise
+        except Exception:
+            status = 'failed'
+            raise
+        finally:
+            self.timings.append(StageTiming(stage.name, began - start, time.perf_counter() - began, status))
+
+    def run(self) -> StageResults:
+        """Выполняет все этапы; бросает StageError при ошибке обязательного этапа"""
+        results: StageResults = {}
+        pending = {stage.name: stage for stage in self.stages}
+        running: dict[Future, Stage] = {}
+        failure: BaseException | None = None
+        start = time.perf_counter()
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='launch-stage')
+        try:
+            while pending or running:
+                if failure is None and not self.cancelled:
+                    ready = [s for s in pending.values() if all(dep in results for dep in s.deps)]
+                    for stage in ready:
+                        del pending[stage.name]
+                        running[executor.submit(self._run_stage, stage, dict(results), start)] = stage
+                if not running:
+                    if failure is None and not self.cancelled:
+                        raise ValueError(f'Stage graph has a cycle: {", ".join(pending)}')
+                    break
+
+                # Короткий таймаут, чтобы отмена замечалась даже во время долгого этапа
+                done, _ = wait(running, timeout=0.1, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    try:
+                        results[stage.name] = future.result()
+                    except LaunchCancelled:
+                        self.cancel_event.set()
+                    except Exception as e:
+                        if not stage.optional:
+                            failure = StageError(stage.name, e)
+                            self.cancel_event.set()
+                            break
+                        logging.warning(f'[STAGES] Optional stage {stage.name} failed: {e}')
+                        results[stage.name] = None
+                if failure is not None or self.cancelled:
+                    # Оставшиеся этапы видят флаг отмены и завершаются сами, их не ждём
+                    break
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        if failure is not None:
+            raise failure
+        if self.cancelled:
+            raise LaunchCancelled()
+        return results
+
+    def summary(self) -> str:
+        """Строка вида 'resolve 3ms, install 120ms, ...' в порядке старта"""
+        return ', '.join(
+            f'{t.name} {t.duration * 1000:.0f}ms' + ('' if t.status == 'ok' else f' ({t.status})')
+            for t in sorted(self.timings, key=lambda t: t.started)
+        )
+
+
+class PhaseLimiter:
+    """Общий для всех запусков лимит одновременно выполняемых тяжёлых этапов"""
+
+    def __init__(self, limit: int = DEFAULT_HEAVY_SLOTS) -> None:
+        self.limit = max(1, limit)
+        self.active = 0
+        self._cond = threading.Condition()
+
+    def set_limit(self, limit: int) -> None:
+        with self._cond:
+            self.limit = max(1, limit)
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(
+        self, cancel_event: threading.Event | None = None, on_wait: Callable[[], None] | None = None
+    ) -> Iterator[None]:
+        """Ждёт свободного места (с проверкой отмены); on_wait вызывается один раз, если пришлось ждать"""
+        waited = False
+        with self._cond:
+            while self.active >= self.limit:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise LaunchCancelled()
+                if not waited and on_wait is not None:
+                    waited = True
+                    on_wait()
+                self._cond.wait(0.1)
+            self.active += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.active -= 1
+                self._cond.notify()
+
+
+# Глобальный экземпляр
+_heavy_phases: PhaseLimiter | None = None
+
+
+def get_heavy_phase_limiter() -> PhaseLimiter:
+    """Получить общий лимит установок для всех запусков"""
+    global _heavy_phases
+    if _heavy_phases is None:
+        _heavy_phases = PhaseLimiter()
+    return _heavy_phases
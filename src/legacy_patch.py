@@ -0,0 +1,151 @@
+"""
+Патч для старых версий (до 1.7.5)
+
+Артефакт патча скачивается один раз и хранится в MINECRAFT_DIR/cache/legacy_patch
+под своим SHA256. Пропатченный jar собирается один раз в отдельный файл
+versions/<id>/<id>-legacy.jar рядом с маркером, в котором записаны хэш патча и stat
+исходного jar. Исходный jar не меняется (его SHA1 остаётся верным для проверки
+целостности), а последующие запуски просто переиспользуют готовый файл.
+"""
+import hashlib
+import io
+import json
+import logging
+import os
+import zipfile
+
+import requests
+
+from config import CACHE_DIR
+from version_installer import USER_AGENT
+
+LEGACY_PATCH_URL = 'https://ely.by/load/legacy-patch.jar'
+LEGACY_PATCH_DIR: str = os.path.join(CACHE_DIR, 'legacy_patch')
+LEGACY_PATCH_FORMAT = 1
+
+
+def _stat(path: str) -> list[int]:
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _read_json(path: str) -> dict | None:
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else None
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path: str, data: dict) -> None:
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=4)
+    os.replace(tmp_path, path)
+
+
+def _cached_patch(patch_dir: str) -> tuple[str, str] | None:
+    current = _read_json(os.path.join(patch_dir, 'current.json'))
+    if current and current.get('sha256'):
+        path = os.path.join(patch_dir, current.get('file', ''))
+        if os.path.isfile(path):
+            return path, current['sha256']
+    return None
+
+
+def get_patch_artifact(patch_dir: str = LEGACY_PATCH_DIR, url: str = LEGACY_PATCH_URL) -> tuple[str, str]:
+    """Возвращает (путь, sha256) закэшированного патча; сеть нужна только при первом запуске"""
+    cached = _cached_patch(patch_dir)
+    if cached:
+        return cached
+
+    r = requests.get(url, headers={'User-Agent': USER_AGENT}, timeout=30)
+    r.raise_for_status()
+    data = r.content
+    # Проверяем, что это действительно jar, прежде чем класть в кэш
+    with zipfile.ZipFile(io.BytesIO(data)):
+        pass
+    sha256 = hashlib.sha256(data).hexdigest()
+    os.makedirs(patch_dir, exist_ok=True)
+    file_name = f'legacy-patch-{sha256[:16]}.jar'
+    path = os.path.join(patch_dir, file_name)
+    with open(f'{path}.tmp', 'wb') as f:
+        f.write(data)
+    os.replace(f'{path}.tmp', path)
+    _write_json(os.path.join(patch_dir, 'current.json'), {'file': file_name, 'sha256': sha256, 'url': url})
+    logging.info(f'[LEGACY] Патч сохранён в кэш: {file_name}')
+    return path, sha256
+
+
+def _is_signature(name: str) -> bool:
+    upper = name.upper()
+    return upper.startswith('META-INF/') and upper.endswith(('.SF', '.RSA', '.DSA', '.EC'))
+
+
+def build_patched_jar(original: str, patch_path: str, target: str) -> None:
+    """Собирает новый jar: классы патча заменяют одноимённые, подписи Mojang удаляются"""
+    tmp_path = f'{target}.tmp'
+    with zipfile.ZipFile(patch_path) as patch:
+        patch_classes = {name for name in patch.namelist() if name.endswith('.class')}
+        with zipfile.ZipFile(original) as src, zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED) as dst:
+            for info in src.infolist():
+                # Изменённые классы ломают подпись, поэтому файлы подписи не переносим
+                if info.filename in patch_classes or _is_signature(info.filename):
+                    continue
+                dst.writestr(info, src.read(info))
+            for name in sorted(patch_classes):
+                dst.writestr(name, patch.read(name))
+    os.replace(tmp_path, target)
+
+
+def patched_jar_path(version: str, minecraft_dir: str) -> str:
+    return os.path.join(minecraft_dir, 'versions', version, f'{version}-legacy.jar')
+
+
+def ensure_patched_jar(version: str, minecraft_dir: str) -> str:
+    """Возвращает путь к пропатченному jar, пересобирая его только при изменении патча или исходника"""
+    original = os.path.join(minecraft_dir, 'versions', version, f'{version}.jar')
+    if not os.path.isfile(original):
+        raise FileNotFoundError(f'JAR file not found: {original}')
+
+    target = patched_jar_path(version, minecraft_dir)
+    marker_path = f'{target}.json'
+    marker = _read_json(marker_path)
+    if (
+        marker
+        and marker.get('format') == LEGACY_PATCH_FORMAT
+        and os.path.isfile(target)
+        and marker.get('source') == _stat(original)
+        and marker.get('target') == _stat(target)
+    ):
+        cached = _cached_patch(LEGACY_PATCH_DIR)
+        if cached is None or cached[1] == marker.get('patch_sha256'):
+            return target
+
+    patch_path, patch_sha256 = get_patch_artifact(LEGACY_PATCH_DIR, LEGACY_PATCH_URL)
+    logging.info(f'[LEGACY] Сборка пропатченного jar для {version}')
+    build_patched_jar(original, patch_path, target)
+    _write_json(
+        marker_path,
+        {
+            'format': LEGACY_PATCH_FORMAT,
+            'patch_sha256': patch_sha256,
+            'source': _stat(original),
+            'target': _stat(target),
+        },
+    )
+    return target
+
+
+def substitute_jar(command: list[str], original: str, patched: str) -> list[str]:
+    """Подменяет исходный jar на пропатченный в classpath команды запуска"""
+    original_norm = os.path.normcase(os.path.abspath(original))
+    result: list[str] = []
+    for arg in command:
+        if original in arg or os.path.basename(original) in arg:
+            parts = arg.split(os.pathsep)
+            parts = [patched if os.path.normcase(os.path.abspath(p)) == original_norm else p for p in parts]
+            arg = os.pathsep.join(parts)
+        result.append(arg)
+    return result
@@ -0,0 +1,269 @@
+"""
+Установка модлоадеров без Qt
+
+Общая логика для окна лаунчера (ModLoaderInstaller) и консольной подготовки по
+манифесту (provision). Прогресс сообщается через словарь callback в формате
+minecraft_launcher_lib (setStatus/setProgress/setMax), ошибки — исключением
+LoaderInstallError с текстом для пользователя.
+"""
+import logging
+import os
+import shutil
+import subprocess
+import time
+import urllib.request
+from glob import glob
+
+from minecraft_launcher_lib.fabric import get_latest_loader_version
+from minecraft_launcher_lib.fabric import install_fabric as fabric_install
+from minecraft_launcher_lib.forge import find_forge_version
+
+from config import MINECRAFT_DIR, MODS_DIR
+from forge_installer import install_forge as forge_install
+from java_discovery import get_java_discovery
+from version_installer import Callback, install_version
+
+# Загрузчики, для которых есть установщик; остальные можно только запускать из готового профиля
+SUPPORTED_LOADERS = ('fabric', 'forge', 'optifine')
+OPTIFINE_PATCHER_URL = 'https://raw.githubusercontent.com/marvin1099/AutomaticOptifinePatcher/main/optifine_patcher.py'
+# Секунд без вывода патчера, после которых он считается зависшим
+OPTIFINE_INACTIVITY_TIMEOUT = 300
+
+
+class LoaderInstallError(RuntimeError):
+    pass
+
+
+def _empty(*_args: object) -> None:
+    pass
+
+
+def _status(callback: Callback, text: str, value: int | None = None) -> None:
+    callback.get('setStatus', _empty)(text)
+    if value is not None:
+        callback.get('setProgress', _empty)(value)
+
+
+def forge_full_version(mc_version: str, forge_version: str) -> str:
+    """Версия Forge в формате maven: 47.2.0 для 1.20.1 — это 1.20.1-47.2.0"""
+    if '-' in forge_version:
+        return forge_version
+    return f'{mc_version}-{forge_version}'
+
+
+def install_fabric(mc_version: str, version: str | None, minecraft_dir: str, callback: Callback) -> str:
+    try:
+        loader_version = version or get_latest_loader_version()
+        # Базовую версию ставим параллельным установщиком, fabric_install найдёт файлы готовыми
+        install_version(mc_version, minecraft_dir, callback=callback)
+        fabric_install(
+            minecraft_version=mc_version,
+            minecraft_directory=minecraft_dir,
+            loader_version=loader_version,
+            callback=callback,
+        )
+    except Exception as e:
+        logging.exception('Fabric install error')
+        raise LoaderInstallError(f'Ошибка установки Fabric: {e!s}') from e
+    return f'Fabric {loader_version} для {mc_version} установлен!'
+
+
+def install_forge(mc_version: str, version: str | None, minecraft_dir: str, callback: Callback) -> str:
+    # Конкретная версия Forge (из списка или манифеста) либо последняя для версии Minecraft
+    forge_version = forge_full_version(mc_version, version) if version else find_forge_version(mc_version)
+    if not forge_version:
+        raise LoaderInstallError(f'Forge для {mc_version} не найден')
+    try:
+        # Библиотеки из install_profile.json проверяются параллельно до запуска процессоров,
+        # поэтому повторять всю установку при битом jar больше не нужно
+        forge_install(forge_version, minecraft_dir, callback=callback)
+    except Exception as e:
+        logging.error(f'Forge install failed: {e!s}', exc_info=True)
+        raise LoaderInstallError(f'Ошибка установки Forge: {e!s}') from e
+    return f'Forge {forge_version} установлен!'
+
+
+def resolve_python_command() -> list[str] | None:
+    """Находит системную команду для запуска Python 3.
+
+    Возвращает список argv-префикса (например, ['python'] или ['py', '-3'])
+    либо None, если подходящий Python не найден.
+    """
+    candidates = [
+        ['python3'],
+        ['python'],
+        ['py', '-3'],
+        ['py'],
+    ]
+    for prefix in candidates:
+        try:
+            res = subprocess.run([*prefix, '--version'], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+            out = (res.stdout or '').strip().lower()
+            if res.returncode == 0 and 'python 3' in out:
+                return prefix
+        except Exception:
+            continue
+    return None
+
+
+def _find_optifine_jar(work_dir: str) -> str | None:
+    """Самый свежий *-MOD.jar в рабочей папке патчера (или её подпапках, например 1.12.2/)"""
+    try:
+        mod_jars = [p for p in glob(os.path.join(work_dir, '*.jar')) if p.lower().endswith('-mod.jar')]
+        if not mod_jars:
+            for root, _dirs, files in os.walk(work_dir):
+                for name in files:
+                    if name.lower().endswith('-mod.jar'):
+                        mod_jars.append(os.path.join(root, name))
+        if not mod_jars:
+            return None
+        return max(mod_jars, key=os.path.getmtime)
+    except OSError:
+        return None
+
+
+def _run_optifine_patcher(cmd: list[str], work_dir: str, callback: Callback) -> tuple[bool, str]:
+    logging.info('OptiFine patcher command: %s', ' '.join(cmd))
+    try:
+        proc = subprocess.Popen(
+            cmd,
+            cwd=work_dir,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+            universal_newlines=True,
+        )
+    except Exception as e:
+        return False, f'Не удалось запустить патчер: {e!s}'
+
+    # Читаем поток вывода построчно, пишем в лог и статус, следим за таймаутом бездействия
+    last_output_time = time.time()
+    collected_output: list[str] = []
+    detected_exit_code: int | None = None
+    try:
+        assert proc.stdout is not None
+        for raw in proc.stdout:
+            line = raw.rstrip('\n')
+            collected_output.append(line)
+            last_output_time = time.time()
+            if line:
+                logging.debug('[OptiFinePatcher] %s', line)
+                _status(callback, f'Патчинг: {line[:100]}', 50)
+                # Строка финала патчера с кодом, например: "Done Patching OptiFine with code 1 (failure)."
+                if 'Done Patching OptiFine with code' in line:
+                    try:
+                        detected_exit_code = int(line.split('with code', 1)[1].strip().split(' ', 1)[0])
+                    except ValueError:
+                        detected_exit_code = None
+            if time.time() - last_output_time > OPTIFINE_INACTIVITY_TIMEOUT:
+                proc.kill()
+                return False, 'Патчер завис (нет вывода > 5 минут). Остановлен.'
+        # если увидели финальную строку — используем её код, иначе берём код процесса
+        ret_code = detected_exit_code if detected_exit_code is not None else proc.wait(timeout=30)
+        if ret_code != 0:
+            tail = '\n'.join(collected_output[-30:])
+            return False, f'Патчер завершился с кодом {ret_code}.\n{tail}'
+        return True, '\n'.join(collected_output[-30:])
+    except Exception as e:
+        try:
+            proc.kill()
+        except Exception:
+            pass
+        return False, f'Ошибка выполнения патчера: {e!s}'
+
+
+def install_optifine(mc_version: str, version: str | None, minecraft_dir: str, callback: Callback, mods_dir: str = MODS_DIR) -> str:
+    """Установка OptiFine как отдельного мода через AutomaticOptifinePatcher.
+
+    - Скачивает скрипт optifine_patcher.py
+    - Запускает патчинг для указанной версии Minecraft или конкретной версии OptiFine
+    - Перемещает полученный *-MOD.jar в каталог модов выбранной версии
+    """
+    if not mc_version:
+        raise LoaderInstallError('Не указана версия Minecraft для OptiFine')
+
+    _status(callback, 'Проверка Java...', 5)
+    if get_java_discovery().path_java() is None:
+        raise LoaderInstallError('Java не найдена. Установите Java 17+ и добавьте в PATH.')
+
+    _status(callback, 'Подготовка окружения...', 10)
+    work_dir = os.path.join(minecraft_dir, 'optifine_patcher')
+    os.makedirs(work_dir, exist_ok=True)
+    patcher_path = os.path.join(work_dir, 'optifine_patcher.py')
+
+    # Скачиваем скрипт (используем исходник из репозитория)
+    _status(callback, 'Загрузка патчера OptiFine...', 20)
+    try:
+        with urllib.request.urlopen(OPTIFINE_PATCHER_URL) as resp, open(patcher_path, 'wb') as f:
+            shutil.copyfileobj(resp, f)
+    except Exception as e:
+        raise LoaderInstallError(f'Не удалось загрузить патчер: {e!s}') from e
+
+    _status(callback, 'Запуск патчинга OptiFine...', 40)
+    # Если передана конкретная версия OptiFine, используем её,
+    # иначе версию Minecraft, чтобы взять свежий релиз для этой ветки
+    download_arg = version or mc_version
+
+    # Определяем системный Python (нельзя использовать sys.executable в сборке лаунчера)
+    python_cmd = resolve_python_command()
+    if python_cmd is None:
+        raise LoaderInstallError('Python 3 не найден. Установите Python и добавьте в PATH.')
+
+    base_cmd = [*python_cmd, patcher_path, '-d', download_arg, '-w', work_dir]
+    # Первая попытка с -m -f (перемещение результата и очистка)
+    ok, out = _run_optifine_patcher([*base_cmd, '-m', '-f'], work_dir, callback)
+    if not ok and _find_optifine_jar(work_dir) is None:
+        logging.warning('Патчер завершился ошибкой, повтор без -m/-f: %s', out)
+        # Повторная попытка без перемещения/удаления — иногда помогает на Windows
+        ok, out2 = _run_optifine_patcher(base_cmd, work_dir, callback)
+        if not ok and _find_optifine_jar(work_dir) is None:
+            logging.warning('Повтор без -m/-f не помог, пробуем с перекачкой (-r)')
+            ok, out3 = _run_optifine_patcher([*base_cmd, '-r'], work_dir, callback)
+            if not ok and _find_optifine_jar(work_dir) is None:
+                raise LoaderInstallError(out3 or out2 or out)
+
+    _status(callback, 'Поиск результата...', 70)
+    result_jar = _find_optifine_jar(work_dir)
+    if result_jar is None:
+        raise LoaderInstallError('Не удалось найти результат патчинга (*-MOD.jar)')
+
+    # Перемещение в mods/<mc_version>
+    _status(callback, 'Перемещение в папку модов...', 85)
+    try:
+        target_dir = os.path.join(mods_dir, mc_version)
+        os.makedirs(target_dir, exist_ok=True)
+        shutil.move(result_jar, os.path.join(target_dir, os.path.basename(result_jar)))
+    except Exception as e:
+        raise LoaderInstallError(f'Не удалось переместить мод: {e!s}') from e
+
+    # Дополнительно: докачать саму версию Minecraft, если не установлена
+    try:
+        if not os.path.exists(os.path.join(minecraft_dir, 'versions', mc_version)):
+            _status(callback, 'Загрузка файлов версии Minecraft...', 92)
+            install_version(mc_version, minecraft_dir, callback=callback)
+    except Exception as e:
+        logging.warning('Не удалось докачать версию Minecraft: %s', e)
+
+    _status(callback, 'Готово', 100)
+    return f'OptiFine установлен для {mc_version}!'
+
+
+def install_loader(
+    loader_type: str,
+    version: str | None,
+    mc_version: str,
+    minecraft_dir: str = MINECRAFT_DIR,
+    callback: Callback | None = None,
+    mods_dir: str = MODS_DIR,
+) -> str:
+    """Ставит модлоадер и возвращает сообщение для пользователя"""
+    callback = callback or {}
+    loader_type = loader_type.lower()
+    if loader_type == 'fabric':
+        return install_fabric(mc_version, version, minecraft_dir, callback)
+    if loader_type == 'forge':
+        return install_forge(mc_version, version, minecraft_dir, callback)
+    if loader_type == 'optifine':
+        return install_optifine(mc_version, version, minecraft_dir, callback, mods_dir)
+    raise LoaderInstallError(f'Установка модлоадера {loader_type} не поддерживается')
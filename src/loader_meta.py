@@ -0,0 +1,207 @@
+"""
+Метаданные модлоадеров для запуска
+
+Сначала ищет уже установленный профиль модлоадера в versions/*/*.json,
+и только если его нет — обращается к сети через TTL-кэш метаданных.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+
+from config import CACHE_DIR
+from flow import dedicate
+
+LOADER_META_CACHE_PATH: str = os.path.join(CACHE_DIR, 'loader_meta.json')
+# Через сколько секунд закэшированные метаданные считаются устаревшими
+LOADER_META_TTL = 6 * 60 * 60
+
+# Признаки профилей модлоадеров в имени папки версии (в нижнем регистре)
+_PROFILE_MARKERS: dict[str, tuple[str, ...]] = {
+    'fabric': ('fabric-loader-',),
+    'quilt': ('quilt-loader-',),
+    'forge': ('-forge-', '-forge', 'forge-'),
+    'neoforge': ('neoforge-',),
+    'optifine': ('optifine',),
+}
+
+
+def _matches_loader(name: str, loader_type: str) -> bool:
+    lowered = name.lower()
+    if loader_type == 'forge' and 'neoforge' in lowered:
+        return False
+    return any(marker in lowered for marker in _PROFILE_MARKERS.get(loader_type, ()))
+
+
+def find_installed_profile(mc_version: str, loader_type: str, minecraft_dir: str) -> str | None:
+    """Ищет установленный профиль модлоадера для версии Minecraft (без сетевых запросов)"""
+    versions_dir = os.path.join(minecraft_dir, 'versions')
+    try:
+        names = os.listdir(versions_dir)
+    except OSError:
+        return None
+
+    candidates: list[tuple[float, str]] = []
+    for name in names:
+        if not _matches_loader(name, loader_type):
+            continue
+        json_path = os.path.join(versions_dir, name, f'{name}.json')
+        try:
+            with open(json_path, encoding='utf-8') as f:
+                data = json.load(f)
+            mtime = os.path.getmtime(json_path)
+        except (OSError, ValueError):
+            continue
+        # У профилей модлоадеров базовая версия указана в inheritsFrom,
+        # у старых «цельных» профилей — только в имени
+        base_version = data.get('inheritsFrom')
+        if base_version != mc_version and not (base_version is None and mc_version in name):
+            continue
+        candidates.append((mtime, name))
+
+    if not candidates:
+        return None
+    # Берём самый свежий профиль
+    candidates.sort(reverse=True)
+    return candidates[0][1]
+
+
+class LoaderMetadataCache:
+    """TTL-кэш удалённых метаданных модлоадеров с фоновым обновлением"""
+
+    def __init__(self, path: str = LOADER_META_CACHE_PATH, ttl: float = LOADER_META_TTL) -> None:
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._refreshing: set[str] = set()
+        self._entries: dict[str, dict] = self._load()
+
+    def _load(self) -> dict[str, dict]:
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, indent=4)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logging.warning(f'[LOADER META] Не удалось сохранить кэш: {e}')
+
+    def _store(self, key: str, value: str) -> None:
+        with self._lock:
+            self._entries[key] = {'value': value, 'fetched_at': time.time()}
+            self._save()
+
+    def _refresh(self, key: str, fetch: Callable[[], str | None]) -> None:
+        try:
+            value = fetch()
+            if value:
+                self._store(key, value)
+                logging.debug(f'[LOADER META] {key} обновлён в фоне: {value}')
+        except Exception as e:
+            logging.warning(f'[LOADER META] Фоновое обновление {key} не удалось: {e}')
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get(self, key: str, fetch: Callable[[], str | None]) -> str | None:
+        """Возвращает значение из кэша; устаревшее значение обновляется в фоне"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if time.time() - entry.get('fetched_at', 0) > self.ttl and key not in self._refreshing:
+                    self._refreshing.add(key)
+                    dedicate(self._refresh, key, fetch)
+                return entry.get('value')
+
+        # Значения нет совсем — придётся сходить в сеть синхронно
+        value = fetch()
+        if value:
+            self._store(key, value)
+        return value
+
+
+def _fetch_fabric_loader() -> str | None:
+    from minecraft_launcher_lib.fabric import get_latest_loader_version
+
+    return get_latest_loader_version()
+
+
+def _fetch_quilt_loader() -> str | None:
+    from minecraft_launcher_lib.quilt import get_latest_loader_version
+
+    return get_latest_loader_version()
+
+
+def _fetch_forge_version(mc_version: str) -> str | None:
+    from minecraft_launcher_lib.forge import find_forge_version
+
+    return find_forge_version(mc_version)
+
+
+class LoaderMetadataService:
+    """Определяет версию запуска для модлоадера: сначала локально, затем через кэш"""
+
+    def __init__(self, cache: LoaderMetadataCache | None = None) -> None:
+        self.cache = cache or LoaderMetadataCache()
+
+    def latest_fabric_loader(self) -> str | None:
+        return self.cache.get('fabric:loader', _fetch_fabric_loader)
+
+    def latest_quilt_loader(self) -> str | None:
+        return self.cache.get('quilt:loader', _fetch_quilt_loader)
+
+    def forge_version(self, mc_version: str) -> str | None:
+        return self.cache.get(f'forge:{mc_version}', lambda: _fetch_forge_version(mc_version))
+
+    def resolve_launch_version(self, mc_version: str, loader_type: str, minecraft_dir: str) -> str:
+        """Возвращает id версии для запуска с учётом модлоадера"""
+        if loader_type in ('vanilla', '', None):
+            return mc_version
+
+        installed = find_installed_profile(mc_version, loader_type, minecraft_dir)
+        if installed:
+            logging.debug(f'[LOADER META] Найден установленный профиль {loader_type}: {installed}')
+            return installed
+
+        if loader_type == 'forge':
+            forge_version = self.forge_version(mc_version)
+            if not forge_version:
+                raise ValueError(f'Forge version for {mc_version} not found')
+            return f'{mc_version}-forge-{forge_version.split("-")[-1]}'
+        if loader_type == 'fabric':
+            loader_version = self.latest_fabric_loader()
+            if not loader_version:
+                raise ValueError('Fabric loader version not found')
+            return f'fabric-loader-{loader_version}-{mc_version}'
+        if loader_type == 'quilt':
+            loader_version = self.latest_quilt_loader()
+            if not loader_version:
+                raise ValueError('Quilt loader version not found')
+            return f'quilt-loader-{loader_version}-{mc_version}'
+        if loader_type == 'optifine':
+            raise ValueError('OptiFine profile not found; please install OptiFine for this version')
+        if loader_type == 'neoforge':
+            raise ValueError('NeoForge profile not found; please install NeoForge for this version')
+        return mc_version
+
+
+# Глобальный экземпляр
+_loader_metadata: LoaderMetadataService | None = None
+
+
+def get_loader_metadata() -> LoaderMetadataService:
+    """Получить глобальный экземпляр сервиса метаданных модлоадеров"""
+    global _loader_metadata
+    if _loader_metadata is None:
+        _loader_metadata = LoaderMetadataService()
+    return _loader_metadata
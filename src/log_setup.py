@@ -0,0 +1,113 @@
+"""
+Настройка логирования лаунчера
+
+Все обработчики работают в отдельном потоке QueueListener: вызов logging.* в
+GUI-потоке лишь кладёт запись в очередь, а запись в файл и в stderr идёт в фоне.
+Файл лога ротируется по размеру. Уровни задаются в настройках: общий
+('log_level') и по подсистемам ('log_levels') — ключом может быть имя логгера
+(urllib3, minecraft_launcher_lib) или имя модуля лаунчера (mod_manager, java_discovery).
+"""
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+
+from config import LOG_FILE
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s'
+LOG_DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 3
+DEFAULT_LOG_LEVEL = 'INFO'
+# Сторонние библиотеки шумят на DEBUG
+DEFAULT_LOG_LEVELS = {
+    'urllib3': 'WARNING',
+    'PIL': 'WARNING',
+    'asyncio': 'WARNING',
+}
+
+
+def _to_level(value: str | int, default: int = logging.INFO) -> int:
+    if isinstance(value, int):
+        return value
+    level = logging.getLevelName(str(value).upper())
+    return level if isinstance(level, int) else default
+
+
+class ModuleLevelFilter(logging.Filter):
+    """Уровни для модулей лаунчера, которые пишут в корневой логгер"""
+
+    def __init__(self, default: int, levels: dict[str, int]) -> None:
+        super().__init__()
+        self.default = default
+        self.levels = levels
+
+    def level_for(self, record: logging.LogRecord) -> int:
+        if record.module in self.levels:
+            return self.levels[record.module]
+        # Для именованных логгеров ищем ближайшего настроенного предка: urllib3.connectionpool -> urllib3
+        name = record.name
+        while name and name != 'root':
+            if name in self.levels:
+                return self.levels[name]
+            name = name.rpartition('.')[0]
+        return self.default
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= self.level_for(record)
+
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+def setup_logging(
+    log_file: str = LOG_FILE,
+    level: str | int = DEFAULT_LOG_LEVEL,
+    levels: dict[str, str | int] | None = None,
+) -> logging.handlers.QueueListener:
+    """Подключает QueueHandler к корневому логгеру и запускает поток записи"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+
+    formatter = logging.Formatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT)
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding='utf-8'
+    )
+    stream_handler = logging.StreamHandler(sys.stderr)
+    for handler in (file_handler, stream_handler):
+        handler.setFormatter(formatter)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    module_levels: dict[str, int] = {}
+    for name, value in {**DEFAULT_LOG_LEVELS, **(levels or {})}.items():
+        # Настоящий логгер отсекает запись ещё до создания LogRecord
+        logging.getLogger(name).setLevel(_to_level(value))
+        module_levels[name] = _to_level(value)
+    default_level = _to_level(level)
+    queue_handler.addFilter(ModuleLevelFilter(default_level, module_levels))
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(queue_handler)
+    # Корневой логгер пропускает самый подробный из настроенных уровней, остальное отсекает фильтр
+    root.setLevel(min([default_level, *module_levels.values()]))
+
+    _listener = logging.handlers.QueueListener(log_queue, file_handler, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _listener
+
+
+def shutdown_logging() -> None:
+    """Дописывает очередь и останавливает поток записи"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
@@ -21,7 +21,7 @@ class ModManager:
         """Получает актуальный путь к папке модов из настроек"""
         settings = load_settings()
         mods_dir = settings.get('mods_directory', MODS_DIR)
-        logging.debug(f'Папка модов из настроек: {mods_dir}')
+        logging.debug('Папка модов из настроек: %s', mods_dir)
         return mods_dir
     
     @staticmethod
@@ -38,7 +38,7 @@ class ModManager:
                 version_mods = [f for f in os.listdir(version_mods_dir) 
                               if f.endswith('.jar') or f.endswith('.zip')]
                 mods.extend(version_mods)
-                logging.debug(f'Найдено {len(version_mods)} модов в папке версии {version}')
+                logging.debug('Найдено %d модов в папке версии %s', len(version_mods), version)
             except Exception as e:
                 logging.exception(f'Ошибка чтения папки версии {version_mods_dir}: {e}')
         
@@ -51,11 +51,11 @@ class ModManager:
                 for mod in base_mods:
                     if mod not in mods:
                         mods.append(mod)
-                logging.debug(f'Найдено {len(base_mods)} модов в базовой папке')
+                logging.debug('Найдено %d модов в базовой папке', len(base_mods))
             except Exception as e:
                 logging.exception(f'Ошибка чтения базовой папки модов {base_mods_dir}: {e}')
         
-        logging.debug(f'Всего модов для версии {version}: {len(mods)}')
+        logging.debug('Всего модов для версии %s: %d', version, len(mods))
         return mods
 
     @staticmethod
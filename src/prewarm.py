@@ -0,0 +1,186 @@
+"""
+Прогрев файлов игры в кэше ОС
+
+На холодной системе заметная часть первого запуска уходит на чтение сотен jar
+библиотек и модов с диска. Как только известен classpath плана запуска, файлы
+classpath, natives и модов параллельно заказываются в страничный кэш, пока
+выбирается Java и стартует JVM. На Linux/macOS-подобных системах с
+posix_fadvise это WILLNEED (ядро читает в фоне), иначе файлы прочитываются
+блоками. Список файлов последнего запуска сохраняется, чтобы прогреть его, пока
+лаунчер простаивает после старта. Время до готовности игры с прогревом и без
+сохраняется для сравнения.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from config import CACHE_DIR
+
+PREWARM_INDEX_PATH: str = os.path.join(CACHE_DIR, 'prewarm.json')
+PREWARM_WORKERS = 4
+READ_CHUNK = 1024 * 1024
+# Пауза после старта лаунчера перед прогревом последней версии
+IDLE_DELAY = 10.0
+# Сколько последних замеров времени запуска хранить
+MAX_TIMINGS = 5
+
+MODE_FADVISE = 'fadvise'
+MODE_READ = 'read'
+
+
+def prewarm_mode() -> str:
+    return MODE_FADVISE if hasattr(os, 'posix_fadvise') else MODE_READ
+
+
+def collect_paths(classpath: list[str], natives_dir: str, mods_dir: str) -> list[str]:
+    """Файлы для прогрева: classpath, natives и моды (без повторов и несуществующих)"""
+    paths = list(classpath)
+    for directory, suffixes in ((natives_dir, None), (mods_dir, ('.jar', '.zip'))):
+        try:
+            with os.scandir(directory) as entries:
+                paths.extend(
+                    entry.path
+                    for entry in entries
+                    if entry.is_file() and (suffixes is None or entry.name.endswith(suffixes))
+                )
+        except OSError:
+            continue
+    return [path for path in dict.fromkeys(paths) if os.path.isfile(path)]
+
+
+def prewarm_file(path: str, mode: str) -> int:
+    """Заказывает файл в страничный кэш; возвращает его размер"""
+    try:
+        fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+    except OSError:
+        return 0
+    try:
+        size = os.fstat(fd).st_size
+        if mode == MODE_FADVISE:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        else:
+            while os.read(fd, READ_CHUNK):
+                pass
+        return size
+    except OSError:
+        return 0
+    finally:
+        os.close(fd)
+
+
+@dataclass
+class PrewarmStats:
+    files: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+    mode: str = MODE_READ
+
+    def describe(self) -> str:
+        return f'{self.files} files, {self.bytes / (1024 * 1024):.1f} MB in {self.seconds:.2f} s ({self.mode})'
+
+
+class PrewarmJob:
+    """Фоновый прогрев набора файлов несколькими потоками"""
+
+    def __init__(self, paths: list[str], workers: int = PREWARM_WORKERS) -> None:
+        self.paths = paths
+        self.workers = workers
+        self.stats = PrewarmStats(mode=prewarm_mode())
+        self.done = threading.Event()
+
+    def _run(self) -> None:
+        started = time.monotonic()
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='prewarm') as executor:
+                sizes = list(executor.map(lambda path: prewarm_file(path, self.stats.mode), self.paths))
+            self.stats.files = sum(1 for size in sizes if size)
+            self.stats.bytes = sum(sizes)
+        except Exception:
+            logging.exception('[PREWARM] Prewarm failed')
+        finally:
+            self.stats.seconds = time.monotonic() - started
+            self.done.set()
+
+    def start(self) -> 'PrewarmJob':
+        threading.Thread(target=self._run, daemon=True, name='prewarm').start()
+        return self
+
+    def wait(self, timeout: float | None = None) -> bool:
+        return self.done.wait(timeout)
+
+
+class Prewarmer:
+    """Прогрев при запуске и в простое, с замерами времени запуска"""
+
+    def __init__(self, path: str = PREWARM_INDEX_PATH) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._data = self._load()
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._data, f, indent=4)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logging.warning(f'[PREWARM] Не удалось сохранить список прогрева: {e}')
+
+    def start(self, version: str, paths: list[str]) -> PrewarmJob:
+        """Запускает прогрев файлов запуска и запоминает их для прогрева в простое"""
+        with self._lock:
+            self._data['last'] = {'version': version, 'paths': paths}
+            self._save()
+        return PrewarmJob(paths).start()
+
+    def prewarm_last(self, delay: float = IDLE_DELAY) -> PrewarmStats | None:
+        """Прогревает файлы последнего запуска (вызывается в фоне после старта лаунчера)"""
+        time.sleep(delay)
+        with self._lock:
+            last = self._data.get('last') or {}
+        paths = [path for path in last.get('paths', []) if os.path.isfile(path)]
+        if not paths:
+            return None
+        job = PrewarmJob(paths).start()
+        job.wait()
+        logging.info(f'[PREWARM] Idle prewarm of {last.get("version")}: {job.stats.describe()}')
+        return job.stats
+
+    def record_startup(self, version: str, prewarmed: bool, seconds: float) -> str | None:
+        """Сохраняет время до готовности игры; возвращает сравнение с прогревом и без, если есть оба"""
+        with self._lock:
+            timings = self._data.setdefault('startup', {}).setdefault(version, {'prewarmed': [], 'cold': []})
+            bucket = timings['prewarmed' if prewarmed else 'cold']
+            bucket.append(round(seconds, 2))
+            del bucket[:-MAX_TIMINGS]
+            self._save()
+            warm, cold = timings['prewarmed'], timings['cold']
+        if not warm or not cold:
+            return None
+        warm_avg, cold_avg = sum(warm) / len(warm), sum(cold) / len(cold)
+        return f'average {warm_avg:.1f} s with prewarm vs {cold_avg:.1f} s without ({cold_avg - warm_avg:+.1f} s saved)'
+
+
+# Глобальный экземпляр
+_prewarmer: Prewarmer | None = None
+
+
+def get_prewarmer() -> Prewarmer:
+    """Получить глобальный прогреватель файлов игры"""
+    global _prewarmer
+    if _prewarmer is None:
+        _prewarmer = Prewarmer()
+    return _prewarmer
@@ -0,0 +1,203 @@
+"""
+Реестр запущенных процессов игры
+
+Лаунчер запоминает каждую запущенную им JVM: PID, время старта процесса по данным
+ОС, версию и хэш команды. Реестр хранится на диске, поэтому переживает перезапуск
+лаунчера. Проверка «игра уже запущена» сводится к проверке конкретных PID: процесс
+жив и его время старта совпадает с записанным (PID мог достаться другому процессу).
+Ни ps, ни tasklist/wmic не запускаются.
+"""
+import ctypes
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, fields
+
+from config import CACHE_DIR
+
+PROCESS_REGISTRY_PATH: str = os.path.join(CACHE_DIR, 'processes.json')
+_STILL_ACTIVE = 259
+_PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+
+
+@dataclass
+class GameProcess:
+    pid: int
+    # Время старта процесса в единицах ОС (тики /proc, FILETIME Windows, секунды macOS)
+    start_token: int | None
+    launched: float
+    version: str
+    loader: str
+    command_hash: str
+    session_id: str | None = None
+
+
+def command_hash(command: list[str] | str) -> str:
+    text = command if isinstance(command, str) else '\0'.join(command)
+    return hashlib.sha1(text.encode('utf-8', errors='replace')).hexdigest()
+
+
+def _linux_start_token(pid: int) -> int | None:
+    try:
+        with open(f'/proc/{pid}/stat', 'rb') as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # Имя процесса в скобках может содержать пробелы — поля считаем после последней ')'
+    fields_after_name = stat[stat.rfind(b')') + 2 :].split()
+    # starttime — 22-е поле, т.е. 20-е после имени и состояния
+    try:
+        return int(fields_after_name[19])
+    except (IndexError, ValueError):
+        return None
+
+
+def _windows_start_token(pid: int) -> int | None:
+    kernel32 = ctypes.windll.kernel32
+    handle = kernel32.OpenProcess(_PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+    if not handle:
+        return None
+    try:
+        exit_code = ctypes.c_ulong()
+        if not kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code)) or exit_code.value != _STILL_ACTIVE:
+            return None
+        creation, exit_time, kernel, user = (ctypes.c_ulonglong() for _ in range(4))
+        if not kernel32.GetProcessTimes(
+            handle, ctypes.byref(creation), ctypes.byref(exit_time), ctypes.byref(kernel), ctypes.byref(user)
+        ):
+            return None
+        return creation.value
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+def _posix_start_token(pid: int) -> int | None:
+    """macOS/BSD: /proc нет, время старта берём у ps только для одного PID"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return None
+    except PermissionError:
+        pass
+    try:
+        result = subprocess.run(['ps', '-o', 'lstart=', '-p', str(pid)], capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    started = result.stdout.strip()
+    if not started:
+        return None
+    try:
+        return int(time.mktime(time.strptime(started, '%a %b %d %H:%M:%S %Y')))
+    except ValueError:
+        return None
+
+
+def process_start_token(pid: int) -> int | None:
+    """Время старта живого процесса или None, если процесса нет"""
+    if sys.platform.startswith('linux'):
+        return _linux_start_token(pid)
+    if os.name == 'nt':
+        # os.kill(pid, 0) на Windows завершает процесс, поэтому только WinAPI
+        return _windows_start_token(pid)
+    return _posix_start_token(pid)
+
+
+class ProcessRegistry:
+    """Сохраняемый на диск список процессов игры, запущенных лаунчером"""
+
+    def __init__(self, path: str = PROCESS_REGISTRY_PATH) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._processes: dict[int, GameProcess] = self._load()
+
+    def _load(self) -> dict[int, GameProcess]:
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+            known = {f.name for f in fields(GameProcess)}
+            items = [GameProcess(**{k: v for k, v in item.items() if k in known}) for item in data]
+            return {item.pid: item for item in items}
+        except (OSError, ValueError, TypeError):
+            return {}
+
+    def _save(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f'{self.path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump([asdict(p) for p in self._processes.values()], f, indent=4)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logging.warning(f'[PROCESSES] Не удалось сохранить реестр процессов: {e}')
+
+    def register(
+        self,
+        pid: int,
+        version: str,
+        loader: str,
+        command: list[str] | str,
+        session_id: str | None = None,
+    ) -> GameProcess:
+        entry = GameProcess(
+            pid=pid,
+            start_token=process_start_token(pid),
+            launched=time.time(),
+            version=version,
+            loader=loader,
+            command_hash=command_hash(command),
+            session_id=session_id,
+        )
+        with self._lock:
+            self._processes[pid] = entry
+            self._save()
+        return entry
+
+    def unregister(self, pid: int) -> None:
+        with self._lock:
+            if self._processes.pop(pid, None) is not None:
+                self._save()
+
+    @staticmethod
+    def is_alive(entry: GameProcess) -> bool:
+        token = process_start_token(entry.pid)
+        if token is None:
+            return False
+        # Если при регистрации время старта узнать не удалось, доверяем одному PID
+        return entry.start_token is None or token == entry.start_token
+
+    def alive(self) -> list[GameProcess]:
+        """Живые процессы игры; завершившиеся удаляются из реестра"""
+        with self._lock:
+            entries = list(self._processes.values())
+        alive: list[GameProcess] = []
+        dead: list[GameProcess] = []
+        for entry in entries:
+            (alive if self.is_alive(entry) else dead).append(entry)
+        if dead:
+            with self._lock:
+                for entry in dead:
+                    # Запись могли перерегистрировать с тем же PID, пока шла проверка
+                    if self._processes.get(entry.pid) is entry:
+                        del self._processes[entry.pid]
+                self._save()
+        return alive
+
+    def any_running(self) -> bool:
+        return bool(self.alive())
+
+
+# Глобальный экземпляр
+_process_registry: ProcessRegistry | None = None
+
+
+def get_process_registry() -> ProcessRegistry:
+    """Получить глобальный реестр процессов игры"""
+    global _process_registry
+    if _process_registry is None:
+        _process_registry = ProcessRegistry()
+    return _process_registry
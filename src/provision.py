@@ -0,0 +1,420 @@
+"""
+Подготовка машины по манифесту
+
+Манифест (JSON) декларативно описывает, что должно быть установлено:
+
+    {
+        "versions": ["1.20.1"],
+        "loaders": [
+            {"type": "fabric", "minecraft": "1.20.1"},
+            {"type": "forge", "minecraft": "1.20.1", "version": "47.2.0"}
+        ],
+        "java": [17],
+        "mods": [
+            {"modrinth": "sodium", "minecraft": "1.20.1", "loader": "fabric"},
+            {"url": "https://example.com/mod.jar", "sha1": "...", "minecraft": "1.20.1"}
+        ],
+        "resourcepacks": [{"modrinth": "faithful-32x", "minecraft": "1.20.1"}]
+    }
+
+Сначала вычисляется полный список файлов: файлы версий и уже установленных
+профилей загрузчиков, рантаймы Java (указанные явно и нужные версиям), моды и
+ресурспаки. Всё качается одной общей очередью Downloader с проверкой SHA1:
+одинаковые пути скачиваются один раз, а файлы с одинаковым SHA1 по разным путям
+качаются один раз и копируются. Корректные файлы пропускаются, поэтому повторный
+запуск докачивает только недостающее. Недостающие загрузчики ставятся после
+очереди (loader_installer), когда базовые версии уже на месте.
+"""
+import json
+import logging
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from urllib.parse import unquote, urlparse
+
+import requests
+
+from config import MINECRAFT_DIR, RESOURCEPACKS_DIR
+from java_runtime import MojangRuntimeFiles, component_for_major, get_runtime_manager
+from launch_stages import get_heavy_phase_limiter
+from loader_installer import SUPPORTED_LOADERS, forge_full_version, install_loader
+from loader_meta import find_installed_profile
+from mod_manager import ModManager
+from version_installer import (
+    DEFAULT_WORKERS,
+    USER_AGENT,
+    Callback,
+    DownloadItem,
+    Downloader,
+    NativesExtract,
+    collect_version_files,
+    copy_parent_jar,
+    extract_natives,
+    is_file_valid,
+)
+
+MODRINTH_API_URL = 'https://api.modrinth.com/v2'
+# Сколько проектов Modrinth разрешается одновременно
+RESOLVE_WORKERS = 8
+
+
+class ProvisionError(ValueError):
+    pass
+
+
+@dataclass
+class LoaderSpec:
+    type: str
+    minecraft: str
+    # Версия загрузчика; None — последняя
+    version: str | None = None
+
+    def describe(self) -> str:
+        return f'{self.type} {self.version or "latest"} for {self.minecraft}'
+
+
+@dataclass
+class FileSpec:
+    """Мод или ресурспак: проект Modrinth или прямая ссылка"""
+
+    kind: str
+    modrinth: str | None = None
+    url: str | None = None
+    minecraft: str | None = None
+    loader: str | None = None
+    version: str | None = None
+    sha1: str | None = None
+    size: int | None = None
+    file: str | None = None
+
+    def describe(self) -> str:
+        return self.modrinth or self.url or '?'
+
+
+def _str_list(data: dict, key: str) -> list[str]:
+    value = data.get(key, [])
+    if not isinstance(value, list) or not all(isinstance(v, str) and v for v in value):
+        raise ProvisionError(f'"{key}" must be a list of strings')
+    return value
+
+
+def _file_specs(data: dict, key: str, kind: str) -> list[FileSpec]:
+    specs = []
+    for entry in data.get(key, []):
+        if not isinstance(entry, dict) or not (entry.get('modrinth') or entry.get('url')):
+            raise ProvisionError(f'"{key}" entries need "modrinth" or "url": {entry!r}')
+        known = {name: entry.get(name) for name in ('modrinth', 'url', 'minecraft', 'loader', 'version', 'sha1', 'size', 'file')}
+        specs.append(FileSpec(kind, **known))
+    return specs
+
+
+@dataclass
+class Manifest:
+    versions: list[str] = field(default_factory=list)
+    loaders: list[LoaderSpec] = field(default_factory=list)
+    java: list[int] = field(default_factory=list)
+    mods: list[FileSpec] = field(default_factory=list)
+    resourcepacks: list[FileSpec] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Manifest':
+        if not isinstance(data, dict):
+            raise ProvisionError('manifest must be a JSON object')
+        loaders = []
+        for entry in data.get('loaders', []):
+            if not isinstance(entry, dict) or entry.get('type') not in SUPPORTED_LOADERS or not entry.get('minecraft'):
+                raise ProvisionError(f'loader needs "type" ({", ".join(SUPPORTED_LOADERS)}) and "minecraft": {entry!r}')
+            loaders.append(LoaderSpec(entry['type'], entry['minecraft'], entry.get('version')))
+        java = data.get('java', [])
+        if not isinstance(java, list) or not all(isinstance(v, int) for v in java):
+            raise ProvisionError('"java" must be a list of major versions')
+        return cls(
+            versions=_str_list(data, 'versions'),
+            loaders=loaders,
+            java=java,
+            mods=_file_specs(data, 'mods', 'mod'),
+            resourcepacks=_file_specs(data, 'resourcepacks', 'resourcepack'),
+        )
+
+    @classmethod
+    def load(cls, path: str) -> 'Manifest':
+        try:
+            with open(path, encoding='utf-8') as f:
+                return cls.from_dict(json.load(f))
+        except (OSError, ValueError) as e:
+            if isinstance(e, ProvisionError):
+                raise
+            raise ProvisionError(f'cannot read manifest {path}: {e}') from e
+
+
+@dataclass
+class ProvisionPlan:
+    # Файлы общей очереди (без повторов по пути и SHA1)
+    items: list[DownloadItem] = field(default_factory=list)
+    # (источник, копия) для файлов с одинаковым SHA1 по разным путям
+    copies: list[tuple[DownloadItem, DownloadItem]] = field(default_factory=list)
+    natives: list[NativesExtract] = field(default_factory=list)
+    # Данные версий для распаковки natives и jar старых профилей
+    versions: dict[str, dict] = field(default_factory=dict)
+    runtimes: list[MojangRuntimeFiles] = field(default_factory=list)
+    # Рантаймы, которых нет у Mojang: ставятся из Adoptium вне очереди
+    adoptium: list[tuple[str, int]] = field(default_factory=list)
+    loaders: list[LoaderSpec] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+
+
+@dataclass
+class ProvisionReport:
+    planned: int = 0
+    # При пробном запуске — сколько файлов пришлось бы скачать
+    pending: int = 0
+    downloaded: int = 0
+    skipped: int = 0
+    copied: int = 0
+    bytes_downloaded: int = 0
+    runtimes: list[str] = field(default_factory=list)
+    loaders: list[str] = field(default_factory=list)
+    failed: list[str] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+    def describe(self) -> str:
+        if self.pending:
+            return f'{self.planned} files: {self.pending} to download, {self.skipped} up to date; failures: {len(self.failed)}'
+        return (
+            f'{self.planned} files: {self.downloaded} downloaded ({self.bytes_downloaded / 1024 / 1024:.1f} MB), '
+            f'{self.copied} copied, {self.skipped} up to date; runtimes installed: {len(self.runtimes)}, '
+            f'loaders installed: {len(self.loaders)}, failures: {len(self.failed)}; {self.seconds:.1f} s'
+        )
+
+
+def _dedupe(items: list[DownloadItem]) -> tuple[list[DownloadItem], list[tuple[DownloadItem, DownloadItem]]]:
+    """Один файл на путь; одинаковый SHA1 по разным путям качается один раз и копируется"""
+    by_path: dict[str, DownloadItem] = {}
+    for item in items:
+        by_path.setdefault(os.path.normcase(os.path.abspath(item.path)), item)
+    unique: list[DownloadItem] = []
+    copies: list[tuple[DownloadItem, DownloadItem]] = []
+    by_hash: dict[str, DownloadItem] = {}
+    for item in by_path.values():
+        source = by_hash.setdefault(item.sha1, item) if item.sha1 else item
+        if source is item:
+            unique.append(item)
+        else:
+            copies.append((source, item))
+    return unique, copies
+
+
+class Provisioner:
+    """Установка версий, загрузчиков, Java, модов и ресурспаков по манифесту"""
+
+    def __init__(self, minecraft_dir: str | None = None, max_workers: int = DEFAULT_WORKERS, callback: Callback | None = None) -> None:
+        self.minecraft_dir = minecraft_dir or MINECRAFT_DIR
+        self.downloader = Downloader(max_workers=max_workers, callback=callback)
+        self._session = requests.Session()
+        self._session.headers['User-Agent'] = USER_AGENT
+
+    def loader_profile(self, spec: LoaderSpec) -> str | None:
+        """Установленный профиль загрузчика (без сетевых запросов)"""
+        if spec.version is None:
+            return find_installed_profile(spec.minecraft, spec.type, self.minecraft_dir)
+        # Профиль Forge называется <minecraft>-forge-<forge>, в манифесте версия может быть как 47.2.0, так и 1.20.1-47.2.0
+        forge_version = forge_full_version(spec.minecraft, spec.version).removeprefix(f'{spec.minecraft}-')
+        profile_id = {
+            'forge': f'{spec.minecraft}-forge-{forge_version}',
+            'fabric': f'fabric-loader-{spec.version}-{spec.minecraft}',
+        }.get(spec.type)
+        if profile_id and os.path.isfile(os.path.join(self.minecraft_dir, 'versions', profile_id, f'{profile_id}.json')):
+            return profile_id
+        return None
+
+    def optifine_installed(self, spec: LoaderSpec) -> bool:
+        # OptiFine ставится как мод в папку модов версии
+        mods_dir = os.path.join(ModManager.get_mods_directory(), spec.minecraft)
+        try:
+            return any('optifine' in name.lower() and name.endswith('.jar') for name in os.listdir(mods_dir))
+        except OSError:
+            return False
+
+    def resolve_file(self, spec: FileSpec) -> DownloadItem:
+        """Файл мода или ресурспака; для Modrinth — подходящая версия проекта"""
+        if spec.kind == 'mod':
+            target_dir = ModManager.get_mods_directory()
+            if spec.minecraft:
+                target_dir = os.path.join(target_dir, spec.minecraft)
+        else:
+            target_dir = RESOURCEPACKS_DIR
+        if spec.url:
+            name = spec.file or os.path.basename(unquote(urlparse(spec.url).path))
+            return DownloadItem(spec.url, os.path.join(target_dir, name), spec.sha1, spec.size, spec.kind)
+
+        params = {}
+        if spec.minecraft:
+            params['game_versions'] = json.dumps([spec.minecraft])
+        if spec.loader:
+            params['loaders'] = json.dumps([spec.loader])
+        r = self._session.get(f'{MODRINTH_API_URL}/project/{spec.modrinth}/version', params=params, timeout=20)
+        r.raise_for_status()
+        versions = r.json() or []
+        if spec.version:
+            versions = [v for v in versions if spec.version in (v.get('version_number'), v.get('id'))]
+        files = (versions[0].get('files') or []) if versions else []
+        if not files:
+            raise ProvisionError(f'no matching version on Modrinth for {spec.minecraft or "any"} / {spec.loader or "any"}')
+        file = next((f for f in files if f.get('primary')), files[0])
+        return DownloadItem(
+            file['url'],
+            os.path.join(target_dir, spec.file or file['filename']),
+            (file.get('hashes') or {}).get('sha1'),
+            file.get('size'),
+            spec.kind,
+        )
+
+    def plan(self, manifest: Manifest) -> ProvisionPlan:
+        """Полный список нужных файлов; ошибки отдельных пунктов собираются, а не прерывают план"""
+        plan = ProvisionPlan()
+        items: list[DownloadItem] = []
+        version_ids = list(dict.fromkeys([*manifest.versions, *(spec.minecraft for spec in manifest.loaders)]))
+
+        for spec in manifest.loaders:
+            if spec.type == 'optifine':
+                installed = self.optifine_installed(spec)
+            else:
+                profile = self.loader_profile(spec)
+                installed = profile is not None
+                if profile and profile not in version_ids:
+                    # Профиль уже установлен: его библиотеки проверяются в общей очереди
+                    version_ids.append(profile)
+            if not installed:
+                plan.loaders.append(spec)
+
+        runtimes: dict[str, int] = {component_for_major(major): major for major in manifest.java}
+        for version_id in version_ids:
+            try:
+                files = collect_version_files(version_id, self.minecraft_dir, self.downloader)
+            except Exception as e:
+                plan.errors.append(f'version {version_id}: {e}')
+                continue
+            items.extend(files.items)
+            plan.natives.extend(files.natives)
+            plan.versions[version_id] = files.data
+            java_version = files.data.get('javaVersion') or {}
+            if java_version.get('component'):
+                runtimes.setdefault(java_version['component'], int(java_version.get('majorVersion') or 8))
+
+        manager = get_runtime_manager()
+        for component, major in runtimes.items():
+            if manager.find(component):
+                continue
+            try:
+                files = manager.prepare_mojang(component, major)
+            except requests.RequestException as e:
+                logging.warning(f'[PROVISION] Манифест Java Mojang недоступен: {e}')
+                files = None
+            if files is None:
+                plan.adoptium.append((component, major))
+            else:
+                plan.runtimes.append(files)
+                items.extend(files.items)
+
+        specs = [*manifest.mods, *manifest.resourcepacks]
+        with ThreadPoolExecutor(max_workers=RESOLVE_WORKERS) as executor:
+            futures = [(spec, executor.submit(self.resolve_file, spec)) for spec in specs]
+            for spec, future in futures:
+                try:
+                    items.append(future.result())
+                except Exception as e:
+                    plan.errors.append(f'{spec.kind} {spec.describe()}: {e}')
+
+        plan.items, plan.copies = _dedupe(items)
+        return plan
+
+    def pending(self, plan: ProvisionPlan) -> list[DownloadItem]:
+        """Файлы плана, которых нет или которые повреждены"""
+        with ThreadPoolExecutor(max_workers=self.downloader.max_workers) as executor:
+            valid = list(executor.map(is_file_valid, plan.items))
+        return [item for item, ok in zip(plan.items, valid) if not ok]
+
+    def install_loader(self, spec: LoaderSpec) -> str:
+        """Ставит загрузчик в текущем потоке; при ошибке — LoaderInstallError"""
+        callback = {'setStatus': lambda text: text and logging.info(f'[PROVISION] {text}')}
+        with get_heavy_phase_limiter().slot():
+            return install_loader(
+                spec.type,
+                spec.version,
+                spec.minecraft,
+                self.minecraft_dir,
+                callback=callback,
+                mods_dir=ModManager.get_mods_directory(),
+            )
+
+    def run(self, manifest: Manifest, dry_run: bool = False) -> ProvisionReport:
+        started = time.monotonic()
+        plan = self.plan(manifest)
+        report = ProvisionReport(planned=len(plan.items) + len(plan.copies), failed=list(plan.errors))
+        try:
+            if dry_run:
+                pending = self.pending(plan)
+                size = sum(item.size or 0 for item in pending) / 1024 / 1024
+                logging.info(
+                    f'[PROVISION] Dry run: {len(pending)} of {len(plan.items)} files to download (~{size:.1f} MB), '
+                    f'{len(plan.copies)} copies, Java from Adoptium: {len(plan.adoptium)}, '
+                    f'loaders to install: {", ".join(spec.describe() for spec in plan.loaders) or "none"}'
+                )
+                report.pending, report.skipped = len(pending), len(plan.items) - len(pending)
+                return report
+
+            result = self.downloader.download_all(plan.items, status='Загрузка файлов по манифесту')
+            report.downloaded, report.skipped = len(result.downloaded), len(result.skipped)
+            report.bytes_downloaded = result.bytes_downloaded
+            report.failed.extend(f'{item.path}: {error}' for item, error in result.failed)
+            failed_paths = {item.path for item, _error in result.failed}
+
+            for source, copy in plan.copies:
+                if is_file_valid(copy):
+                    report.skipped += 1
+                elif source.path not in failed_paths and os.path.isfile(source.path):
+                    os.makedirs(os.path.dirname(copy.path), exist_ok=True)
+                    shutil.copyfile(source.path, copy.path)
+                    report.copied += 1
+                    failed_paths.discard(copy.path)
+                else:
+                    failed_paths.add(copy.path)
+                    report.failed.append(f'{copy.path}: source {source.path} was not downloaded')
+
+            extract_natives(plan.natives)
+            for version_id, data in plan.versions.items():
+                copy_parent_jar(version_id, data, self.minecraft_dir)
+
+            manager = get_runtime_manager()
+            for files in plan.runtimes:
+                if any(item.path in failed_paths for item in files.items):
+                    report.failed.append(f'java {files.component}: files failed to download')
+                    continue
+                manager.commit_mojang(files)
+                report.runtimes.append(files.component)
+            for component, major in plan.adoptium:
+                try:
+                    manager.ensure(component, major, callback=self.downloader.callback)
+                    report.runtimes.append(component)
+                except Exception as e:
+                    report.failed.append(f'java {component}: {e}')
+
+            for spec in plan.loaders:
+                try:
+                    message = self.install_loader(spec)
+                except Exception as e:
+                    report.failed.append(f'loader {spec.describe()}: {e}')
+                    continue
+                logging.info(f'[PROVISION] {spec.describe()}: {message}')
+                report.loaders.append(spec.describe())
+            return report
+        finally:
+            for files in plan.runtimes:
+                shutil.rmtree(files.staging, ignore_errors=True)
+            report.seconds = time.monotonic() - started
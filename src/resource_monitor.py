@@ -0,0 +1,283 @@
+"""
+Мониторинг ресурсов процесса игры
+
+Для каждого запущенного лаунчером процесса в фоновом потоке с заданным интервалом
+снимаются процессорное время, RSS, число потоков и объём дискового ввода-вывода.
+На Linux всё читается из /proc/<pid>/stat и /proc/<pid>/io (без запуска внешних
+программ), на Windows — через GetProcessTimes/GetProcessMemoryInfo/
+GetProcessIoCounters, на macOS — через ps для одного PID (число потоков и
+ввод-вывод там недоступны). Последние замеры хранятся в кольцевом буфере, итог
+(пики, средние и прореженный ряд) уходит в индекс сессий и сравнивается с -Xmx.
+"""
+import ctypes
+import logging
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from typing import NamedTuple
+
+DEFAULT_INTERVAL = 2.0
+MAX_SAMPLES = 600
+# Сколько точек ряда сохраняется в индексе сессий
+SERIES_POINTS = 60
+MIB = 1024 * 1024
+
+_PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+_PROCESS_VM_READ = 0x0010
+
+
+class ResourceSample(NamedTuple):
+    timestamp: float
+    # Суммарное процессорное время (user + system), секунды
+    cpu_time: float
+    # Загрузка с прошлого замера в процентах одного ядра (200% — два ядра)
+    cpu_percent: float
+    rss: int
+    threads: int | None
+    read_bytes: int | None
+    write_bytes: int | None
+
+
+class _RawStats(NamedTuple):
+    cpu_time: float
+    rss: int
+    threads: int | None
+    read_bytes: int | None
+    write_bytes: int | None
+
+
+if sys.platform.startswith('linux'):
+    _CLK_TCK = os.sysconf('SC_CLK_TCK')
+    _PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+
+
+def _linux_stats(pid: int) -> _RawStats | None:
+    try:
+        with open(f'/proc/{pid}/stat', 'rb') as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # Поля после имени процесса: [0] — состояние, utime/stime — 14/15-е, потоки — 20-е, rss — 24-е
+    values = stat[stat.rfind(b')') + 2 :].split()
+    if values[0] in (b'Z', b'X'):
+        return None
+    read_bytes = write_bytes = None
+    try:
+        with open(f'/proc/{pid}/io', 'rb') as f:
+            for line in f:
+                key, _, value = line.partition(b':')
+                if key == b'read_bytes':
+                    read_bytes = int(value)
+                elif key == b'write_bytes':
+                    write_bytes = int(value)
+    except OSError:
+        # /proc/<pid>/io может быть закрыт настройками ядра
+        pass
+    return _RawStats(
+        cpu_time=(int(values[11]) + int(values[12])) / _CLK_TCK,
+        rss=int(values[21]) * _PAGE_SIZE,
+        threads=int(values[17]),
+        read_bytes=read_bytes,
+        write_bytes=write_bytes,
+    )
+
+
+class _ProcessMemoryCounters(ctypes.Structure):
+    _fields_ = [
+        ('cb', ctypes.c_ulong),
+        ('PageFaultCount', ctypes.c_ulong),
+        ('PeakWorkingSetSize', ctypes.c_size_t),
+        ('WorkingSetSize', ctypes.c_size_t),
+        ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+        ('QuotaPagedPoolUsage', ctypes.c_size_t),
+        ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+        ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+        ('PagefileUsage', ctypes.c_size_t),
+        ('PeakPagefileUsage', ctypes.c_size_t),
+    ]
+
+
+class _IoCounters(ctypes.Structure):
+    _fields_ = [
+        ('ReadOperationCount', ctypes.c_ulonglong),
+        ('WriteOperationCount', ctypes.c_ulonglong),
+        ('OtherOperationCount', ctypes.c_ulonglong),
+        ('ReadTransferCount', ctypes.c_ulonglong),
+        ('WriteTransferCount', ctypes.c_ulonglong),
+        ('OtherTransferCount', ctypes.c_ulonglong),
+    ]
+
+
+def _windows_stats(pid: int) -> _RawStats | None:
+    kernel32 = ctypes.windll.kernel32
+    handle = kernel32.OpenProcess(_PROCESS_QUERY_LIMITED_INFORMATION | _PROCESS_VM_READ, False, pid)
+    if not handle:
+        return None
+    try:
+        creation, exit_time, kernel, user = (ctypes.c_ulonglong() for _ in range(4))
+        if not kernel32.GetProcessTimes(
+            handle, ctypes.byref(creation), ctypes.byref(exit_time), ctypes.byref(kernel), ctypes.byref(user)
+        ):
+            return None
+        if exit_time.value:
+            return None
+        memory = _ProcessMemoryCounters()
+        memory.cb = ctypes.sizeof(memory)
+        ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(memory), memory.cb)
+        io = _IoCounters()
+        has_io = kernel32.GetProcessIoCounters(handle, ctypes.byref(io))
+        return _RawStats(
+            # FILETIME — в сотнях наносекунд
+            cpu_time=(kernel.value + user.value) / 1e7,
+            rss=memory.WorkingSetSize,
+            threads=None,
+            read_bytes=io.ReadTransferCount if has_io else None,
+            write_bytes=io.WriteTransferCount if has_io else None,
+        )
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+def _parse_cpu_time(value: str) -> float:
+    """[[ДД-]ЧЧ:]ММ:СС.сс из ps -o time"""
+    days, _, clock = value.rpartition('-')
+    seconds = 0.0
+    for part in clock.split(':'):
+        seconds = seconds * 60 + float(part)
+    return seconds + (int(days) * 86400 if days else 0)
+
+
+def _ps_stats(pid: int) -> _RawStats | None:
+    try:
+        result = subprocess.run(['ps', '-o', 'rss=,time=', '-p', str(pid)], capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    parts = result.stdout.split()
+    if len(parts) != 2:
+        return None
+    try:
+        return _RawStats(_parse_cpu_time(parts[1]), int(parts[0]) * 1024, None, None, None)
+    except ValueError:
+        return None
+
+
+def read_process_stats(pid: int) -> _RawStats | None:
+    """Текущие счётчики процесса или None, если процесса уже нет"""
+    if sys.platform.startswith('linux'):
+        return _linux_stats(pid)
+    if os.name == 'nt':
+        return _windows_stats(pid)
+    return _ps_stats(pid)
+
+
+class ProcessMonitor:
+    """Периодические замеры ресурсов одного процесса"""
+
+    def __init__(
+        self,
+        pid: int,
+        interval: float = DEFAULT_INTERVAL,
+        on_sample: Callable[[ResourceSample], None] | None = None,
+        max_samples: int = MAX_SAMPLES,
+    ) -> None:
+        self.pid = pid
+        self.interval = max(interval, 0.1)
+        self.on_sample = on_sample
+        self.samples: deque[ResourceSample] = deque(maxlen=max_samples)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.started = time.time()
+        # Накопительные значения за всю сессию: кольцевой буфер хранит только хвост
+        self.count = 0
+        self.peak_rss = 0
+        self.max_threads = 0
+        self._rss_sum = 0
+        self._first: ResourceSample | None = None
+        self._last: ResourceSample | None = None
+
+    def sample(self) -> ResourceSample | None:
+        stats = read_process_stats(self.pid)
+        if stats is None:
+            return None
+        now = time.time()
+        previous = self._last
+        cpu_percent = 0.0
+        if previous is not None and now > previous.timestamp:
+            cpu_percent = max(0.0, (stats.cpu_time - previous.cpu_time) / (now - previous.timestamp) * 100)
+        sample = ResourceSample(now, stats.cpu_time, cpu_percent, *stats[1:])
+        with self._lock:
+            self.samples.append(sample)
+            self.count += 1
+            self.peak_rss = max(self.peak_rss, sample.rss)
+            self.max_threads = max(self.max_threads, sample.threads or 0)
+            self._rss_sum += sample.rss
+            self._first = self._first or sample
+            self._last = sample
+        return sample
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                sample = self.sample()
+            except Exception:
+                logging.exception(f'[RESOURCES] Failed to sample process {self.pid}')
+                sample = None
+            if sample is None:
+                break
+            if self.on_sample is not None:
+                try:
+                    self.on_sample(sample)
+                except Exception:
+                    logging.exception('[RESOURCES] Sample delivery failed')
+            self._stop.wait(self.interval)
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, daemon=True, name=f'resource-monitor-{self.pid}')
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(self.interval + 1)
+
+    def series(self, points: int = SERIES_POINTS) -> list[list[float]]:
+        """Прореженный ряд [секунды от старта, RSS в МиБ, CPU %]"""
+        with self._lock:
+            samples = list(self.samples)
+        if not samples:
+            return []
+        step = max(1, -(-len(samples) // points))
+        picked = samples[::step]
+        if picked[-1] is not samples[-1]:
+            picked.append(samples[-1])
+        return [[round(s.timestamp - self.started, 1), round(s.rss / MIB, 1), round(s.cpu_percent, 1)] for s in picked]
+
+    def summary(self, memory_mb: int | None = None) -> dict | None:
+        """Итог сессии для индекса; доля пика RSS от -Xmx показывает нехватку памяти"""
+        with self._lock:
+            first, last, count = self._first, self._last, self.count
+            peak_rss, max_threads, rss_sum = self.peak_rss, self.max_threads, self._rss_sum
+        if last is None or first is None:
+            return None
+        elapsed = last.timestamp - first.timestamp
+        summary = {
+            'interval': self.interval,
+            'samples': count,
+            'peak_rss_mb': round(peak_rss / MIB, 1),
+            'avg_rss_mb': round(rss_sum / count / MIB, 1),
+            'avg_cpu_percent': round((last.cpu_time - first.cpu_time) / elapsed * 100, 1) if elapsed > 0 else 0.0,
+            'cpu_time': round(last.cpu_time, 1),
+            'max_threads': max_threads or None,
+            'read_mb': round(last.read_bytes / MIB, 1) if last.read_bytes is not None else None,
+            'write_mb': round(last.write_bytes / MIB, 1) if last.write_bytes is not None else None,
+            'series': self.series(),
+        }
+        if memory_mb:
+            # RSS включает metaspace, стеки и нативную память, поэтому может превышать -Xmx
+            summary['peak_rss_to_xmx'] = round(peak_rss / MIB / memory_mb, 2)
+        return summary
@@ -0,0 +1,198 @@
+"""
+Архив логов игровых сессий
+
+Вывод каждого запуска игры пишется в отдельный gzip-файл в
+MINECRAFT_DIR/logs/sessions, а индекс сессий (версия, загрузчик, время запуска,
+длительность, код выхода, сводка замеров ресурсов) лежит рядом в index.json, поэтому список запусков
+строится без чтения самих логов. Старые сессии удаляются по возрасту, числу и
+суммарному размеру архива.
+"""
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime
+from typing import IO
+
+from config import MINECRAFT_DIR
+
+SESSION_LOGS_DIR: str = os.path.join(MINECRAFT_DIR, 'logs', 'sessions')
+SESSION_INDEX_FORMAT = 1
+# Политика хранения
+MAX_TOTAL_SIZE = 256 * 1024 * 1024
+MAX_AGE_DAYS = 30
+MAX_SESSIONS = 200
+COMPRESS_LEVEL = 6
+
+
+@dataclass
+class GameSession:
+    id: str
+    file: str
+    version: str
+    loader: str
+    started: float
+    # None, пока игра запущена (или если лаунчер закрылся раньше игры)
+    duration: float | None = None
+    exit_code: int | None = None
+    size: int = 0
+    lines: int = 0
+    # -Xmx запуска и итог ResourceMonitor (пики, средние, прореженный ряд)
+    memory_mb: int | None = None
+    resources: dict | None = None
+
+    @property
+    def running(self) -> bool:
+        return self.duration is None
+
+
+class SessionLogArchive:
+    """Сжатые логи игровых сессий с индексом и ротацией"""
+
+    def __init__(
+        self,
+        directory: str = SESSION_LOGS_DIR,
+        max_total_size: int = MAX_TOTAL_SIZE,
+        max_age_days: float = MAX_AGE_DAYS,
+        max_sessions: int = MAX_SESSIONS,
+    ) -> None:
+        self.directory = directory
+        self.index_path = os.path.join(directory, 'index.json')
+        self.max_total_size = max_total_size
+        self.max_age_days = max_age_days
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._sessions: dict[str, GameSession] = self._load()
+
+    def _load(self) -> dict[str, GameSession]:
+        try:
+            with open(self.index_path, encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('format') != SESSION_INDEX_FORMAT:
+                return {}
+            known = {f.name for f in fields(GameSession)}
+            sessions = [GameSession(**{k: v for k, v in item.items() if k in known}) for item in data.get('sessions', [])]
+            return {session.id: session for session in sessions}
+        except (OSError, ValueError, TypeError, AttributeError):
+            return {}
+
+    def _save(self) -> None:
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f'{self.index_path}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(
+                    {'format': SESSION_INDEX_FORMAT, 'sessions': [asdict(s) for s in self._sessions.values()]},
+                    f,
+                    indent=4,
+                )
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            logging.warning(f'[SESSIONS] Не удалось сохранить индекс сессий: {e}')
+
+    def path(self, session: GameSession) -> str:
+        return os.path.join(self.directory, session.file)
+
+    def start(self, version: str, loader: str, memory_mb: int | None = None) -> tuple[GameSession, IO[bytes]]:
+        """Регистрирует сессию и открывает сжатый файл для её вывода"""
+        started = time.time()
+        session_id = datetime.fromtimestamp(started).strftime('%Y%m%d-%H%M%S-%f')
+        session = GameSession(
+            id=session_id,
+            file=f'{session_id}.log.gz',
+            version=version,
+            loader=loader,
+            started=started,
+            memory_mb=memory_mb,
+        )
+        os.makedirs(self.directory, exist_ok=True)
+        writer = gzip.open(self.path(session), 'wb', compresslevel=COMPRESS_LEVEL)
+        with self._lock:
+            self._sessions[session.id] = session
+            self.apply_retention()
+            self._save()
+        return session, writer
+
+    def finish(
+        self, session: GameSession, exit_code: int | None, lines: int = 0, resources: dict | None = None
+    ) -> None:
+        """Записывает итог сессии (файл вывода к этому моменту уже закрыт)"""
+        with self._lock:
+            session.duration = time.time() - session.started
+            session.exit_code = exit_code
+            session.lines = lines
+            session.resources = resources
+            try:
+                session.size = os.path.getsize(self.path(session))
+            except OSError:
+                session.size = 0
+            self._sessions[session.id] = session
+            self._save()
+        logging.info(
+            f'[SESSIONS] Сессия {session.id} завершена: код {exit_code}, '
+            f'{session.duration:.0f} с, {lines} строк, {session.size} байт'
+        )
+
+    def apply_retention(self) -> None:
+        """Удаляет сессии старше max_age_days, сверх max_sessions и сверх max_total_size"""
+        now = time.time()
+        ordered = sorted(self._sessions.values(), key=lambda s: s.started, reverse=True)
+        keep: list[GameSession] = []
+        total = 0
+        for session in ordered:
+            path = self.path(session)
+            if not os.path.isfile(path):
+                continue
+            size = session.size or os.path.getsize(path)
+            expired = now - session.started > self.max_age_days * 86400
+            over_limit = len(keep) >= self.max_sessions or total + size > self.max_total_size
+            # Идущие сессии не трогаем (незавершённая запись без изменений за сутки — брошенная)
+            active = session.running and now - os.path.getmtime(path) < 86400
+            if active or not (expired or over_limit):
+                keep.append(session)
+                total += size
+                continue
+            try:
+                os.remove(path)
+            except OSError as e:
+                logging.warning(f'[SESSIONS] Не удалось удалить {path}: {e}')
+                keep.append(session)
+        self._sessions = {session.id: session for session in reversed(keep)}
+
+    def list(self) -> list[GameSession]:
+        """Сессии, новые первыми"""
+        with self._lock:
+            return sorted(self._sessions.values(), key=lambda s: s.started, reverse=True)
+
+    def get(self, session_id: str) -> GameSession | None:
+        return self._sessions.get(session_id)
+
+    def open_text(self, session_id: str) -> IO[str]:
+        """Открывает лог сессии как текст (вывод незавершённой сессии может быть неполным)"""
+        session = self._sessions[session_id]
+        return gzip.open(self.path(session), 'rt', encoding='utf-8', errors='replace')
+
+    def read_lines(self, session_id: str) -> Iterator[str]:
+        try:
+            with self.open_text(session_id) as f:
+                for line in f:
+                    yield line.rstrip('\n')
+        except EOFError:
+            # Файл сессии, оборванной аварийно, заканчивается без gzip-трейлера
+            return
+
+
+# Глобальный экземпляр
+_session_logs: SessionLogArchive | None = None
+
+
+def get_session_logs() -> SessionLogArchive:
+    """Получить глобальный архив логов игровых сессий"""
+    global _session_logs
+    if _session_logs is None:
+        _session_logs = SessionLogArchive()
+    return _session_logs
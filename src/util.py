@@ -9,8 +9,6 @@ from typing import Any
 import requests
 
 from config import (
-    AUTHLIB_INJECTOR_URL,
-    AUTHLIB_JAR_PATH,
     MINECRAFT_DIR,
     SETTINGS_PATH,
     adjectives,
@@ -67,32 +65,12 @@ def generate_random_username():
 
 
 def download_authlib_injector():
-    """Скачивает последнюю версию authlib-injector с GitHub"""
+    """Проверяет authlib-injector и скачивает его только если файла нет или он повреждён"""
     try:
-        logging.info('Загрузка authlib-injector...')
-        response = requests.get(AUTHLIB_INJECTOR_URL)
-        response.raise_for_status()
-        data = response.json()
-        
-        # GitHub API возвращает массив assets, ищем JAR файл
-        download_url = None
-        for asset in data.get('assets', []):
-            if asset['name'].endswith('.jar'):
-                download_url = asset['browser_download_url']
-                break
-        
-        if not download_url:
-            raise ValueError('JAR файл не найден в релизе')
-
-        # Скачиваем JAR файл
-        jar_response = requests.get(download_url)
-        jar_response.raise_for_status()
-
-        os.makedirs(os.path.dirname(AUTHLIB_JAR_PATH), exist_ok=True)
-        with open(AUTHLIB_JAR_PATH, 'wb') as f:
-            f.write(jar_response.content)
+        from agent_artifacts import get_agent_artifacts
 
-        logging.info(f'authlib-injector загружен: {AUTHLIB_JAR_PATH}')
+        path = get_agent_artifacts().ensure('authlib-injector')
+        logging.info(f'authlib-injector готов: {path}')
         return True
     except Exception as e:
         logging.error(f'Ошибка загрузки Authlib Injector: {e}')
@@ -0,0 +1,530 @@
+"""
+Параллельная установка версий Minecraft
+
+Сам разбирает JSON версии и индекс ассетов, после чего качает клиент, библиотеки,
+natives и объекты ассетов через общий пул потоков с keep-alive соединениями.
+SHA1 считается прямо во время загрузки, уже скачанные и корректные файлы пропускаются.
+"""
+import hashlib
+import json
+import logging
+import os
+import platform
+import re
+import shutil
+import threading
+import time
+import zipfile
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any
+from uuid import uuid4
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from version import VERSION
+
+VERSION_MANIFEST_URL = 'https://launchermeta.mojang.com/mc/game/version_manifest_v2.json'
+LIBRARIES_URL = 'https://libraries.minecraft.net'
+RESOURCES_URL = 'https://resources.download.minecraft.net'
+USER_AGENT = f'16Launcher/{VERSION}'
+DEFAULT_WORKERS = 16
+CHUNK_SIZE = 1024 * 64
+
+Callback = dict[str, Callable[..., Any]]
+
+
+class DownloadError(RuntimeError):
+    pass
+
+
+@dataclass
+class DownloadItem:
+    url: str
+    path: str
+    sha1: str | None = None
+    size: int | None = None
+    kind: str = 'file'
+
+
+@dataclass
+class DownloadReport:
+    downloaded: list[DownloadItem] = field(default_factory=list)
+    skipped: list[DownloadItem] = field(default_factory=list)
+    failed: list[tuple[DownloadItem, str]] = field(default_factory=list)
+    bytes_downloaded: int = 0
+
+    def raise_for_failures(self) -> None:
+        if self.failed:
+            item, error = self.failed[0]
+            raise DownloadError(f'{len(self.failed)} file(s) failed to download, first: {item.url}: {error}')
+
+
+@dataclass
+class NativesExtract:
+    path: str
+    target_dir: str
+    exclude: list[str] = field(default_factory=list)
+
+
+@dataclass
+class VersionFiles:
+    version_id: str
+    data: dict
+    items: list[DownloadItem] = field(default_factory=list)
+    natives: list[NativesExtract] = field(default_factory=list)
+
+
+def sha1_of_file(path: str) -> str:
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def is_file_valid(item: DownloadItem, check_hash: bool = True) -> bool:
+    """Проверяет, что файл уже скачан и совпадает по размеру/SHA1"""
+    try:
+        size = os.path.getsize(item.path)
+    except OSError:
+        return False
+    if item.size is not None and size != item.size:
+        return False
+    if item.sha1 and check_hash:
+        return sha1_of_file(item.path) == item.sha1
+    return size > 0 or item.size == 0
+
+
+class Downloader:
+    """Пул загрузки файлов с keep-alive сессией на каждый поток"""
+
+    def __init__(self, max_workers: int = DEFAULT_WORKERS, callback: Callback | None = None, retries: int = 2) -> None:
+        self.max_workers = max(1, max_workers)
+        self.callback = callback or {}
+        self.retries = retries
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.max_workers)
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.headers['User-Agent'] = USER_AGENT
+            self._local.session = session
+        return session
+
+    def fetch(self, item: DownloadItem, check_existing: bool = True) -> int:
+        """Скачивает один файл с проверкой SHA1 на лету; возвращает число байт (0 — файл пропущен)"""
+        if check_existing and is_file_valid(item):
+            return 0
+
+        os.makedirs(os.path.dirname(item.path), exist_ok=True)
+        last_error: Exception | None = None
+        for attempt in range(self.retries + 1):
+            # Свой временный файл у каждой загрузки: тот же файл могут одновременно качать
+            # параллельные запуски, установка загрузчика или CLI
+            tmp_path = f'{item.path}.{uuid4().hex[:12]}.part'
+            try:
+                h = hashlib.sha1()
+                written = 0
+                with self._session().get(item.url, stream=True, timeout=30) as r:
+                    r.raise_for_status()
+                    with open(tmp_path, 'xb') as f:
+                        for chunk in r.iter_content(chunk_size=CHUNK_SIZE):
+                            if not chunk:
+                                continue
+                            f.write(chunk)
+                            h.update(chunk)
+                            written += len(chunk)
+                if item.sha1 and h.hexdigest() != item.sha1:
+                    raise DownloadError(f'checksum mismatch: expected {item.sha1}, got {h.hexdigest()}')
+                if item.size is not None and written != item.size:
+                    raise DownloadError(f'size mismatch: expected {item.size}, got {written}')
+                os.replace(tmp_path, item.path)
+                return written
+            except Exception as e:
+                last_error = e
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                if attempt < self.retries:
+                    time.sleep(0.5 * (attempt + 1))
+        raise DownloadError(str(last_error))
+
+    def download_all(self, items: Iterable[DownloadItem], status: str = 'Download files', check_existing: bool = True) -> DownloadReport:
+        """Качает файлы параллельно; одинаковые пути скачиваются один раз"""
+        unique: dict[str, DownloadItem] = {}
+        for item in items:
+            unique.setdefault(os.path.normcase(os.path.abspath(item.path)), item)
+        queue = list(unique.values())
+
+        report = DownloadReport()
+        total = len(queue)
+        self.callback.get('setStatus', _empty)(status)
+        self.callback.get('setMax', _empty)(max(total, 1))
+        if not queue:
+            return report
+
+        done = 0
+        last_report = 0.0
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, total)) as executor:
+            futures = {executor.submit(self.fetch, item, check_existing): item for item in queue}
+            for future in as_completed(futures):
+                item = futures[future]
+                try:
+                    written = future.result()
+                    if written:
+                        report.downloaded.append(item)
+                        report.bytes_downloaded += written
+                    else:
+                        report.skipped.append(item)
+                except Exception as e:
+                    report.failed.append((item, str(e)))
+                    logging.warning(f'[INSTALLER] Не удалось скачать {item.url}: {e}')
+                done += 1
+                # Не заваливаем UI событиями на каждый из тысяч мелких файлов
+                now = time.monotonic()
+                if done == total or now - last_report >= 0.1:
+                    last_report = now
+                    self.callback.get('setProgress', _empty)(done)
+        return report
+
+
+def _empty(*_args: Any) -> None:
+    pass
+
+
+def _os_name() -> str:
+    return {'Windows': 'windows', 'Darwin': 'osx'}.get(platform.system(), 'linux')
+
+
+def _arch_bits() -> str:
+    return '32' if platform.architecture()[0] == '32bit' else '64'
+
+
+def rules_allow(rules: list[dict] | None) -> bool:
+    """Упрощённая проверка правил библиотек из JSON версии (os/arch)"""
+    if not rules:
+        return True
+    allowed = False
+    for rule in rules:
+        if rule.get('features'):
+            # Фичи (демо, кастомное разрешение) к библиотекам не относятся
+            continue
+        os_rule = rule.get('os', {})
+        matches = True
+        if 'name' in os_rule and os_rule['name'] != _os_name():
+            matches = False
+        if 'arch' in os_rule and os_rule['arch'] == 'x86' and _arch_bits() != '32':
+            matches = False
+        if 'version' in os_rule:
+            try:
+                if not re.match(os_rule['version'], platform.release()):
+                    matches = False
+            except re.error:
+                pass
+        if matches:
+            allowed = rule.get('action') == 'allow'
+    return allowed
+
+
+def library_path(name: str, minecraft_dir: str, classifier: str | None = None) -> str:
+    """Путь к библиотеке по maven-имени group:artifact:version[:classifier][@ext]"""
+    parts = name.split(':')
+    group, artifact, version = parts[0:3]
+    ext = 'jar'
+    if '@' in version:
+        version, ext = version.split('@', 1)
+    extra = parts[3:]
+    if extra and '@' in extra[-1]:
+        extra[-1], ext = extra[-1].split('@', 1)
+    if classifier:
+        extra = [*extra, classifier]
+    filename = f'{artifact}-{version}{"".join(f"-{p}" for p in extra)}.{ext}'
+    return os.path.join(minecraft_dir, 'libraries', *group.split('.'), artifact, version, filename)
+
+
+def _library_relpath(path: str, minecraft_dir: str) -> str:
+    return os.path.relpath(path, os.path.join(minecraft_dir, 'libraries')).replace(os.sep, '/')
+
+
+def _natives_classifier(lib: dict) -> str:
+    natives = lib.get('natives') or {}
+    classifier = natives.get(_os_name(), '')
+    return classifier.replace('${arch}', _arch_bits())
+
+
+def fetch_version_manifest() -> dict:
+    r = requests.get(VERSION_MANIFEST_URL, headers={'User-Agent': USER_AGENT}, timeout=20)
+    r.raise_for_status()
+    return r.json()
+
+
+def ensure_version_json(version_id: str, minecraft_dir: str, downloader: Downloader | None = None) -> dict:
+    """Возвращает JSON версии, при необходимости скачивая его из манифеста Mojang"""
+    path = os.path.join(minecraft_dir, 'versions', version_id, f'{version_id}.json')
+    if not os.path.isfile(path):
+        for entry in fetch_version_manifest().get('versions', []):
+            if entry.get('id') == version_id:
+                (downloader or Downloader()).fetch(DownloadItem(entry['url'], path, entry.get('sha1'), kind='version_json'))
+                break
+        else:
+            raise DownloadError(f'Version {version_id} not found')
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _lib_key(lib: dict) -> str:
+    return ':'.join(lib.get('name', '').split(':')[:-1])
+
+
+def merge_inherited(child: dict, parent: dict) -> dict:
+    """Склеивает JSON профиля модлоадера с JSON базовой версии (inheritsFrom)"""
+    merged = dict(parent)
+    child_keys = {_lib_key(lib) for lib in child.get('libraries', [])}
+    merged['libraries'] = list(child.get('libraries', [])) + [
+        lib for lib in parent.get('libraries', []) if _lib_key(lib) not in child_keys
+    ]
+    for key, value in child.items():
+        if key == 'libraries':
+            continue
+        if isinstance(value, list) and isinstance(parent.get(key), list):
+            merged[key] = value + parent[key]
+        elif isinstance(value, dict) and isinstance(parent.get(key), dict):
+            combined = dict(parent[key])
+            for sub_key, sub_value in value.items():
+                if isinstance(sub_value, list) and isinstance(combined.get(sub_key), list):
+                    combined[sub_key] = combined[sub_key] + sub_value
+                else:
+                    combined[sub_key] = sub_value
+            merged[key] = combined
+        else:
+            merged[key] = value
+    return merged
+
+
+def resolve_version_chain(version_id: str, minecraft_dir: str, downloader: Downloader | None = None) -> list[dict]:
+    """Загружает JSON версии и все JSON из цепочки inheritsFrom (от дочернего к базовому)"""
+    chain = [ensure_version_json(version_id, minecraft_dir, downloader)]
+    while chain[-1].get('inheritsFrom') and len(chain) < 16:
+        chain.append(ensure_version_json(chain[-1]['inheritsFrom'], minecraft_dir, downloader))
+    return chain
+
+
+def merge_version_chain(chain: list[dict]) -> dict:
+    data = chain[-1]
+    for child in reversed(chain[:-1]):
+        child = dict(child)
+        child.pop('inheritsFrom', None)
+        data = merge_inherited(child, data)
+    return data
+
+
+def resolve_version_data(version_id: str, minecraft_dir: str, downloader: Downloader | None = None) -> dict:
+    """Загружает JSON версии со всей цепочкой inheritsFrom и склеивает их"""
+    return merge_version_chain(resolve_version_chain(version_id, minecraft_dir, downloader))
+
+
+def library_items(libraries: list[dict], version_id: str, minecraft_dir: str) -> tuple[list[DownloadItem], list[NativesExtract]]:
+    """Список файлов библиотек (включая natives) для текущей платформы"""
+    items: list[DownloadItem] = []
+    natives: list[NativesExtract] = []
+    natives_dir = os.path.join(minecraft_dir, 'versions', version_id, 'natives')
+
+    for lib in libraries:
+        if not rules_allow(lib.get('rules')) or not lib.get('name'):
+            continue
+        downloads = lib.get('downloads') or {}
+        artifact = downloads.get('artifact')
+        if artifact and artifact.get('url') and artifact.get('path'):
+            items.append(
+                DownloadItem(
+                    artifact['url'],
+                    os.path.join(minecraft_dir, 'libraries', artifact['path']),
+                    artifact.get('sha1'),
+                    artifact.get('size'),
+                    'library',
+                )
+            )
+        elif not downloads:
+            # Fabric/Quilt/старый Forge: только maven-имя и базовый URL репозитория
+            path = library_path(lib['name'], minecraft_dir)
+            base_url = (lib.get('url') or LIBRARIES_URL).rstrip('/')
+            items.append(
+                DownloadItem(
+                    f'{base_url}/{_library_relpath(path, minecraft_dir)}',
+                    path,
+                    lib.get('sha1'),
+                    lib.get('size'),
+                    'library',
+                )
+            )
+
+        classifier = _natives_classifier(lib)
+        if not classifier:
+            continue
+        native = (downloads.get('classifiers') or {}).get(classifier)
+        if native and native.get('url'):
+            path = os.path.join(minecraft_dir, 'libraries', native['path']) if native.get('path') else library_path(
+                lib['name'], minecraft_dir, classifier
+            )
+            items.append(DownloadItem(native['url'], path, native.get('sha1'), native.get('size'), 'native'))
+        else:
+            path = library_path(lib['name'], minecraft_dir, classifier)
+            base_url = (lib.get('url') or LIBRARIES_URL).rstrip('/')
+            items.append(DownloadItem(f'{base_url}/{_library_relpath(path, minecraft_dir)}', path, None, None, 'native'))
+        natives.append(NativesExtract(path, natives_dir, (lib.get('extract') or {}).get('exclude', [])))
+    return items, natives
+
+
+def asset_items(data: dict, minecraft_dir: str, downloader: Downloader) -> list[DownloadItem]:
+    """Скачивает индекс ассетов (если нужно) и возвращает список объектов"""
+    index = data.get('assetIndex')
+    if not index:
+        return []
+    index_item = DownloadItem(
+        index['url'],
+        os.path.join(minecraft_dir, 'assets', 'indexes', f'{data.get("assets", index["id"])}.json'),
+        index.get('sha1'),
+        index.get('size'),
+        'asset_index',
+    )
+    downloader.fetch(index_item)
+    with open(index_item.path, encoding='utf-8') as f:
+        objects = json.load(f).get('objects', {})
+
+    items: dict[str, DownloadItem] = {}
+    for obj in objects.values():
+        file_hash = obj['hash']
+        if file_hash in items:
+            continue
+        items[file_hash] = DownloadItem(
+            f'{RESOURCES_URL}/{file_hash[:2]}/{file_hash}',
+            os.path.join(minecraft_dir, 'assets', 'objects', file_hash[:2], file_hash),
+            file_hash,
+            obj.get('size'),
+            'asset',
+        )
+    return list(items.values())
+
+
+def collect_version_files(version_id: str, minecraft_dir: str, downloader: Downloader | None = None) -> VersionFiles:
+    """Собирает полный список файлов, на которые ссылается версия"""
+    downloader = downloader or Downloader()
+    chain = resolve_version_chain(version_id, minecraft_dir, downloader)
+    data = merge_version_chain(chain)
+    result = VersionFiles(version_id=version_id, data=data)
+
+    # Клиент кладётся и в папку базовой версии (нужен процессорам Forge), и в папку профиля
+    client = (data.get('downloads') or {}).get('client')
+    jar_ids = [data.get('jar') or version_id] + [entry['id'] for entry in chain[1:] if entry.get('id')]
+    if client:
+        for jar_id in dict.fromkeys(jar_ids):
+            result.items.append(
+                DownloadItem(
+                    client['url'],
+                    os.path.join(minecraft_dir, 'versions', jar_id, f'{jar_id}.jar'),
+                    client.get('sha1'),
+                    client.get('size'),
+                    'client',
+                )
+            )
+
+    libs, natives = library_items(data.get('libraries', []), version_id, minecraft_dir)
+    result.items.extend(libs)
+    result.natives = natives
+
+    log_file = ((data.get('logging') or {}).get('client') or {}).get('file')
+    if log_file:
+        result.items.append(
+            DownloadItem(
+                log_file['url'],
+                os.path.join(minecraft_dir, 'assets', 'log_configs', log_file['id']),
+                log_file.get('sha1'),
+                log_file.get('size'),
+                'log_config',
+            )
+        )
+
+    result.items.extend(asset_items(data, minecraft_dir, downloader))
+    return result
+
+
+def extract_natives(natives: list[NativesExtract]) -> None:
+    for entry in natives:
+        if not os.path.isfile(entry.path):
+            continue
+        os.makedirs(entry.target_dir, exist_ok=True)
+        with zipfile.ZipFile(entry.path) as zf:
+            for name in zf.namelist():
+                if any(name.startswith(prefix) for prefix in entry.exclude):
+                    continue
+                zf.extract(name, entry.target_dir)
+
+
+def copy_parent_jar(version_id: str, data: dict, minecraft_dir: str) -> None:
+    """Старым профилям Forge без собственного клиента нужен jar базовой версии"""
+    jar_path = os.path.join(minecraft_dir, 'versions', version_id, f'{version_id}.jar')
+    parent = data.get('inheritsFrom')
+    if not os.path.isfile(jar_path) and parent:
+        parent_jar = os.path.join(minecraft_dir, 'versions', parent, f'{parent}.jar')
+        if os.path.isfile(parent_jar):
+            shutil.copyfile(parent_jar, jar_path)
+
+
+def install_version(
+    version_id: str,
+    minecraft_dir: str,
+    callback: Callback | None = None,
+    max_workers: int = DEFAULT_WORKERS,
+    install_runtime: bool = True,
+    extra_items: Iterable[DownloadItem] = (),
+) -> DownloadReport:
+    """Устанавливает версию Minecraft (или профиль модлоадера поверх неё)
+
+    extra_items — дополнительные файлы, которые нужно скачать/проверить в том же пакете
+    (например, библиотеки процессоров из install_profile.json Forge).
+    """
+    callback = callback or {}
+    downloader = Downloader(max_workers=max_workers, callback=callback)
+    started = time.monotonic()
+
+    callback.get('setStatus', _empty)('Чтение данных версии')
+    files = collect_version_files(version_id, minecraft_dir, downloader)
+    report = downloader.download_all([*files.items, *extra_items], status='Загрузка файлов версии')
+    report.raise_for_failures()
+
+    callback.get('setStatus', _empty)('Распаковка natives')
+    extract_natives(files.natives)
+
+    copy_parent_jar(version_id, files.data, minecraft_dir)
+
+    # Старые версии без javaVersion запускаются установленной Java — рантайм им не ставим
+    java_version = files.data.get('javaVersion') or {}
+    if install_runtime and java_version.get('component'):
+        callback.get('setStatus', _empty)('Установка Java')
+        from java_runtime import DEFAULT_MAJOR, get_runtime_manager
+
+        # Без рантайма версия всё равно установлена: Java можно выбрать в настройках или поставить при запуске
+        try:
+            get_runtime_manager().ensure(
+                java_version['component'],
+                int(java_version.get('majorVersion') or DEFAULT_MAJOR),
+                callback=callback,
+            )
+        except Exception as e:
+            logging.warning(f'[INSTALLER] Не удалось установить Java для {version_id}: {e}')
+
+    elapsed = time.monotonic() - started
+    logging.info(
+        f'[INSTALLER] {version_id}: скачано {len(report.downloaded)} файлов '
+        f'({report.bytes_downloaded / 1024 / 1024:.1f} МБ), пропущено {len(report.skipped)}, за {elapsed:.1f} с'
+    )
+    callback.get('setStatus', _empty)('Установка завершена')
+    return report
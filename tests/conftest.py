@@ -0,0 +1,8 @@
+import os
+import sys
+import tempfile
+
+# Модули лаунчера импортируются как плоские (from config import ...), а config при
+# импорте вычисляет MINECRAFT_DIR от домашней папки — подменяем её на временную
+os.environ['HOME'] = tempfile.mkdtemp(prefix='16launcher-tests-')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
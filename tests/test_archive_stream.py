@@ -0,0 +1,127 @@
+import hashlib
+import io
+import os
+import tarfile
+import tempfile
+import unittest
+import zipfile
+
+from archive_stream import ArchiveError, HttpRangeFile, _extract_zip, _strip_root, stream_extract_tar_gz
+
+
+class _RangeResponse:
+    def __init__(self, status_code: int, content: bytes = b'') -> None:
+        self.status_code = status_code
+        self.content = content
+
+
+class _RangeSession:
+    """Сервер с поддержкой Range: отдаёт участки data и считает запросы"""
+
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.ranges: list[tuple[int, int]] = []
+
+    def get(self, url: str, headers: dict, timeout: float) -> _RangeResponse:
+        start, end = map(int, headers['Range'].removeprefix('bytes=').split('-'))
+        self.ranges.append((start, end))
+        return _RangeResponse(206, self.data[start : end + 1])
+
+
+class _Response:
+    def __init__(self, data: bytes) -> None:
+        self.raw = io.BytesIO(data)
+        self.headers = {'Content-Length': str(len(data))}
+
+
+def _zip_bytes(files: dict[str, bytes]) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as zf:
+        for name, data in files.items():
+            zf.writestr(name, data)
+    return buffer.getvalue()
+
+
+class HttpRangeFileTest(unittest.TestCase):
+    def test_reads_and_seeks(self):
+        data = bytes(range(256)) * 100
+        remote = HttpRangeFile(_RangeSession(data), 'http://x', len(data), block_size=1000)
+        self.assertEqual(remote.read(10), data[:10])
+        remote.seek(-5, io.SEEK_END)
+        self.assertEqual(remote.read(), data[-5:])
+        remote.seek(995)
+        # Чтение через границу блока
+        self.assertEqual(remote.read(10), data[995:1005])
+        self.assertEqual(remote.hexdigest(), hashlib.sha256(data).hexdigest())
+
+    def test_zip_is_downloaded_about_once(self):
+        files = {f'jdk/lib/file{i}.bin': os.urandom(30_000 + i * 777) for i in range(40)}
+        data = _zip_bytes(files)
+        session = _RangeSession(data)
+        block_size = 64 * 1024
+        remote = HttpRangeFile(session, 'http://x', len(data), block_size=block_size)
+        with tempfile.TemporaryDirectory() as tmp, zipfile.ZipFile(remote) as zf:
+            _extract_zip(zf, tmp, None, len(data))
+            with open(os.path.join(tmp, 'lib', 'file7.bin'), 'rb') as f:
+                self.assertEqual(f.read(), files['jdk/lib/file7.bin'])
+        self.assertEqual(remote.hexdigest(), hashlib.sha256(data).hexdigest())
+        # Кроме центрального каталога в конце, каждый байт запрашивается один раз
+        self.assertLessEqual(remote.bytes_fetched, len(data) + block_size)
+        blocks = -(-len(data) // block_size)
+        self.assertLessEqual(remote.requests_made, blocks + 3)
+
+    def test_range_not_supported(self):
+        class _NoRange(_RangeSession):
+            def get(self, url, headers, timeout):
+                return _RangeResponse(200, self.data)
+
+        remote = HttpRangeFile(_NoRange(b'abc'), 'http://x', 3)
+        with self.assertRaises(ArchiveError):
+            remote.read(1)
+
+
+class TarGzTest(unittest.TestCase):
+    def _tar_gz(self, members: list[tuple[str, bytes | None, str | None]]) -> bytes:
+        buffer = io.BytesIO()
+        with tarfile.open(fileobj=buffer, mode='w:gz') as tf:
+            for name, data, link in members:
+                info = tarfile.TarInfo(name)
+                if link is not None:
+                    info.type = tarfile.SYMTYPE
+                    info.linkname = link
+                    tf.addfile(info)
+                else:
+                    info.size = len(data)
+                    tf.addfile(info, io.BytesIO(data))
+        return buffer.getvalue()
+
+    def test_strip_root(self):
+        self.assertEqual(_strip_root('jdk-17/bin/java'), 'bin/java')
+        self.assertEqual(_strip_root('./jdk-17/./bin/java'), 'bin/java')
+        self.assertIsNone(_strip_root('jdk-17'))
+        self.assertIsNone(_strip_root('jdk-17/../evil'))
+        self.assertIsNone(_strip_root('jdk-17/bin/../../evil'))
+
+    def test_extract_rejects_escapes(self):
+        data = self._tar_gz(
+            [
+                ('jdk/bin/java', b'java', None),
+                ('jdk/../evil.txt', b'evil', None),
+                ('jdk/lib/../../evil2.txt', b'evil', None),
+                ('jdk/lib/outside', None, '/etc/passwd'),
+            ]
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            target = os.path.join(tmp, 'runtime')
+            stream_extract_tar_gz(_Response(data), target, hashlib.sha256(data).hexdigest())
+            with open(os.path.join(target, 'bin', 'java'), 'rb') as f:
+                self.assertEqual(f.read(), b'java')
+            self.assertFalse(os.path.exists(os.path.join(tmp, 'evil.txt')))
+            self.assertFalse(os.path.exists(os.path.join(target, 'evil.txt')))
+            self.assertFalse(os.path.exists(os.path.join(target, 'evil2.txt')))
+            self.assertFalse(os.path.lexists(os.path.join(target, 'lib', 'outside')))
+
+    def test_sha256_mismatch(self):
+        data = self._tar_gz([('jdk/bin/java', b'java', None)])
+        with tempfile.TemporaryDirectory() as tmp, self.assertRaises(ArchiveError):
+            stream_extract_tar_gz(_Response(data), tmp, '0' * 64)
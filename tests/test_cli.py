@@ -0,0 +1,27 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import cli
+from provision import Provisioner, ProvisionReport
+
+
+class ProvisionCommandTest(unittest.TestCase):
+    def test_report_goes_to_stdout(self):
+        report = ProvisionReport(planned=2, downloaded=1, failed=['loader quilt: boom'])
+        stdout = io.StringIO()
+        with (
+            tempfile.TemporaryDirectory() as tmp,
+            mock.patch.object(Provisioner, 'run', return_value=report),
+            contextlib.redirect_stdout(stdout),
+            contextlib.redirect_stderr(io.StringIO()),
+        ):
+            path = os.path.join(tmp, 'manifest.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({'versions': ['1.20.1']}, f)
+            self.assertEqual(cli.main(['provision', path]), 1)
+        self.assertEqual(stdout.getvalue().splitlines(), ['FAILED loader quilt: boom', report.describe()])
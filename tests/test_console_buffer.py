@@ -0,0 +1,68 @@
+import unittest
+
+from console_buffer import LEVEL_ERROR, LEVEL_INFO, LEVEL_LAUNCH, LEVEL_PROCESS, LEVEL_SUCCESS, LEVEL_WARN, ConsoleBuffer, classify
+
+
+def _texts(buffer: ConsoleBuffer) -> list[str]:
+    return [buffer[i].text for i in range(len(buffer))]
+
+
+class ConsoleBufferTest(unittest.TestCase):
+    def test_wraparound(self):
+        buffer = ConsoleBuffer(4)
+        buffer.extend(ConsoleBuffer.make_records(['a', 'b', 'c']))
+        buffer.extend(ConsoleBuffer.make_records(['d', 'e', 'f']))
+        self.assertEqual(_texts(buffer), ['c', 'd', 'e', 'f'])
+        self.assertEqual(buffer.first_seq, 2)
+        self.assertEqual(buffer.next_seq, 6)
+        self.assertEqual(buffer[-1].text, 'f')
+        with self.assertRaises(IndexError):
+            buffer[4]
+
+    def test_batch_larger_than_capacity(self):
+        buffer = ConsoleBuffer(3)
+        buffer.extend(ConsoleBuffer.make_records(['a']))
+        buffer.extend(ConsoleBuffer.make_records([str(i) for i in range(10)]))
+        self.assertEqual(_texts(buffer), ['7', '8', '9'])
+        self.assertEqual(buffer.first_seq, 8)
+        self.assertEqual(buffer.get_seq(8).text, '7')
+
+    def test_get_seq(self):
+        buffer = ConsoleBuffer(3)
+        buffer.extend(ConsoleBuffer.make_records(['a', 'b', 'c', 'd']))
+        self.assertIsNone(buffer.get_seq(0))
+        self.assertEqual(buffer.get_seq(1).text, 'b')
+        self.assertEqual(buffer.get_seq(3).text, 'd')
+        self.assertIsNone(buffer.get_seq(4))
+
+    def test_overflow_and_drop_front(self):
+        buffer = ConsoleBuffer(4)
+        buffer.extend(ConsoleBuffer.make_records(['a', 'b', 'c']))
+        self.assertEqual(buffer.overflow(1), 0)
+        self.assertEqual(buffer.overflow(3), 2)
+        self.assertEqual(buffer.overflow(10), 3)
+        buffer.drop_front(2)
+        self.assertEqual(_texts(buffer), ['c'])
+        self.assertEqual(buffer.first_seq, 2)
+
+    def test_clear_keeps_sequence(self):
+        buffer = ConsoleBuffer(4)
+        buffer.extend(ConsoleBuffer.make_records(['a', 'b']))
+        buffer.clear()
+        self.assertEqual(len(buffer), 0)
+        buffer.extend(ConsoleBuffer.make_records(['c']))
+        self.assertEqual(buffer.get_seq(2).text, 'c')
+
+    def test_levels(self):
+        self.assertEqual(classify('[main/ERROR]: boom'), LEVEL_ERROR)
+        self.assertEqual(classify('[Render thread/WARN] x'), LEVEL_WARN)
+        self.assertEqual(classify('Installation completed'), LEVEL_SUCCESS)
+        self.assertEqual(classify('[INSTALL] libraries'), LEVEL_PROCESS)
+        self.assertEqual(classify('[LAUNCH] java'), LEVEL_LAUNCH)
+        self.assertEqual(classify('plain'), LEVEL_INFO)
+        # Первая метка в строке решает уровень
+        self.assertEqual(classify('WARN before ERROR'), LEVEL_WARN)
+
+    def test_explicit_level(self):
+        records = ConsoleBuffer.make_records(['ERROR text'], timestamp=1.0, level=LEVEL_PROCESS)
+        self.assertEqual((records[0].timestamp, records[0].level), (1.0, LEVEL_PROCESS))
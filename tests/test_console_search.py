@@ -0,0 +1,119 @@
+import unittest
+
+from console_buffer import LEVEL_ERROR, LEVEL_INFO, LEVEL_WARN, ConsoleBuffer, LogRecord
+from console_search import BLOCK_LINES, LogIndex, SearchQuery
+
+
+def _records(texts: list[str]) -> list[LogRecord]:
+    return ConsoleBuffer.make_records(texts, timestamp=0.0)
+
+
+def _filled(texts: list[str], capacity: int = 10_000) -> tuple[ConsoleBuffer, LogIndex]:
+    buffer = ConsoleBuffer(capacity)
+    index = LogIndex(buffer)
+    records = _records(texts)
+    first_seq = buffer.next_seq
+    buffer.extend(records)
+    index.add(first_seq, records)
+    return buffer, index
+
+
+class SearchQueryTest(unittest.TestCase):
+    def test_parse_tag(self):
+        query = SearchQuery.parse('tag:"Render thread/WARN" texture', levels=[LEVEL_WARN])
+        self.assertEqual(query.text, 'texture')
+        self.assertEqual(query.tag, 'render thread/warn')
+        self.assertEqual(query.levels, frozenset({LEVEL_WARN}))
+        self.assertEqual(SearchQuery.parse('tag:INSTALL').tag, 'install')
+
+    def test_refines(self):
+        self.assertTrue(SearchQuery('textures').refines(SearchQuery('text')))
+        self.assertFalse(SearchQuery('text').refines(SearchQuery('textures')))
+        self.assertFalse(SearchQuery('textures', regex=True).refines(SearchQuery('text', regex=True)))
+        self.assertFalse(SearchQuery('textures', levels=frozenset({LEVEL_ERROR})).refines(SearchQuery('text')))
+        self.assertTrue(SearchQuery('text', since_seq=5).refines(SearchQuery('text', since_seq=2)))
+
+
+class LogIndexTest(unittest.TestCase):
+    def setUp(self):
+        # Несколько полных блоков и неполный хвост, чтобы проверялись обе ветки поиска
+        self.texts = [f'line {i} chunk' for i in range(BLOCK_LINES * 3 + 10)]
+        self.texts[5] = '[Render thread/WARN]: missing texture stone'
+        self.texts[BLOCK_LINES + 7] = 'ERROR: missing texture dirt'
+        self.texts[-2] = '[INSTALL] missing textures in tail'
+        self.buffer, self.index = _filled(self.texts)
+
+    def brute(self, query: SearchQuery) -> list[int]:
+        accepts = query.accepter()
+        start = max(self.buffer.first_seq, query.since_seq)
+        return [seq for seq in range(start, self.buffer.next_seq) if accepts(self.buffer.get_seq(seq))]
+
+    def test_matches_brute_force(self):
+        for query in (
+            SearchQuery('missing'),
+            SearchQuery('texture'),
+            SearchQuery('TEXTURE STONE'),
+            SearchQuery(levels=frozenset({LEVEL_ERROR})),
+            SearchQuery('missing', levels=frozenset({LEVEL_INFO})),
+            SearchQuery(tag='render thread/warn'),
+            SearchQuery(tag='install'),
+            SearchQuery(r'line \d+5 ', regex=True),
+            SearchQuery('missing', since_seq=BLOCK_LINES),
+        ):
+            with self.subTest(query=query):
+                self.assertEqual(self.index.search(query), self.brute(query))
+
+    def test_refinement_sees_new_lines(self):
+        self.assertEqual(len(self.index.search(SearchQuery('textur'))), 3)
+        records = _records(['late texture line'])
+        first_seq = self.buffer.next_seq
+        self.buffer.extend(records)
+        self.index.add(first_seq, records)
+        refined = SearchQuery('texture')
+        self.assertEqual(self.index.search(refined), self.brute(refined))
+        self.assertEqual(self.index.search(refined)[-1], first_seq)
+
+    def test_evicted_lines_are_skipped(self):
+        buffer, index = _filled(['needle'] * (BLOCK_LINES * 2), capacity=BLOCK_LINES)
+        found = index.search(SearchQuery('needle'))
+        self.assertEqual(found, list(range(buffer.first_seq, buffer.next_seq)))
+        index.prune()
+        self.assertEqual(index.search(SearchQuery('needl')), found)
+
+    def test_matches_live(self):
+        query = SearchQuery('texture', since_seq=11)
+        records = _records(['texture a', 'nothing', 'texture b'])
+        self.assertEqual(self.index.matches(query, 10, records), [12])
+
+
+class ConsoleModelTest(unittest.TestCase):
+    def test_filtered_rows_map_to_records(self):
+        from gui.widgets.console_widget import ConsoleModel
+
+        model = ConsoleModel(capacity=100)
+        model.append_records(_records(['alpha', 'beta', 'alpha 2', 'gamma']))
+        model.set_filter(SearchQuery('alpha'))
+        self.assertEqual(model.rowCount(), 2)
+        # Строка представления в режиме фильтра — не индекс буфера (Ctrl+C копирует по record)
+        self.assertEqual([model.record(row).text for row in range(model.rowCount())], ['alpha', 'alpha 2'])
+        model.append_records(_records(['alpha 3']))
+        self.assertEqual(model.record(2).text, 'alpha 3')
+        model.set_filter(None)
+        self.assertEqual(model.record(1).text, 'beta')
+
+
+class LaunchFilterTest(unittest.TestCase):
+    def test_interleaved_launches(self):
+        buffer = ConsoleBuffer(1000)
+        index = LogIndex(buffer)
+        for launch_id, texts in ((1, ['a start', 'a line']), (2, ['b start']), (1, ['a error']), (2, ['b error']), (0, ['launcher'])):
+            records = ConsoleBuffer.make_records(texts, launch_id=launch_id)
+            first_seq = buffer.next_seq
+            buffer.extend(records)
+            index.add(first_seq, records)
+        texts = lambda seqs: [buffer.get_seq(seq).text for seq in seqs]
+        self.assertEqual(texts(index.search(SearchQuery(launch_id=1))), ['a start', 'a line', 'a error'])
+        self.assertEqual(texts(index.search(SearchQuery('error', launch_id=2))), ['b error'])
+        self.assertEqual(len(index.search(SearchQuery('error'))), 2)
+        self.assertFalse(SearchQuery('errors', launch_id=2).refines(SearchQuery('error', launch_id=1)))
+        self.assertEqual(index.matches(SearchQuery(launch_id=2), 10, ConsoleBuffer.make_records(['x', 'y'], launch_id=2)), [10, 11])
@@ -0,0 +1,59 @@
+import os
+import unittest
+
+from gc_tuning import DEFAULT_PAUSE_MS, MIN_XMX_MB, GcRunStats, parse_gc_log, recommend
+
+FIXTURE = os.path.join(os.path.dirname(__file__), 'fixtures', 'g1_gc.log')
+
+
+class ParseGcLogTest(unittest.TestCase):
+    def setUp(self):
+        self.stats = parse_gc_log(FIXTURE)
+
+    def test_pause_kinds(self):
+        self.assertEqual(self.stats.pauses, 7)
+        self.assertEqual(self.stats.young, 3)
+        self.assertEqual(self.stats.mixed, 1)
+        # Причина со вложенными скобками не должна терять полную сборку
+        self.assertEqual(self.stats.full, 1)
+        self.assertEqual(self.stats.pause_max_ms, 50.0)
+        self.assertEqual(self.stats.pause_total_ms, 77.1)
+
+    def test_heap(self):
+        self.assertEqual(self.stats.live_mb, 40)
+        self.assertEqual(self.stats.heap_capacity_mb, 1024)
+        self.assertEqual(self.stats.heap_after_max_mb, 50)
+        self.assertEqual(self.stats.region_size_mb, 4)
+        self.assertEqual(self.stats.humongous_max, 3)
+        self.assertEqual(self.stats.uptime, 10.0)
+        self.assertGreater(self.stats.alloc_rate_mb_s, 0)
+
+
+class RecommendTest(unittest.TestCase):
+    def test_too_few_pauses(self):
+        self.assertIsNone(recommend([GcRunStats(pauses=2, live_mb=500)], 4096))
+
+    def test_full_gc_grows_heap(self):
+        stats = parse_gc_log(FIXTURE)
+        result = recommend([stats], 2048, physical_mb=16384)
+        self.assertEqual(result.xmx_mb, 3072)
+        self.assertTrue(any('full GC' in reason for reason in result.reasons))
+
+    def test_relaxed_heap(self):
+        result = recommend([GcRunStats(uptime=600, pauses=50, pause_total_ms=500, live_mb=1000)], 8192, physical_mb=32768)
+        self.assertEqual(result.xmx_mb, 3072)
+        self.assertEqual(result.xms_mb, 1536)
+        self.assertEqual(result.region_size_mb, 1)
+        self.assertEqual(result.pause_ms, DEFAULT_PAUSE_MS)
+
+    def test_capped_by_physical_memory(self):
+        result = recommend([GcRunStats(uptime=60, pauses=10, live_mb=3000, full=2)], 4096, physical_mb=8192)
+        self.assertEqual(result.xmx_mb, 6144)
+        self.assertGreaterEqual(result.xmx_mb, MIN_XMX_MB)
+        self.assertTrue(any('physical RAM' in reason for reason in result.reasons))
+
+    def test_apply(self):
+        result = recommend([GcRunStats(uptime=600, pauses=50, live_mb=1000)], 8192)
+        args = result.apply(['-Xmx8G', '-Xms1G', '-XX:MaxGCPauseMillis=200', '-Dfoo=1'])
+        self.assertEqual(args, ['-Xmx3072M', '-Xms1536M', '-Dfoo=1', '-XX:G1HeapRegionSize=1M', f'-XX:MaxGCPauseMillis={DEFAULT_PAUSE_MS}'])
+        self.assertNotIn('-XX:G1HeapRegionSize=1M', result.apply(['-XX:+UseZGC']))
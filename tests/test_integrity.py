@@ -0,0 +1,97 @@
+import hashlib
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import integrity
+from integrity import IntegrityIndex
+from version_installer import DownloadItem, VersionFiles
+
+
+class IntegrityIndexTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.minecraft_dir = os.path.join(tmp.name, 'mc')
+        self.index_dir = os.path.join(tmp.name, 'integrity')
+        self.write_version({'id': '1.20.1'})
+        self.items = []
+        for name, data in {'client.jar': b'client', 'lib.jar': b'library', 'asset': b'asset data'}.items():
+            path = os.path.join(self.minecraft_dir, name)
+            self.write(path, data)
+            self.items.append(DownloadItem(f'http://x/{name}', path, hashlib.sha1(data).hexdigest(), len(data)))
+        self.addCleanup(mock.patch.stopall)
+        self.collect = mock.patch.object(
+            integrity, 'collect_version_files', side_effect=lambda *a: VersionFiles('1.20.1', {}, list(self.items))
+        ).start()
+        self.sha1 = mock.patch.object(integrity, 'sha1_of_file', wraps=integrity.sha1_of_file).start()
+
+    def write(self, path: str, data: bytes) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+
+    def touch(self, path: str) -> None:
+        # Сдвигаем mtime явно: при грубом разрешении ФС перезапись могла бы его не изменить
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+    def write_version(self, data: dict) -> None:
+        path = os.path.join(self.minecraft_dir, 'versions', '1.20.1', '1.20.1.json')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+    def index(self) -> IntegrityIndex:
+        return IntegrityIndex('1.20.1', self.minecraft_dir, self.index_dir)
+
+    def test_second_verify_only_stats(self):
+        first = self.index().verify()
+        self.assertTrue(first.ok)
+        self.assertEqual((first.checked, first.hashed), (3, 3))
+        # Новый экземпляр читает индекс с диска: stat не менялся, хэши не считаются
+        second = self.index().verify()
+        self.assertTrue(second.ok)
+        self.assertEqual((second.checked, second.hashed), (3, 0))
+        self.assertEqual(self.sha1.call_count, 3)
+        self.assertEqual(self.collect.call_count, 1)
+
+    def test_changed_stat_is_rehashed(self):
+        self.index().verify()
+        lib = self.items[1].path
+        # Тот же размер и содержимое, но новый mtime: хэш пересчитывается и совпадает
+        self.touch(lib)
+        result = self.index().verify()
+        self.assertTrue(result.ok)
+        self.assertEqual(result.hashed, 1)
+        self.assertEqual(self.index().verify().hashed, 0)
+
+    def test_corrupt_and_missing(self):
+        self.index().verify()
+        # Та же длина, другое содержимое — ловится только пересчётом хэша
+        self.write(self.items[0].path, b'CLIENT')
+        self.touch(self.items[0].path)
+        self.write(self.items[1].path, b'short')
+        os.remove(self.items[2].path)
+        result = self.index().verify()
+        self.assertFalse(result.ok)
+        # Порядок в списке зависит от потоков проверки
+        self.assertCountEqual(result.corrupt, self.items[:2])
+        self.assertEqual(result.missing, [self.items[2]])
+        self.assertEqual(result.hashed, 1)
+
+    def test_changed_version_json_refreshes_list(self):
+        self.index().verify()
+        self.write_version({'id': '1.20.1', 'libraries': []})
+        self.assertTrue(self.index().verify().ok)
+        self.assertEqual(self.collect.call_count, 2)
+        # Проверенные stat переживают перестроение списка
+        self.assertEqual(self.sha1.call_count, 3)
+
+    def test_mark_valid(self):
+        index = self.index()
+        index.refresh()
+        index.mark_valid(self.items[:2])
+        self.assertEqual(index.verify().hashed, 1)
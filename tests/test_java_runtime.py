@@ -0,0 +1,95 @@
+import unittest
+from unittest import mock
+
+import java_runtime
+import version_installer
+from version_installer import VersionFiles, install_version
+
+
+class PlatformTest(unittest.TestCase):
+    def platform_key(self, system: str, machine: str) -> str:
+        with mock.patch('platform.system', return_value=system), mock.patch('platform.machine', return_value=machine):
+            return java_runtime.mojang_platform()
+
+    def test_mojang_platform(self):
+        self.assertEqual(self.platform_key('Linux', 'x86_64'), 'linux')
+        self.assertEqual(self.platform_key('Linux', 'i686'), 'linux-i386')
+        self.assertEqual(self.platform_key('Windows', 'AMD64'), 'windows-x64')
+        self.assertEqual(self.platform_key('Darwin', 'arm64'), 'mac-os-arm64')
+
+    def test_arm_linux_has_no_mojang_key(self):
+        # Для ARM Linux рантаймов Mojang нет: x64-сборки там не запустятся, нужен Adoptium
+        for machine in ('aarch64', 'arm64', 'armv7l'):
+            with self.subTest(machine=machine):
+                self.assertNotEqual(self.platform_key('Linux', machine), 'linux')
+
+    def test_prepare_mojang_falls_back_for_unknown_platform(self):
+        manager = java_runtime.JavaRuntimeManager()
+        with (
+            mock.patch.object(java_runtime, 'mojang_platform', return_value='linux-arm64'),
+            mock.patch.object(manager, '_load_mojang_manifest', return_value={'linux': {'java-runtime-gamma': [{}]}}),
+        ):
+            self.assertIsNone(manager.prepare_mojang('java-runtime-gamma', 17))
+
+
+class InstallRuntimeTest(unittest.TestCase):
+    def install(self, data: dict, manager: mock.Mock, **kwargs) -> None:
+        with (
+            mock.patch.object(version_installer, 'collect_version_files', return_value=VersionFiles('v', data)),
+            mock.patch.object(version_installer, 'copy_parent_jar'),
+            mock.patch.object(java_runtime, 'get_runtime_manager', return_value=manager),
+        ):
+            install_version('v', '/tmp/mc', **kwargs)
+
+    def test_legacy_version_gets_no_runtime(self):
+        manager = mock.Mock()
+        self.install({'id': 'v'}, manager)
+        manager.ensure.assert_not_called()
+
+    def test_runtime_by_java_version(self):
+        manager = mock.Mock()
+        self.install({'id': 'v', 'javaVersion': {'component': 'java-runtime-gamma', 'majorVersion': 17}}, manager)
+        manager.ensure.assert_called_once()
+        self.assertEqual(manager.ensure.call_args.args, ('java-runtime-gamma', 17))
+
+    def test_runtime_skipped_when_not_requested(self):
+        manager = mock.Mock()
+        self.install({'id': 'v', 'javaVersion': {'component': 'java-runtime-gamma'}}, manager, install_runtime=False)
+        manager.ensure.assert_not_called()
+
+    def test_runtime_failure_is_not_fatal(self):
+        manager = mock.Mock()
+        manager.ensure.side_effect = java_runtime.JavaRuntimeError('offline')
+        with self.assertLogs(level='WARNING'):
+            self.install({'id': 'v', 'javaVersion': {'component': 'java-runtime-gamma'}}, manager)
+
+
+class ForgeProcessorJavaTest(unittest.TestCase):
+    def default_java(self, manager: mock.Mock, data: dict) -> str:
+        import forge_installer
+
+        with mock.patch.object(forge_installer, 'get_runtime_manager', return_value=manager):
+            return forge_installer._default_java(data, '/tmp/mc')
+
+    def test_managed_runtime(self):
+        manager = mock.Mock()
+        manager.find.return_value = '/mc/java/java-runtime-gamma/bin/java'
+        data = {'javaVersion': {'component': 'java-runtime-gamma', 'majorVersion': 17}}
+        self.assertEqual(self.default_java(manager, data), '/mc/java/java-runtime-gamma/bin/java')
+        manager.find.assert_called_once_with('java-runtime-gamma', 17)
+        manager.ensure.assert_not_called()
+
+    def test_installs_missing_runtime(self):
+        manager = mock.Mock()
+        manager.find.return_value = None
+        manager.ensure.return_value = '/mc/java/jre-legacy/bin/java'
+        # Без javaVersion в профиле процессорам нужна Java 8
+        self.assertEqual(self.default_java(manager, {}), '/mc/java/jre-legacy/bin/java')
+        self.assertEqual(manager.ensure.call_args.args[:2], (java_runtime.DEFAULT_COMPONENT, java_runtime.DEFAULT_MAJOR))
+
+    def test_path_java_is_last_resort(self):
+        manager = mock.Mock()
+        manager.find.return_value = None
+        manager.ensure.side_effect = java_runtime.JavaRuntimeError('offline')
+        with mock.patch('minecraft_launcher_lib.runtime.get_executable_path', return_value=None), self.assertLogs(level='WARNING'):
+            self.assertEqual(self.default_java(manager, {'javaVersion': {'component': 'java-runtime-gamma'}}), 'java')
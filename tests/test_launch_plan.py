@@ -0,0 +1,119 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import launch_plan
+from launch_plan import SESSION_PLACEHOLDERS, LaunchPlan, LaunchPlanCache, _options_key
+
+
+def _plan(version: str = '1.20.1', minecraft_dir: str = '/tmp/mc') -> LaunchPlan:
+    return LaunchPlan(
+        version=version,
+        minecraft_dir=minecraft_dir,
+        java='java',
+        java_component=None,
+        jvm_args=['-Djava.library.path=/natives', f'-Dminecraft.user={SESSION_PLACEHOLDERS["username"]}'],
+        main_class='net.minecraft.client.main.Main',
+        game_args=[
+            '--username',
+            SESSION_PLACEHOLDERS['username'],
+            '--uuid',
+            SESSION_PLACEHOLDERS['uuid'],
+            '--accessToken',
+            SESSION_PLACEHOLDERS['token'],
+            '--version',
+            version,
+        ],
+        natives_dir='/natives',
+    )
+
+
+class BuildCommandTest(unittest.TestCase):
+    def test_session_values_substituted(self):
+        plan = _plan()
+        with mock.patch.object(LaunchPlan, 'java_executable', return_value='/jre/bin/java'):
+            command = plan.build_command('Steve', 'uuid-1', 'token-1', jvm_args=['-Xmx4096M'])
+        self.assertEqual(
+            command,
+            [
+                '/jre/bin/java',
+                '-Xmx4096M',
+                '-Djava.library.path=/natives',
+                '-Dminecraft.user=Steve',
+                'net.minecraft.client.main.Main',
+                '--username',
+                'Steve',
+                '--uuid',
+                'uuid-1',
+                '--accessToken',
+                'token-1',
+                '--version',
+                '1.20.1',
+            ],
+        )
+        # Шаблон в плане не меняется: его можно использовать для следующего запуска
+        self.assertEqual(plan.game_args[1], SESSION_PLACEHOLDERS['username'])
+
+    def test_round_trip(self):
+        plan = _plan()
+        self.assertEqual(LaunchPlan.from_dict(json.loads(json.dumps(plan.to_dict()))), plan)
+
+
+class OptionsKeyTest(unittest.TestCase):
+    def test_session_values_do_not_change_key(self):
+        base = {'launcherName': '16Launcher', 'demo': False}
+        key = _options_key('/tmp/mc', base)
+        self.assertEqual(key, _options_key('/tmp/mc', {**base, 'username': 'Alex', 'uuid': 'u', 'token': 't'}))
+        self.assertEqual(key, _options_key('/tmp/mc', {**base, 'jvmArguments': ['-Xmx2G']}))
+        self.assertEqual(key, _options_key('/tmp/mc', dict(reversed(list(base.items())))))
+        self.assertNotEqual(key, _options_key('/tmp/mc', {**base, 'demo': True}))
+        self.assertNotEqual(key, _options_key('/tmp/other', base))
+
+
+class LaunchPlanCacheTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.minecraft_dir = os.path.join(tmp.name, 'mc')
+        self.plans_dir = os.path.join(tmp.name, 'plans')
+        self.write_version('1.20.1', {'id': '1.20.1', 'mainClass': 'net.minecraft.client.main.Main'})
+        self.write_version('fabric', {'id': 'fabric', 'inheritsFrom': '1.20.1'})
+        patcher = mock.patch.object(launch_plan, 'build_launch_plan', side_effect=lambda v, d, o: _plan(v, d))
+        self.build = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def write_version(self, version: str, data: dict) -> None:
+        path = os.path.join(self.minecraft_dir, 'versions', version, f'{version}.json')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+    def test_reuses_plan_from_memory_and_disk(self):
+        cache = LaunchPlanCache(self.plans_dir)
+        plan = cache.get('fabric', self.minecraft_dir, {'demo': False})
+        self.assertEqual(cache.get('fabric', self.minecraft_dir, {'demo': False, 'username': 'Alex'}), plan)
+        self.assertEqual(LaunchPlanCache(self.plans_dir).get('fabric', self.minecraft_dir, {'demo': False}), plan)
+        self.assertEqual(self.build.call_count, 1)
+
+    def test_rebuilds_when_chain_changes(self):
+        cache = LaunchPlanCache(self.plans_dir)
+        cache.get('fabric', self.minecraft_dir, {})
+        # Изменился родительский JSON (размер другой, поэтому stat точно отличается)
+        self.write_version('1.20.1', {'id': '1.20.1', 'mainClass': 'net.minecraft.client.main.Main', 'extra': True})
+        cache.get('fabric', self.minecraft_dir, {})
+        self.assertEqual(self.build.call_count, 2)
+        cache.get('fabric', self.minecraft_dir, {})
+        self.assertEqual(self.build.call_count, 2)
+
+    def test_options_and_invalidate(self):
+        cache = LaunchPlanCache(self.plans_dir)
+        cache.get('fabric', self.minecraft_dir, {'demo': False})
+        cache.get('fabric', self.minecraft_dir, {'demo': True})
+        self.assertEqual(self.build.call_count, 2)
+        cache.get('1.20.1', self.minecraft_dir, {})
+        cache.invalidate('fabric')
+        self.assertEqual([name.startswith('1.20.1-') for name in os.listdir(self.plans_dir)], [True])
+        cache.get('fabric', self.minecraft_dir, {'demo': False})
+        self.assertEqual(self.build.call_count, 4)
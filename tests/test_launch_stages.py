@@ -0,0 +1,204 @@
+import io
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from launch_stages import LaunchCancelled, PhaseLimiter, Stage, StageError, StagePipeline
+
+
+class StagePipelineTest(unittest.TestCase):
+    def test_dependencies_see_results(self):
+        seen = {}
+
+        def plan(results):
+            seen['plan'] = dict(results)
+            return 'plan'
+
+        pipeline = StagePipeline(
+            [
+                Stage('plan', plan, deps=('install',)),
+                Stage('resolve', lambda r: '1.20.1'),
+                Stage('install', lambda r: f'installed {r["resolve"]}', deps=('resolve',)),
+            ]
+        )
+        results = pipeline.run()
+        self.assertEqual(results, {'resolve': '1.20.1', 'install': 'installed 1.20.1', 'plan': 'plan'})
+        self.assertEqual(seen['plan'], {'resolve': '1.20.1', 'install': 'installed 1.20.1'})
+        self.assertEqual([t.name for t in sorted(pipeline.timings, key=lambda t: t.started)], ['resolve', 'install', 'plan'])
+
+    def test_independent_stages_run_concurrently(self):
+        barrier = threading.Barrier(2, timeout=2)
+        # Каждый этап ждёт другого: при последовательном выполнении барьер не пройдёт
+        pipeline = StagePipeline([Stage('a', lambda r: barrier.wait()), Stage('b', lambda r: barrier.wait())])
+        self.assertEqual(set(pipeline.run()), {'a', 'b'})
+
+    def test_invalid_graph(self):
+        with self.assertRaises(ValueError):
+            StagePipeline([Stage('a', lambda r: None, deps=('missing',))])
+        with self.assertRaises(ValueError):
+            StagePipeline([Stage('a', lambda r: None, deps=('b',)), Stage('b', lambda r: None, deps=('a',))]).run()
+
+    def test_optional_failure_is_none(self):
+        def boom(results):
+            raise OSError('offline')
+
+        pipeline = StagePipeline([Stage('skin', boom, optional=True), Stage('plan', lambda r: 'plan', deps=('skin',))])
+        with self.assertLogs(level='WARNING'):
+            results = pipeline.run()
+        self.assertEqual(results, {'skin': None, 'plan': 'plan'})
+        self.assertIn('skin', pipeline.summary())
+        self.assertIn('(failed)', pipeline.summary())
+
+    def test_required_failure_stops_dependents(self):
+        plan = mock.Mock()
+
+        def install(results):
+            raise OSError('disk full')
+
+        pipeline = StagePipeline([Stage('install', install), Stage('plan', plan, deps=('install',))])
+        with self.assertRaises(StageError) as ctx:
+            pipeline.run()
+        self.assertEqual(ctx.exception.stage, 'install')
+        self.assertIsInstance(ctx.exception.error, OSError)
+        plan.assert_not_called()
+
+    def test_cancel_during_stage(self):
+        started = threading.Event()
+        plan = mock.Mock()
+
+        def install(results):
+            started.set()
+            # Долгий этап проверяет отмену между шагами
+            while True:
+                pipeline.check_cancelled()
+                time.sleep(0.01)
+
+        pipeline = StagePipeline([Stage('install', install), Stage('plan', plan, deps=('install',))])
+        threading.Thread(target=lambda: started.wait(2) and pipeline.cancel(), daemon=True).start()
+        with self.assertRaises(LaunchCancelled):
+            pipeline.run()
+        plan.assert_not_called()
+
+    def test_cancelled_before_start(self):
+        stage = mock.Mock()
+        pipeline = StagePipeline([Stage('resolve', stage)])
+        pipeline.cancel()
+        with self.assertRaises(LaunchCancelled):
+            pipeline.run()
+        stage.assert_not_called()
+
+
+class PhaseLimiterTest(unittest.TestCase):
+    def test_waits_for_slot_and_cancels(self):
+        limiter = PhaseLimiter(1)
+        cancel = threading.Event()
+        waited = []
+
+        def on_wait():
+            waited.append(True)
+            cancel.set()
+
+        with limiter.slot():
+            with self.assertRaises(LaunchCancelled), limiter.slot(cancel, on_wait=on_wait):
+                pass
+        self.assertEqual(waited, [True])
+        self.assertEqual(limiter.active, 0)
+
+
+class SkinStageTest(unittest.TestCase):
+    def test_only_legacy_versions_wait_for_skin(self):
+        from launch_core import ElySkinManager, LaunchCore
+
+        with mock.patch.object(ElySkinManager, 'apply_skin', return_value=True) as apply_skin:
+            core = LaunchCore()
+            core.version_id = '1.5.2'
+            self.assertFalse(core.stage_legacy_skin({}))
+            core.ely_session = {'username': 'steve', 'uuid': 'u', 'token': 't'}
+            core.version_id = '1.20.1'
+            self.assertFalse(core.stage_legacy_skin({}))
+            apply_skin.assert_not_called()
+            core.version_id = '1.5.2'
+            self.assertTrue(core.stage_legacy_skin({}))
+            apply_skin.assert_called_once_with('steve', '1.5.2', True)
+
+    def test_apply_skin(self):
+        import ely_skin_manager
+        from ely_skin_manager import ElySkinManager
+
+        with tempfile.TemporaryDirectory() as tmp, mock.patch.object(ely_skin_manager, 'SKINS_DIR', tmp):
+            with (
+                mock.patch.object(ElySkinManager, 'download_skin', return_value=False),
+                mock.patch.object(ElySkinManager, 'inject_legacy_skin', return_value=True) as inject,
+            ):
+                self.assertFalse(ElySkinManager.apply_skin('steve', '1.20.1', False))
+                # Без сети и без кэша подкладывать нечего
+                self.assertFalse(ElySkinManager.apply_skin('steve', '1.5.2', True))
+                open(os.path.join(tmp, 'steve.png'), 'wb').close()
+                # Скин из кэша подходит, даже если обновить его не удалось
+                self.assertTrue(ElySkinManager.apply_skin('steve', '1.5.2', True))
+                inject.assert_called_once()
+
+    def test_download_skin_uses_fresh_cache_and_timeout(self):
+        import ely_skin_manager
+        from ely_skin_manager import SKIN_TIMEOUT, ElySkinManager
+
+        with (
+            tempfile.TemporaryDirectory() as tmp,
+            mock.patch.object(ely_skin_manager, 'SKINS_DIR', tmp),
+            mock.patch.object(ely_skin_manager.requests, 'get') as get,
+        ):
+            response = get.return_value.__enter__.return_value
+            response.status_code = 200
+            response.raw = io.BytesIO(b'png')
+            self.assertTrue(ElySkinManager.download_skin('steve', max_age=60))
+            self.assertEqual(get.call_args.kwargs['timeout'], SKIN_TIMEOUT)
+            with open(os.path.join(tmp, 'steve.png'), 'rb') as f:
+                self.assertEqual(f.read(), b'png')
+            self.assertTrue(ElySkinManager.download_skin('steve', max_age=60))
+            self.assertEqual(get.call_count, 1)
+            # Устаревшая копия перекачивается
+            old = time.time() - 120
+            os.utime(os.path.join(tmp, 'steve.png'), (old, old))
+            response.raw = io.BytesIO(b'png')
+            self.assertTrue(ElySkinManager.download_skin('steve', max_age=60))
+            self.assertEqual(get.call_count, 2)
+            self.assertEqual(os.listdir(tmp), ['steve.png'])
+
+
+class AuthlibTest(unittest.TestCase):
+    STAGES = ('stage_java_index', 'stage_legacy_skin', 'stage_install', 'stage_legacy_patch', 'stage_plan', 'stage_prewarm')
+
+    def run_core(self, authlib: mock.Mock) -> tuple[list[str], mock.Mock]:
+        from launch_core import LaunchCore
+
+        core = LaunchCore(settings={}, ely_session={'username': 'steve', 'uuid': 'u', 'token': 't'})
+        core.log = mock.Mock()
+        stages = {name: mock.Mock(return_value=None) for name in self.STAGES}
+        # Запуск обрывается на подборе флагов JVM: к этому моменту аргументы агента уже собраны
+        with mock.patch.multiple(
+            core,
+            stage_authlib=authlib,
+            stage_resolve=mock.Mock(return_value='1.20.1'),
+            stage_java=mock.Mock(return_value='/jre/bin/java'),
+            java_major=mock.Mock(return_value=17),
+            sync_skin=mock.DEFAULT,
+            tune_jvm_args=mock.Mock(side_effect=RuntimeError('stop')),
+            **stages,
+        ):
+            self.assertIsNone(core.launch('1.20.1', 'steve'))
+            tune = core.tune_jvm_args
+        return [call.args[0] for call in core.log.call_args_list], tune
+
+    def test_failed_authlib_stops_ely_launch(self):
+        logs, tune = self.run_core(mock.Mock(side_effect=OSError('offline')))
+        tune.assert_not_called()
+        self.assertIn('[LAUNCH ERROR] authlib: offline', logs)
+
+    def test_agent_from_stage_result(self):
+        from config import ELYBY_HOST
+
+        _logs, tune = self.run_core(mock.Mock(return_value='/agents/authlib.jar'))
+        self.assertIn(f'-javaagent:/agents/authlib.jar={ELYBY_HOST}', tune.call_args.args[0])
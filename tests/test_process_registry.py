@@ -0,0 +1,45 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import process_registry
+from process_registry import ProcessRegistry, _linux_start_token
+
+
+class LinuxStartTokenTest(unittest.TestCase):
+    def token(self, stat: bytes) -> int | None:
+        with mock.patch('builtins.open', mock.mock_open(read_data=stat)):
+            return _linux_start_token(1234)
+
+    def test_name_with_spaces_and_parens(self):
+        # Поля после состояния пронумерованы так же, как в proc(5): starttime — 22-е
+        tail = b' '.join(str(i).encode() for i in range(4, 30))
+        self.assertEqual(self.token(b'1234 (Render (thread) 1) S ' + tail), 22)
+
+    def test_malformed_stat(self):
+        self.assertIsNone(self.token(b'1234 (java) S 1 2 3'))
+        self.assertIsNone(self.token(b'1234 (java) ' + b'x ' * 30))
+        self.assertIsNone(self.token(b''))
+
+    def test_missing_process(self):
+        self.assertIsNone(_linux_start_token(-1))
+
+
+class ProcessRegistryTest(unittest.TestCase):
+    def test_alive_drops_dead_and_recycled(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'processes.json')
+            registry = ProcessRegistry(path)
+            with mock.patch.object(process_registry, 'process_start_token', side_effect=lambda pid: {1: 100, 2: 200, 3: None}[pid]):
+                for pid in (1, 2, 3):
+                    registry.register(pid, '1.20.1', 'vanilla', ['java', '-jar', 'x'])
+            # PID 2 достался другому процессу, PID 3 завершился
+            with mock.patch.object(process_registry, 'process_start_token', side_effect=lambda pid: {1: 100, 2: 999, 3: None}[pid]):
+                self.assertEqual([p.pid for p in registry.alive()], [1])
+                self.assertEqual([p.pid for p in ProcessRegistry(path).alive()], [1])
+
+    @unittest.skipUnless(sys.platform.startswith('linux'), '/proc only')
+    def test_current_process(self):
+        self.assertIsNotNone(_linux_start_token(os.getpid()))
@@ -0,0 +1,109 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import loader_installer
+from provision import LoaderSpec, Manifest, ProvisionError, ProvisionPlan, Provisioner, _dedupe
+from version_installer import DownloadItem, DownloadReport
+
+
+class ManifestTest(unittest.TestCase):
+    def test_from_dict(self):
+        manifest = Manifest.from_dict(
+            {
+                'versions': ['1.20.1'],
+                'loaders': [{'type': 'forge', 'minecraft': '1.20.1', 'version': '47.2.0'}],
+                'java': [17],
+                'mods': [{'modrinth': 'sodium', 'minecraft': '1.20.1', 'loader': 'fabric'}],
+                'resourcepacks': [{'url': 'https://example.com/pack.zip', 'sha1': 'abc'}],
+            }
+        )
+        self.assertEqual(manifest.versions, ['1.20.1'])
+        self.assertEqual(manifest.loaders, [LoaderSpec('forge', '1.20.1', '47.2.0')])
+        self.assertEqual(manifest.java, [17])
+        self.assertEqual(manifest.mods[0].kind, 'mod')
+        self.assertEqual(manifest.resourcepacks[0].kind, 'resourcepack')
+        self.assertEqual(manifest.resourcepacks[0].sha1, 'abc')
+
+    def test_rejects_invalid(self):
+        for data in (
+            [],
+            {'versions': '1.20.1'},
+            {'java': ['17']},
+            {'mods': [{'minecraft': '1.20.1'}]},
+            {'loaders': [{'type': 'fabric'}]},
+            # Установщиков Quilt и NeoForge нет — ошибка сразу, а не после загрузок
+            {'loaders': [{'type': 'quilt', 'minecraft': '1.20.1'}]},
+            {'loaders': [{'type': 'neoforge', 'minecraft': '1.20.1'}]},
+        ):
+            with self.subTest(data=data), self.assertRaises(ProvisionError):
+                Manifest.from_dict(data)
+
+    def test_load_errors(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'manifest.json')
+            with self.assertRaises(ProvisionError):
+                Manifest.load(path)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write('{not json')
+            with self.assertRaises(ProvisionError):
+                Manifest.load(path)
+
+
+class DedupeTest(unittest.TestCase):
+    def test_path_and_hash(self):
+        a = DownloadItem('http://a', '/tmp/x/a.jar', 'h1')
+        same_path = DownloadItem('http://mirror', '/tmp/x/./a.jar', 'h1')
+        same_hash = DownloadItem('http://b', '/tmp/y/b.jar', 'h1')
+        no_hash = DownloadItem('http://c', '/tmp/y/c.jar')
+        other_no_hash = DownloadItem('http://d', '/tmp/y/d.jar')
+        unique, copies = _dedupe([a, same_path, same_hash, no_hash, other_no_hash])
+        self.assertEqual(unique, [a, no_hash, other_no_hash])
+        self.assertEqual(copies, [(a, same_hash)])
+
+
+class ForgeVersionTest(unittest.TestCase):
+    def test_full_version(self):
+        self.assertEqual(loader_installer.forge_full_version('1.20.1', '47.2.0'), '1.20.1-47.2.0')
+        self.assertEqual(loader_installer.forge_full_version('1.20.1', '1.20.1-47.2.0'), '1.20.1-47.2.0')
+
+    def test_install_uses_maven_version(self):
+        for version in ('47.2.0', '1.20.1-47.2.0'):
+            with self.subTest(version=version), mock.patch.object(loader_installer, 'forge_install') as forge_install:
+                loader_installer.install_loader('forge', version, '1.20.1', '/tmp/mc')
+                self.assertEqual(forge_install.call_args.args[:2], ('1.20.1-47.2.0', '/tmp/mc'))
+
+    def test_installed_profile_both_forms(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            profile = '1.20.1-forge-47.2.0'
+            os.makedirs(os.path.join(tmp, 'versions', profile))
+            with open(os.path.join(tmp, 'versions', profile, f'{profile}.json'), 'w', encoding='utf-8') as f:
+                json.dump({'id': profile, 'inheritsFrom': '1.20.1'}, f)
+            provisioner = Provisioner(tmp)
+            for version in ('47.2.0', '1.20.1-47.2.0'):
+                with self.subTest(version=version):
+                    self.assertEqual(provisioner.loader_profile(LoaderSpec('forge', '1.20.1', version)), profile)
+            self.assertIsNone(provisioner.loader_profile(LoaderSpec('forge', '1.20.1', '47.1.0')))
+
+    def test_unsupported_loader(self):
+        with self.assertRaises(loader_installer.LoaderInstallError):
+            loader_installer.install_loader('quilt', None, '1.20.1', '/tmp/mc')
+
+
+class RunTest(unittest.TestCase):
+    def test_copy_of_failed_source_is_reported(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = DownloadItem('http://a', os.path.join(tmp, 'a.jar'), 'h1')
+            copy = DownloadItem('http://b', os.path.join(tmp, 'b.jar'), 'h1')
+            plan = ProvisionPlan(items=[source], copies=[(source, copy)])
+            provisioner = Provisioner(tmp)
+            with (
+                mock.patch.object(provisioner, 'plan', return_value=plan),
+                mock.patch.object(provisioner.downloader, 'download_all', return_value=DownloadReport(failed=[(source, 'boom')])),
+            ):
+                report = provisioner.run(Manifest())
+            self.assertFalse(report.ok)
+            self.assertEqual(len(report.failed), 2)
+            self.assertIn(copy.path, report.failed[1])
@@ -0,0 +1,68 @@
+import hashlib
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from version_installer import Downloader, DownloadItem
+
+
+class _StreamResponse:
+    def __init__(self, chunks: list[bytes], barrier: threading.Barrier) -> None:
+        self.chunks = chunks
+        self.barrier = barrier
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+    def raise_for_status(self) -> None:
+        pass
+
+    def iter_content(self, chunk_size: int):
+        for chunk in self.chunks:
+            # Оба загрузчика пишут очередной кусок одновременно
+            self.barrier.wait()
+            yield chunk
+
+
+class DownloaderTest(unittest.TestCase):
+    def test_concurrent_writers_do_not_mix(self):
+        barrier = threading.Barrier(2, timeout=5)
+        payloads = {'http://a': b'A' * 1000, 'http://b': b'B' * 1000}
+        session = mock.Mock()
+        session.get.side_effect = lambda url, **kwargs: _StreamResponse(
+            [payloads[url][i : i + 100] for i in range(0, 1000, 100)], barrier
+        )
+        with tempfile.TemporaryDirectory() as tmp, mock.patch.object(Downloader, '_session', return_value=session):
+            path = os.path.join(tmp, 'libraries', 'lib.jar')
+            items = [DownloadItem(url, path, hashlib.sha1(data).hexdigest(), len(data)) for url, data in payloads.items()]
+            errors = []
+
+            def fetch(item):
+                try:
+                    Downloader(retries=0).fetch(item, check_existing=False)
+                except Exception as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=fetch, args=(item,)) for item in items]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(10)
+            self.assertEqual(errors, [])
+            with open(path, 'rb') as f:
+                self.assertIn(f.read(), payloads.values())
+            self.assertEqual(os.listdir(os.path.dirname(path)), ['lib.jar'])
+
+    def test_failed_download_leaves_no_part(self):
+        session = mock.Mock()
+        session.get.return_value = _StreamResponse([b'broken'], threading.Barrier(1))
+        with tempfile.TemporaryDirectory() as tmp, mock.patch.object(Downloader, '_session', return_value=session):
+            path = os.path.join(tmp, 'lib.jar')
+            with self.assertRaises(Exception):
+                Downloader(retries=0).fetch(DownloadItem('http://a', path, '0' * 40), check_existing=False)
+            self.assertEqual(os.listdir(tmp), [])